@@ -1,24 +1,22 @@
 # https://huggingface.co/meta-llama/Llama-3.1-8B-Instruct
-import requests
+import asyncio
 
-API_URL = "https://router.huggingface.co/nebius/v1/chat/completions"
-headers = {
-    "Authorization": "Bearer huggingface-api-key",
-}
+from router_client import RouterClient, print_event
 
-def query(payload):
-    response = requests.post(API_URL, headers=headers, json=payload)
-    return response.json()
+async def main():
+    async with RouterClient(log_event=print_event) as client:
+        # the tokens are printed as they arrive.
+        async for token in client.stream({
+            "messages": [
+                {
+                    "role": "user",
+                    "content": "What is the capital of Australia?"
+                }
+            ],
+            "max_tokens": 512,
+            "model": "meta-llama/Meta-Llama-3.1-8B-Instruct-fast"
+        }):
+            print(token, end="", flush=True)
+        print()
 
-response = query({
-    "messages": [
-        {
-            "role": "user",
-            "content": "What is the capital of Australia?"
-        }
-    ],
-    "max_tokens": 512,
-    "model": "meta-llama/Meta-Llama-3.1-8B-Instruct-fast"
-})
-
-print(response["choices"][0]["message"])
+asyncio.run(main())
@@ -1,14 +1,5 @@
 #https://huggingface.co/google/gemma-3-27b-it
-import requests
-
-API_URL = "https://router.huggingface.co/nebius/v1/chat/completions"
-headers = {
-    "Authorization": "Bearer huggingface-api-key",
-}
-
-def query(payload):
-    response = requests.post(API_URL, headers=headers, json=payload)
-    return response.json()
+from router_client import query
 
 response = query({
     "messages": [
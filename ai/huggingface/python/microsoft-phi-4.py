@@ -1,24 +1,32 @@
 # https://huggingface.co/microsoft/phi-4
-import requests
+import asyncio
 
-API_URL = "https://router.huggingface.co/nebius/v1/chat/completions"
-headers = {
-    "Authorization": "Bearer huggingface-api-key",
-}
+from router_client import RouterClient, print_event
 
-def query(payload):
-    response = requests.post(API_URL, headers=headers, json=payload)
-    return response.json()
+questions = [
+    "What is the capital of Australia?",
+    "What is the capital of Canada?",
+    "What is the capital of New Zealand?"
+]
 
-response = query({
-    "messages": [
-        {
-            "role": "user",
-            "content": "What is the capital of Australia?"
-        }
-    ],
-    "max_tokens": 512,
-    "model": "microsoft/phi-4"
-})
+async def main():
+    # the questions are asked concurrently over pooled connections.
+    async with RouterClient(concurrency=4, log_event=print_event) as client:
+        responses = await client.query_many([
+            {
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": question
+                    }
+                ],
+                "max_tokens": 512,
+                "model": "microsoft/phi-4"
+            }
+            for question in questions
+        ])
 
-print(response["choices"][0]["message"])
+    for response in responses:
+        print(response if isinstance(response, Exception) else response["choices"][0]["message"])
+
+asyncio.run(main())
@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import importlib.util
+
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+
+# the default Hugging Face router endpoint, HF_ROUTER_URL points the scripts at another
+# OpenAI-compatible server, e.g. a local mock.
+API_URL = os.environ.get("HF_ROUTER_URL", "https://router.huggingface.co/nebius/v1/chat/completions")
+
+# rate limited and server errors are retried.
+retry_status_codes = (429, 500, 502, 503, 504)
+
+# HTTP/2 needs the h2 package (pip install httpx[http2]), else HTTP/1.1 keep-alive is used.
+http2_available = importlib.util.find_spec("h2") is not None
+
+# the log event handler of the MCP classes, (level, kind, message, data).
+LogEvent = Callable[[str, str, str, Any], None]
+
+def print_event(level: str, kind: str, message: str, data: Any = None):
+    """
+    write the event to stderr, so the streamed tokens on stdout are not interleaved with it.
+    """
+    print(f"[{level}] {kind}: {message}", file=sys.stderr)
+
+def call_metrics(model: str, start: float, ttft: Optional[float], tokens: int, completed: bool) -> Dict[str, Any]:
+    """
+    the timing of one call, tokens_per_second is the generation rate after the first token.
+    """
+    seconds = time.perf_counter() - start
+    generating = seconds - (ttft or 0.0)
+    return {
+        "model": model,
+        "ttft": ttft,
+        "seconds": seconds,
+        "tokens": tokens,
+        "tokens_per_second": (tokens - 1) / generating if ttft is not None and tokens > 1 and generating > 0 else 0.0,
+        "completed": completed
+    }
+
+class RouterError(Exception):
+    """
+    the router answered with an error status.
+    """
+    def __init__(self, status_code: int, body: str):
+        super().__init__(f"{status_code}: {body[:500]}")
+        self.status_code = status_code
+        self.body = body
+
+class RouterClient:
+    """
+    an async client of the Hugging Face router. one pooled connection per concurrent request is
+    kept alive, at most concurrency requests are in flight, and rate limited or failed requests
+    are retried with exponential backoff.
+    """
+    def __init__(self,
+                 api_url: str = API_URL,
+                 api_key: Optional[str] = None,
+                 concurrency: int = 8,
+                 max_retries: int = 5,
+                 timeout: float = 120.0,
+                 backoff: float = 0.5,
+                 max_backoff: float = 30.0,
+                 http2: bool = True,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 log_event: Optional[LogEvent] = None):
+        self.api_url = api_url
+        self.log_event = log_event
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.metrics = {"requests": 0, "retries": 0, "failed": 0}
+
+        api_key = api_key or os.environ.get("HF_TOKEN", "huggingface-api-key")
+        self.client = httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            http2=http2 and http2_available,
+            transport=transport)
+
+    def __repr__(self):
+        return f"RouterClient(api_url={self.api_url}, concurrency={self.concurrency}, metrics={self.metrics})"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        await self.client.aclose()
+
+    def retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """
+        the server's Retry-After when given; else exponential backoff with jitter.
+        """
+        if response is not None:
+            try:
+                return min(self.max_backoff, float(response.headers["retry-after"]))
+            except (KeyError, ValueError):
+                pass
+        return min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def log_metrics(self, metrics: Dict[str, Any]):
+        """
+        send the timing of a call to log_event.
+        """
+        if self.log_event:
+            ttft = f"{metrics['ttft']:.3f}" if metrics["ttft"] is not None else "-"
+            self.log_event("info" if metrics["completed"] else "error", "metrics",
+                           f"{metrics['model']} ttft {ttft}s, {metrics['tokens_per_second']:.1f} tokens/s, "
+                           f"{metrics['tokens']} tokens in {metrics['seconds']:.3f}s", metrics)
+
+    async def query(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        post one chat completion, the response JSON.
+        the whole response arrives at once, so ttft is the latency and tokens per second is over the whole call.
+        """
+        start = time.perf_counter()
+        try:
+            result = await self.post(payload)
+        except BaseException:
+            self.log_metrics(call_metrics(payload.get("model", ""), start, None, 0, False))
+            raise
+
+        tokens = (result.get("usage") or {}).get("completion_tokens", 0)
+        metrics = call_metrics(payload.get("model", ""), start, time.perf_counter() - start, tokens, True)
+        metrics["tokens_per_second"] = tokens / metrics["seconds"] if metrics["seconds"] > 0 else 0.0
+        self.log_metrics(metrics)
+        return result
+
+    async def post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        post one chat completion, retried with backoff.
+        """
+        async with self.semaphore:
+            for attempt in range(self.max_retries + 1):
+                self.metrics["requests"] += 1
+                try:
+                    response = await self.client.post(self.api_url, json=payload)
+                except httpx.TransportError:
+                    if attempt >= self.max_retries:
+                        self.metrics["failed"] += 1
+                        raise
+                    response = None
+                else:
+                    if response.status_code < 400:
+                        return response.json()
+                    if response.status_code not in retry_status_codes or attempt >= self.max_retries:
+                        self.metrics["failed"] += 1
+                        raise RouterError(response.status_code, response.text)
+
+                self.metrics["retries"] += 1
+                await asyncio.sleep(self.retry_delay(attempt, response))
+
+    async def stream(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        post one chat completion with server-sent events, yield the tokens as they arrive.
+        the time to first token, tokens per second and latency are sent to log_event.
+        """
+        start = time.perf_counter()
+        ttft: Optional[float] = None
+        tokens = 0
+        completed = False
+        try:
+            async for token in self.post_stream({**payload, "stream": True}):
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                tokens += 1
+                yield token
+            completed = True
+        finally:
+            self.log_metrics(call_metrics(payload.get("model", ""), start, ttft, tokens, completed))
+
+    async def post_stream(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        post one streamed chat completion, retried with backoff only until its first token.
+        """
+        async with self.semaphore:
+            for attempt in range(self.max_retries + 1):
+                self.metrics["requests"] += 1
+                started = False
+                try:
+                    async with self.client.stream("POST", self.api_url, json=payload) as response:
+                        if response.status_code >= 400:
+                            body = (await response.aread()).decode("utf-8", "replace")
+                            if response.status_code not in retry_status_codes or attempt >= self.max_retries:
+                                self.metrics["failed"] += 1
+                                raise RouterError(response.status_code, body)
+                        else:
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[len("data:"):].strip()
+                                if data == "[DONE]":
+                                    return
+
+                                choices = json.loads(data).get("choices") or [{}]
+                                token = (choices[0].get("delta") or {}).get("content")
+                                if token:
+                                    started = True
+                                    yield token
+                            return
+                except httpx.TransportError:
+                    if started or attempt >= self.max_retries:
+                        self.metrics["failed"] += 1
+                        raise
+                    response = None
+
+                self.metrics["retries"] += 1
+                await asyncio.sleep(self.retry_delay(attempt, response))
+
+    async def query_many(self, payloads: List[Dict[str, Any]], return_exceptions: bool = True) -> List[Any]:
+        """
+        run the chat completions concurrently, the responses in the order of the payloads.
+        a failed request is returned as its exception unless return_exceptions is false.
+        """
+        return await asyncio.gather(*[self.query(payload) for payload in payloads], return_exceptions=return_exceptions)
+
+def query(payload: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+    """
+    post one chat completion with a blocking call.
+    """
+    async def run():
+        async with RouterClient(**kwargs) as client:
+            return await client.query(payload)
+
+    return asyncio.run(run())
@@ -1,15 +1,57 @@
-import httpx
-
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from mcp.client.streamable_http import streamablehttp_client
+import copy
+import json
+import anyio
+import asyncio
+import contextvars
 
 from datetime import timedelta
-from pydantic import AnyUrl, TypeAdapter
-from typing import Optional, Any, List, Union, Callable, Dict
+from typing import Optional, Any, List, Union, Callable, Awaitable, Dict, AsyncIterator, TYPE_CHECKING
 from contextlib import AsyncExitStack
 
-from .McpTypes import McpTool, McpPrompt, McpResource, McpToolParameters
+# the MCP SDK and httpx are imported when a connection is opened, not when the client is imported.
+if TYPE_CHECKING:
+    import httpx
+    from mcp import ClientSession, StdioServerParameters
+    from pydantic import AnyUrl
+
+from .McpTypes import McpTool, McpPrompt, McpResource, McpToolParameters, McpToolEvent, McpCallPolicy
+
+# the ids of the requests sent by the current call; else none.
+sentRequestIds: contextvars.ContextVar[List[int] | None] = contextvars.ContextVar("sentRequestIds", default=None)
+
+# Model context protocol request stream.
+class McpRequestStream(anyio.abc.ObjectSendStream):
+    """
+    Model context protocol request stream, the session write stream. the id of each request
+    is recorded for the call that sent it, so a cancel notification names the request sent.
+    """
+    def __init__(self, stream: Any):
+        """
+        Args:
+            stream:    the transport write stream.
+        """
+        self.stream = stream
+
+    async def send(self, item: Any) -> None:
+        """
+        send the session message.
+
+        Args:
+            item:    the session message.
+        """
+        from mcp.types import JSONRPCRequest
+
+        requestIds: List[int] | None = sentRequestIds.get()
+        if requestIds is not None and isinstance(item.message.root, JSONRPCRequest):
+            requestIds.append(item.message.root.id)
+
+        await self.stream.send(item)
+
+    async def aclose(self) -> None:
+        """
+        close the transport write stream.
+        """
+        await self.stream.aclose()
 
 # Model context protocol client.
 class McpClient:
@@ -20,9 +62,11 @@ class McpClient:
         self.open = False
         self.timeout: timedelta = timedelta(seconds=60)  # default timeout 60 seconds
         self.logEvent: Callable[[str, str, str, Any], None] | None = None
+        self.policies: Dict[str, Dict[str, McpCallPolicy]] = {}
+        self.calls: int = 0  # requests sent, e.g. used to recycle pooled servers
 
         # Initialize session and client objects
-        self.session: Optional[ClientSession] = None
+        self.session: Optional["ClientSession"] = None
         self.exit_stack = AsyncExitStack()
 
         # init
@@ -41,6 +85,7 @@ class McpClient:
     def setTimeout(self, timeout: timedelta) -> None:
         """
         set the timeout in seconds (default timeout 60 seconds).
+        used by every tool, prompt and resource call without a policy timeout.
         Args:
             timeout:    the timeout in seconds.
         """
@@ -95,10 +140,89 @@ class McpClient:
         """
         # if open.
         if self.open:
-            return await self.session.call_tool(name, arguments = args, read_timeout_seconds = self.timeout)
+            return await self.callWithPolicy("tool", name, 
+                lambda: self.session.call_tool(name, arguments = args))
         else:
             return None
 
+    async def callToolStream(self, name: str, args: Dict[str, Any] | None = None) -> AsyncIterator[McpToolEvent]:
+        """
+        call the tool, yield the progress and partial content while the tool runs.
+        the tool policy timeout applies, a stream is not retried.
+
+        Args:
+            name:    the name of the tool
+            args:    the arguments
+
+        Return:
+            the "progress" and "content" events, then one "result" event.
+
+        Example:
+            async for event in client.callToolStream("MathExpressionEvaluator", {"expression": "x**2"}):
+                if event.type == "content":
+                    print(event.text, end="")
+        """
+        # if not open.
+        if not self.open:
+            return
+
+        events: asyncio.Queue[McpToolEvent | None] = asyncio.Queue()
+
+        async def onProgress(progress: float, total: float | None, message: str | None) -> None:
+            events.put_nowait(self.getToolEvent(progress, total, message))
+
+        # run the call, the progress callback fills the queue.
+        call: asyncio.Task = asyncio.ensure_future(self.sendRequest(
+            name, 
+            lambda: self.session.call_tool(name, arguments = args, progress_callback = onProgress), 
+            self.getPolicy("tool", name).timeout))
+        call.add_done_callback(lambda task: events.put_nowait(None))
+
+        try:
+            while True:
+                event: McpToolEvent | None = await events.get()
+                if event is None:
+                    break
+                yield event
+
+            # the final result, raises if the call failed.
+            yield McpToolEvent("result", result = call.result())
+        finally:
+            # the caller stopped iterating, cancel the call on the server.
+            if not call.done():
+                call.cancel()
+                with anyio.CancelScope(shield=True):
+                    await asyncio.gather(call, return_exceptions=True)
+
+    def getToolEvent(self, progress: float, total: float | None, message: str | None) -> McpToolEvent:
+        """
+        get the tool event of a progress notification.
+
+        Args:
+            progress:    the progress value.
+            total:    the total value.
+            message:    the message, a McpToolContext envelope or plain text.
+
+        Return:
+            the tool event.
+        """
+        envelope: Any = None
+        if message is not None and message.startswith("{"):
+            try:
+                envelope = json.loads(message)
+            except Exception:
+                envelope = None
+
+        # partial content.
+        if isinstance(envelope, dict) and envelope.get("type") == "content":
+            return McpToolEvent("content", progress, total, text = envelope.get("text"))
+
+        # progress.
+        if isinstance(envelope, dict) and envelope.get("type") == "progress":
+            message = envelope.get("message")
+
+        return McpToolEvent("progress", progress, total, message)
+
     async def callPrompt(self, name: str, args: Dict[str, str] | None = None) -> Any | None:
         """
         read the resource.
@@ -112,11 +236,12 @@ class McpClient:
         """
         # if open.
         if self.open:
-            return await self.session.get_prompt(name, arguments = args)
+            return await self.callWithPolicy("prompt", name, 
+                lambda: self.session.get_prompt(name, arguments = args))
         else:
             return None
 
-    async def callResource(self, uri: AnyUrl) -> Any | None:
+    async def callResource(self, uri: "AnyUrl") -> Any | None:
         """
         read the resource.
 
@@ -128,10 +253,210 @@ class McpClient:
         """
         # if open.
         if self.open:
-            return await self.session.read_resource(uri)
+            return await self.callWithPolicy("resource", str(uri), 
+                lambda: self.session.read_resource(uri))
         else:
             return None
 
+    def setPolicy(self, kind: str, name: str, policy: McpCallPolicy) -> None:
+        """
+        set the call policy of a tool, prompt or resource.
+
+        Args:
+            kind:    "tool", "prompt" or "resource".
+            name:    the tool or prompt name, the resource URI; "*" for every call of the kind.
+            policy:    the call policy.
+
+        Example:
+            client.setPolicy("resource", "sympy://{version}", McpCallPolicy(
+                timeout = timedelta(seconds=5), retries = 2, idempotent = True))
+        """
+        self.policies.setdefault(kind, {})[name] = policy
+
+    def getPolicy(self, kind: str, name: str) -> McpCallPolicy:
+        """
+        get the call policy of a tool, prompt or resource.
+
+        Args:
+            kind:    "tool", "prompt" or "resource".
+            name:    the tool or prompt name, the resource URI.
+
+        Return:
+            the name policy; else the kind policy; else the client timeout.
+        """
+        policies: Dict[str, McpCallPolicy] = self.policies.get(kind, {})
+        policy: McpCallPolicy | None = policies.get(name, policies.get("*"))
+
+        if policy is None:
+            return McpCallPolicy(self.timeout)
+        if policy.timeout is None:
+            policy = copy.copy(policy)
+            policy.timeout = self.timeout
+
+        # return the policy.
+        return policy
+
+    async def callWithPolicy(self, kind: str, name: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        send the request with the call policy timeout, retries and hedging.
+
+        Args:
+            kind:    "tool", "prompt" or "resource".
+            name:    the tool or prompt name, the resource URI.
+            request:    creates the session request.
+
+        Return:
+            the result.
+        """
+        policy: McpCallPolicy = self.getPolicy(kind, name)
+        attempts: int = 1 + policy.retries if policy.idempotent else 1
+        backoff: float = policy.backoff.total_seconds()
+
+        for attempt in range(attempts):
+            try:
+                if policy.idempotent and policy.hedgeDelay is not None:
+                    return await self.sendHedged(name, request, policy)
+                else:
+                    return await self.sendRequest(name, request, policy.timeout)
+
+            except Exception as e:
+                if attempt + 1 >= attempts or not self.isRetryable(e):
+                    raise
+
+                if (self.logEvent):
+                    self.logEvent("info", "retry", f"{kind} call retry {attempt + 1} of {policy.retries}", e)
+
+                # wait before the retry.
+                await asyncio.sleep(backoff)
+                backoff *= policy.backoffMultiplier
+
+    def isRetryable(self, error: Exception) -> bool:
+        """
+        can the call be retried after the error, timeouts and connection errors only.
+
+        Args:
+            error:    the call error.
+
+        Return:
+            true if retryable; else false.
+        """
+        import httpx
+        from mcp.shared.exceptions import McpError
+
+        if isinstance(error, McpError):
+            return error.error.code == httpx.codes.REQUEST_TIMEOUT
+
+        return isinstance(error, (TimeoutError, ConnectionError, httpx.TransportError,
+                                  anyio.BrokenResourceError, anyio.ClosedResourceError))
+
+    async def sendHedged(self, name: str, request: Callable[[], Awaitable[Any]], policy: McpCallPolicy) -> Any:
+        """
+        send the request, send a second identical request if there is no response
+        after the hedge delay, the first successful response is used, the other is cancelled.
+
+        Args:
+            name:    the tool or prompt name, the resource URI.
+            request:    creates the session request.
+            policy:    the call policy.
+
+        Return:
+            the result.
+        """
+        pending: set[asyncio.Task] = { asyncio.ensure_future(self.sendRequest(name, request, policy.timeout)) }
+        error: BaseException | None = None
+
+        try:
+            # wait for the first request.
+            done, pending = await asyncio.wait(pending, timeout = policy.hedgeDelay.total_seconds())
+
+            # no response yet, send the hedge request.
+            if len(done) <= 0:
+                pending.add(asyncio.ensure_future(self.sendRequest(name, request, policy.timeout)))
+
+            while len(done) > 0 or len(pending) > 0:
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+
+                if len(pending) <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, return_when = asyncio.FIRST_COMPLETED)
+
+            # all requests failed.
+            raise error
+        finally:
+            # cancel the slower request.
+            for task in pending:
+                task.cancel()
+            if len(pending) > 0:
+                with anyio.CancelScope(shield=True):
+                    await asyncio.gather(*pending, return_exceptions=True)
+
+    async def sendRequest(self, name: str, request: Callable[[], Awaitable[Any]], timeout: timedelta | None) -> Any:
+        """
+        send the request, if the call is cancelled or times out the
+        server is sent an MCP cancel notification so it stops the work.
+
+        Args:
+            name:    the tool or prompt name, the resource URI.
+            request:    creates the session request.
+            timeout:    the timeout.
+
+        Return:
+            the result.
+        """
+        # the ids of the requests this call sends, the session may send more than one,
+        # e.g. list tools to validate a result, they are sent one after the other.
+        requestIds: List[int] = []
+        token: contextvars.Token = sentRequestIds.set(requestIds)
+        self.calls += 1
+
+        try:
+            with anyio.fail_after(timeout.total_seconds() if timeout is not None else None):
+                return await request()
+
+        except TimeoutError:
+            # the server is still working on the last request.
+            if len(requestIds) > 0:
+                await self.sendCancelled(requestIds[-1], name, "timeout")
+            raise
+
+        except BaseException as e:
+            if isinstance(e, (asyncio.CancelledError, anyio.get_cancelled_exc_class())) and len(requestIds) > 0:
+                await self.sendCancelled(requestIds[-1], name, "cancelled")
+            raise
+
+        finally:
+            sentRequestIds.reset(token)
+
+    async def sendCancelled(self, requestId: int, name: str, reason: str) -> None:
+        """
+        send the MCP cancel notification for a request.
+
+        Args:
+            requestId:    the request id.
+            name:    the name of the tool
+            reason:    the reason.
+        """
+        if self.session is None:
+            return
+
+        from mcp import types
+
+        try:
+            # the caller is being cancelled, shield the send.
+            with anyio.CancelScope(shield=True):
+                await self.session.send_notification(types.ClientNotification(
+                    types.CancelledNotification(
+                        params = types.CancelledNotificationParams(requestId = requestId, reason = reason))))
+
+            if (self.logEvent):
+                self.logEvent("info", "cancel", f"tool call cancelled: {reason}", name)
+        except Exception as e:
+            if (self.logEvent):
+                self.logEvent("error", "cancel", "send cancelled notification", e)
+
     async def closeConnection(self):
         """
         disconnect from the MCP server.
@@ -164,6 +489,8 @@ class McpClient:
         # if not open.
         if not self.open:
             try:
+                from mcp import ClientSession, StdioServerParameters
+                from mcp.client.stdio import stdio_client
 
                 # only if JavaScript or Python
                 is_python = serverScriptPath.endswith('.py')
@@ -184,7 +511,7 @@ class McpClient:
                 # open a connection to the MCP server.
                 stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
                 self.read, self.write = stdio_transport
-                self.session = await self.exit_stack.enter_async_context(ClientSession(self.read, self.write))
+                self.session = await self.exit_stack.enter_async_context(ClientSession(self.read, McpRequestStream(self.write)))
 
                 # start session.
                 await self.session.initialize()
@@ -217,6 +544,8 @@ class McpClient:
         # if not open.
         if not self.open:
             try:
+                from mcp import ClientSession, StdioServerParameters
+                from mcp.client.stdio import stdio_client
 
                 # the command to execute
                 server_params = StdioServerParameters(
@@ -228,7 +557,7 @@ class McpClient:
                 # open a connection to the MCP server.
                 stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
                 self.read, self.write = stdio_transport
-                self.session = await self.exit_stack.enter_async_context(ClientSession(self.read, self.write))
+                self.session = await self.exit_stack.enter_async_context(ClientSession(self.read, McpRequestStream(self.write)))
 
                 # start session.
                 await self.session.initialize()
@@ -247,7 +576,7 @@ class McpClient:
                     self.logEvent("error", "open", "open connection stdio custom", e)
                 raise  # Re-throws the same exception
 
-    async def openConnectionStdioServerParam(self, server: StdioServerParameters):
+    async def openConnectionStdioServerParam(self, server: "StdioServerParameters"):
         """
         connect to the MCP server.
         start receiving messages on stdin and sending messages on stdout.
@@ -259,11 +588,13 @@ class McpClient:
         # if not open.
         if not self.open:
             try:
+                from mcp import ClientSession, StdioServerParameters
+                from mcp.client.stdio import stdio_client
 
                 # open a connection to the MCP server.
                 stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server))
                 self.read, self.write = stdio_transport
-                self.session = await self.exit_stack.enter_async_context(ClientSession(self.read, self.write))
+                self.session = await self.exit_stack.enter_async_context(ClientSession(self.read, McpRequestStream(self.write)))
 
                 # start session.
                 await self.session.initialize()
@@ -303,6 +634,8 @@ class McpClient:
         # if not open.
         if not self.open:
             try:
+                from mcp import ClientSession
+                from mcp.client.streamable_http import streamablehttp_client
                 http_transport = None
 
                 # open a connection to the MCP server.
@@ -315,7 +648,7 @@ class McpClient:
 
                 # get streams
                 self.read, self.write, _, = http_transport
-                self.session = await self.exit_stack.enter_async_context(ClientSession(self.read, self.write))
+                self.session = await self.exit_stack.enter_async_context(ClientSession(self.read, McpRequestStream(self.write)))
                 
                 # Initialize the connection
                 await self.session.initialize()
@@ -334,7 +667,7 @@ class McpClient:
                     self.logEvent("error", "open", "open connection http", e)
                 raise  # Re-throws the same exception
 
-    async def openConnectionHttpCustom(self, serverUrl: str, headers: Dict[str, str] | None = None, auth: httpx.Auth | None = None):
+    async def openConnectionHttpCustom(self, serverUrl: str, headers: Dict[str, str] | None = None, auth: "httpx.Auth | None" = None):
         """
         connect to the MCP server.
         start receiving messages on streamable HTTP.
@@ -356,6 +689,8 @@ class McpClient:
         # if not open.
         if not self.open:
             try:
+                from mcp import ClientSession
+                from mcp.client.streamable_http import streamablehttp_client
                 http_transport = None
 
                 # open a connection to the MCP server.
@@ -364,7 +699,7 @@ class McpClient:
                 
                 # get streams
                 self.read, self.write, _, = http_transport
-                self.session = await self.exit_stack.enter_async_context(ClientSession(self.read, self.write))
+                self.session = await self.exit_stack.enter_async_context(ClientSession(self.read, McpRequestStream(self.write)))
                 
                 # Initialize the connection
                 await self.session.initialize()
@@ -0,0 +1,380 @@
+import os
+import glob
+import uuid
+import asyncio
+
+from typing import Optional, Any, List, Union, Callable, Awaitable, Dict, Set, AsyncIterator
+from contextlib import asynccontextmanager
+
+from .McpClient import McpClient
+
+# the environment variable that marks each pooled server process.
+poolMarkerName: str = "NEQUEO_MCP_POOL_ID"
+
+def findChildProcess(marker: str) -> int | None:
+    """
+    find the child process started with the pool marker in its environment, Linux only.
+
+    Args:
+        marker:    the pool marker value.
+
+    Return:
+        the process id; else none.
+    """
+    entry: bytes = f"{poolMarkerName}={marker}".encode()
+    for path in glob.glob(f"/proc/{os.getpid()}/task/*/children"):
+        try:
+            with open(path) as file:
+                children: List[str] = file.read().split()
+        except OSError:
+            continue
+
+        for pid in children:
+            try:
+                with open(f"/proc/{pid}/environ", "rb") as file:
+                    if entry in file.read().split(b"\0"):
+                        return int(pid)
+            except OSError:
+                continue
+
+    return None
+
+def getProcessMemory(pid: int) -> int | None:
+    """
+    get the resident memory of the process, Linux only.
+
+    Args:
+        pid:    the process id.
+
+    Return:
+        the resident bytes; else none if the process has exited or is unknown.
+    """
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    return None
+
+# Model context protocol pooled client.
+class McpPooledClient:
+    """
+    Model context protocol pooled client, a connected client and its server process.
+    """
+    def __init__(self, client: McpClient):
+        """
+        Args:
+            client:    the client.
+        """
+        self.client = client
+
+        # init
+        self.pid: int | None = None
+        self.retired: asyncio.Event = asyncio.Event()
+
+    def __repr__(self):
+        return f"McpPooledClient(pid={self.pid}, " \
+            f"calls={self.client.calls}, " \
+            f"connected={self.client.isConnected()})"
+
+# Model context protocol client pool.
+class McpClientPool:
+    """
+    Model context protocol client pool.
+    keeps warm stdio servers of one script, each already started and initialized, so a client
+    is handed out without waiting for the interpreter, imports and the initialize request.
+    a server is replaced in the background once it has served the maximum number of calls,
+    uses more than the maximum memory or has exited.
+    """
+    def __init__(self,
+                 serverScriptPath: str,
+                 size: int = 2,
+                 maxCalls: int = 1000,
+                 maxMemory: int | None = None,
+                 clientFactory: Callable[[], McpClient] = McpClient,
+                 warmup: Callable[[McpClient], Awaitable[Any]] | None = None,
+                 acquireTimeout: float | None = 60.0,
+                 maxStartFailures: int = 5):
+        """
+        Args:
+            serverScriptPath:    the server script full path, a .py or .js file.
+            size:    the number of warm servers.
+            maxCalls:    the calls a server serves before it is replaced.
+            maxMemory:    the resident bytes above which a server is replaced; else no limit,
+                measured on Linux only.
+            clientFactory:    creates each client, e.g. a client class with its call policies.
+            warmup:    called with each new client before it is handed out, e.g. a first tool
+                call that loads what the server imports lazily.
+            acquireTimeout:    the seconds acquire waits for a server; else no limit.
+            maxStartFailures:    the consecutive failed server starts after which acquire fails
+                at once, until a server starts again.
+        """
+        self.serverScriptPath = serverScriptPath
+        self.size = size
+        self.maxCalls = maxCalls
+        self.maxMemory = maxMemory
+        self.clientFactory = clientFactory
+        self.warmup = warmup
+        self.acquireTimeout = acquireTimeout
+        self.maxStartFailures = maxStartFailures
+        self.logEvent: Callable[[str, str, str, Any], None] | None = None
+
+        # only if JavaScript or Python
+        if serverScriptPath.endswith('.py'):
+            self.command = "python"
+        elif serverScriptPath.endswith('.js'):
+            self.command = "node"
+        else:
+            raise ValueError("Server script must be a .py or .js file")
+
+        # init
+        self.idle: asyncio.Queue[McpPooledClient] | None = None
+        self.leased: Dict[int, McpPooledClient] = {}
+        self.tasks: Set[asyncio.Task] = set()
+        self.closing: bool = False
+        self.startFailures: int = 0
+        self.startError: BaseException | None = None
+
+        # set when acquire can not wait for a server, the pool is closing or the servers do not start.
+        self.unavailable: asyncio.Event = asyncio.Event()
+        self.metrics: Dict[str, int] = {
+            "started": 0,
+            "failed": 0,
+            "acquired": 0,
+            "recycledCalls": 0,
+            "recycledMemory": 0,
+            "recycledExited": 0
+        }
+
+    def __repr__(self):
+        return f"McpClientPool(serverScriptPath={self.serverScriptPath}, " \
+            f"size={self.size}, " \
+            f"idle={self.idle.qsize() if self.idle is not None else 0}, " \
+            f"leased={len(self.leased)}, " \
+            f"metrics={self.metrics})"
+
+    async def __aenter__(self) -> "McpClientPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def onEvent(self, event: Callable[[str, str, str, Any], None]) -> None:
+        """
+        subscribe to the on event.
+        Args:
+            event:   the log event handler.
+        """
+        self.logEvent = event
+
+    def getMetrics(self) -> Dict[str, int]:
+        """
+        get the pool metrics.
+
+        Return:
+            the metrics.
+        """
+        return dict(self.metrics)
+
+    async def start(self) -> None:
+        """
+        start the warm servers in the background, acquire waits for the first one.
+        """
+        if self.idle is not None:
+            return
+
+        self.idle = asyncio.Queue()
+        for _ in range(self.size):
+            task: asyncio.Task = asyncio.create_task(self.keepServer())
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def keepServer(self) -> None:
+        """
+        keep one pool slot filled, each server is closed by the task that opened it.
+        """
+        from mcp.client.stdio import get_default_environment
+
+        delay: float = 0.5
+        while not self.closing:
+            pooled: McpPooledClient = McpPooledClient(self.clientFactory())
+            marker: str = uuid.uuid4().hex
+
+            try:
+                await pooled.client.openConnectionStdioCustom(
+                    self.command, [self.serverScriptPath], { **get_default_environment(), poolMarkerName: marker })
+                if self.warmup is not None:
+                    await self.warmup(pooled.client)
+            except Exception as e:
+                self.metrics["failed"] += 1
+                self.startFailures += 1
+                self.startError = e
+                if self.startFailures >= self.maxStartFailures:
+                    self.unavailable.set()
+                if (self.logEvent):
+                    self.logEvent("error", "pool", "start server", e)
+
+                # a failing script is not restarted in a tight loop.
+                await pooled.client.closeConnection()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+
+            delay = 0.5
+            pooled.pid = findChildProcess(marker)
+            self.metrics["started"] += 1
+            self.startFailures = 0
+            if not self.closing:
+                self.unavailable.clear()
+
+            # wait until the server is replaced.
+            if not self.closing:
+                self.idle.put_nowait(pooled)
+                await pooled.retired.wait()
+
+            await pooled.client.closeConnection()
+
+    def isExited(self, pooled: McpPooledClient) -> bool:
+        """
+        has the server exited or lost its connection.
+
+        Args:
+            pooled:    the pooled client.
+
+        Return:
+            true if exited; else false.
+        """
+        if not pooled.client.isConnected():
+            return True
+        return pooled.pid is not None and getProcessMemory(pooled.pid) is None
+
+    def checkAvailable(self) -> None:
+        """
+        raise if acquire can not wait for a server.
+        """
+        if self.closing:
+            raise RuntimeError("the pool is closed")
+        if self.startFailures >= self.maxStartFailures and self.idle.empty():
+            raise RuntimeError(f"the server failed to start {self.startFailures} times: {self.startError}")
+
+    async def getIdle(self, timeout: float | None) -> McpPooledClient:
+        """
+        wait for an idle server, until the timeout or the pool is unavailable.
+
+        Args:
+            timeout:    the seconds to wait; else no limit.
+
+        Return:
+            the pooled client.
+        """
+        if not self.idle.empty():
+            return self.idle.get_nowait()
+
+        getter: asyncio.Task = asyncio.create_task(self.idle.get())
+        unavailable: asyncio.Task = asyncio.create_task(self.unavailable.wait())
+        try:
+            await asyncio.wait([getter, unavailable], timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            # the caller is cancelled, a server already taken goes back.
+            unavailable.cancel()
+            if not getter.cancel() and not getter.cancelled() and getter.exception() is None:
+                self.idle.put_nowait(getter.result())
+            raise
+
+        unavailable.cancel()
+        if getter.done():
+            return getter.result()
+        getter.cancel()
+
+        # the wait was given up, a server that is idle by now is still handed out.
+        if not self.idle.empty():
+            return self.idle.get_nowait()
+        self.checkAvailable()
+        raise TimeoutError(f"no server within {self.acquireTimeout} seconds")
+
+    async def acquire(self) -> McpClient:
+        """
+        get a connected client, wait for a server if none is idle.
+        raises TimeoutError after acquireTimeout seconds, and RuntimeError when the pool is closed
+        or the server failed to start maxStartFailures times in a row.
+
+        Return:
+            the client, give it back with release.
+        """
+        self.checkAvailable()
+        await self.start()
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        deadline: float | None = loop.time() + self.acquireTimeout if self.acquireTimeout is not None else None
+        while True:
+            self.checkAvailable()
+            pooled: McpPooledClient = await self.getIdle(max(0.0, deadline - loop.time()) if deadline is not None else None)
+            if not self.isExited(pooled):
+                break
+
+            self.metrics["recycledExited"] += 1
+            pooled.retired.set()
+
+        self.metrics["acquired"] += 1
+        self.leased[id(pooled.client)] = pooled
+        return pooled.client
+
+    def release(self, client: McpClient) -> None:
+        """
+        give the client back, the server is replaced if it has reached a limit.
+
+        Args:
+            client:    the client from acquire.
+        """
+        pooled: McpPooledClient = self.leased.pop(id(client))
+        memory: int | None = getProcessMemory(pooled.pid) if pooled.pid is not None else None
+
+        if self.closing:
+            pooled.retired.set()
+        elif self.isExited(pooled):
+            self.metrics["recycledExited"] += 1
+            pooled.retired.set()
+        elif client.calls >= self.maxCalls:
+            self.metrics["recycledCalls"] += 1
+            pooled.retired.set()
+        elif self.maxMemory is not None and memory is not None and memory > self.maxMemory:
+            self.metrics["recycledMemory"] += 1
+            if (self.logEvent):
+                self.logEvent("info", "pool", f"server using {memory} bytes replaced", pooled.pid)
+            pooled.retired.set()
+        else:
+            self.idle.put_nowait(pooled)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[McpClient]:
+        """
+        use a client from the pool.
+
+        Example:
+            async with pool.connection() as client:
+                result = await client.callTool("MathExpressionEvaluator", {"expression": "x**2"})
+        """
+        client: McpClient = await self.acquire()
+        try:
+            yield client
+        finally:
+            self.release(client)
+
+    async def close(self) -> None:
+        """
+        close the servers, waits for the leased clients to be released.
+        """
+        self.closing = True
+        self.unavailable.set()
+        if self.idle is None:
+            return
+
+        while not self.idle.empty():
+            self.idle.get_nowait().retired.set()
+
+        # wait for the servers to close.
+        await asyncio.gather(*list(self.tasks), return_exceptions=True)
@@ -1,9 +1,14 @@
-from tkinter import NO
-from typing import Optional, Any, List, Union, Dict, Callable
+import asyncio
+
+from typing import Optional, Any, List, Union, Dict, Callable, Tuple, TYPE_CHECKING
 
-from .McpClient import McpClient
-from .McpServerBase import McpServerBase
 from .McpTypes import McpTool, McpFunctionTool
+from .McpToolIndex import McpToolIndex
+
+# clients and servers are only held by the host, imported for type checking.
+if TYPE_CHECKING:
+    from .McpClient import McpClient
+    from .McpServerBase import McpServerBase
 
 # Model context protocol client model.
 class McpClientModel:
@@ -12,7 +17,7 @@ class McpClientModel:
     """
     def __init__(self,
                  id: str,
-                 client: McpClient):
+                 client: "McpClient"):
         self.id = id
         self.client = client
 
@@ -27,7 +32,7 @@ class McpServerModel:
     """
     def __init__(self,
                  id: str,
-                 server: McpServerBase):
+                 server: "McpServerBase"):
         self.id = id
         self.server = server
 
@@ -45,6 +50,7 @@ class McpHost:
         self.mcpClients: List[McpClientModel] = []
         self.mcpServers: List[McpServerModel] = []
         self.mcpFunctionTools: List[McpFunctionTool] = []
+        self.mcpToolIndex: McpToolIndex = McpToolIndex()
 
         self.logEvent: Callable[[str, str, str, Any], None] | None = None
 
@@ -83,7 +89,7 @@ class McpHost:
         """
         return self.mcpFunctionTools
 
-    def addClient(self, id: str, client: McpClient):
+    def addClient(self, id: str, client: "McpClient"):
         """
         add an MCP client.
 
@@ -96,7 +102,7 @@ class McpHost:
                 client
             ))
 
-    def addServer(self, id: str, server: McpServerBase):
+    def addServer(self, id: str, server: "McpServerBase"):
         """
         add an MCP server.
 
@@ -118,7 +124,7 @@ class McpHost:
             clientId: the mcp client Id.
             serverId: the mcp server Id.
         """
-        self.mcpFunctionTools.append(McpFunctionTool(
+        functionTool: McpFunctionTool = McpFunctionTool(
                 clientId,
                 serverId,
                 "function",
@@ -127,7 +133,48 @@ class McpHost:
                 True,
                 tool.inputSchema,
                 tool.parameters
-            ))
+            )
+        self.mcpFunctionTools.append(functionTool)
+        self.mcpToolIndex.addTool(functionTool)
+
+    def removeFunctionTool(self, name: str) -> bool:
+        """
+        remove an MCP function tool.
+
+        Args:
+            name: the unique name.
+
+        Return:
+            true if removed; else false.
+        """
+        count: int = len(self.mcpFunctionTools)
+        self.mcpFunctionTools = [tool for tool in self.mcpFunctionTools if tool.name != name]
+        self.mcpToolIndex.removeTool(name)
+
+        # return
+        return len(self.mcpFunctionTools) < count
+
+    def selectTools(self, query: str, k: int) -> List[McpFunctionTool]:
+        """
+        select the function tools most relevant to the query.
+
+        Args:
+            query: the query text, e.g. the user prompt.
+            k: the maximum number of tools.
+
+        Return:
+            list of function tools, most relevant first.
+        """
+        selected: List[McpFunctionTool] = []
+
+        # for each match
+        for name, score in self.mcpToolIndex.search(query, k):
+            tool: McpFunctionTool | None = self.mcpToolIndex.getTool(name)
+            if tool is not None:
+                selected.append(tool)
+
+        # return
+        return selected
 
     def findClient(self, id: str) -> McpClientModel | None:
         """
@@ -198,6 +245,59 @@ class McpHost:
         # return
         return functionTool
 
+    async def callFunctionTool(self, name: str, args: Dict[str, Any] | None = None) -> Any | None:
+        """
+        call an MCP function tool on the server or client that owns it.
+
+        Args:
+            name: the unique name.
+            args: the arguments
+
+        Return:
+            the result; else none.
+        """
+        # try find tool
+        tool: McpFunctionTool | None = self.findFunctionTool(name)
+        if tool is None:
+            return None
+
+        # find the server.
+        serverModel: McpServerModel | None = self.findServer(tool.serverId)
+        if serverModel is not None:
+            return await serverModel.server.callTool(name, args)
+
+        # find the client.
+        clientModel: McpClientModel | None = self.findClient(tool.clientId)
+        if clientModel is not None:
+            return await clientModel.client.callTool(name, args)
+
+        # return
+        return None
+
+    async def callFunctionTools(self, calls: List[Tuple[str, Dict[str, Any] | None]]) -> List[Any | Exception]:
+        """
+        call many MCP function tools concurrently.
+
+        Args:
+            calls: the list of (name, args) tool calls.
+
+        Return:
+            the list of results in call order, a failed call returns its exception.
+        """
+        # run all calls at once.
+        results: List[Any | Exception] = await asyncio.gather(
+            *[self.callFunctionTool(name, args) for name, args in calls],
+            return_exceptions=True)
+
+        # log the failures.
+        for (name, _), result in zip(calls, results):
+            if isinstance(result, Exception):
+                if (self.logEvent):
+                    self.logEvent("error", "tools", f"call function tool {name}", result)
+
+        # return
+        return results
+
     async def closeAll(self) -> None:
         """
         close this host and all clients and servers.
@@ -208,6 +308,7 @@ class McpHost:
         self.mcpClients = []
         self.mcpServers = []
         self.mcpFunctionTools = []
+        self.mcpToolIndex.clear()
 
         self.logEvent = None
 
@@ -237,7 +338,7 @@ class McpHost:
                 if (self.logEvent):
                     self.logEvent("error", "close", "close client", e)
 
-    async def addServerFunctionTools(self, id: str, mcpServer: McpServerBase) -> None:
+    async def addServerFunctionTools(self, id: str, mcpServer: "McpServerBase") -> None:
         """
         add the server function tools.
 
@@ -255,7 +356,7 @@ class McpHost:
         for tool in tools:
             self.addFunctionTool(tool, "", id)
 
-    def addClientFunctionTools(self, id: str, mcpClient: McpClient) -> None:
+    def addClientFunctionTools(self, id: str, mcpClient: "McpClient") -> None:
         """
         add the client function tools.
 
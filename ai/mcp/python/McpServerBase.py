@@ -1,10 +1,13 @@
+import json
+import math
+
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
 
 from pydantic import AnyUrl, TypeAdapter, BaseModel, Field
 from typing import Optional, Any, List, Union, Callable, Awaitable, Dict
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
 from mcp.server.fastmcp.tools.base import Tool
 from mcp.server.fastmcp.resources import Resource
 from mcp.server.fastmcp.resources.types import FunctionResource
@@ -13,6 +16,86 @@ from mcp.server.fastmcp.resources.templates import ResourceTemplate
 
 from .McpTypes import McpTool, McpPrompt, McpResource, McpToolParameters
 
+# Model context protocol tool context.
+class McpToolContext:
+    """
+    Model context protocol tool context.
+    lets a running tool report progress and send partial content to the client,
+    both are sent as MCP progress notifications for the calling request.
+    """
+    def __init__(self, context: Context | None, chunkSize: int = 4096):
+        """
+        Args:
+            context:    the FastMCP context injected into the tool (a "ctx: Context" argument).
+            chunkSize:    the maximum characters per content chunk.
+        """
+        self.context = context
+        self.chunkSize = chunkSize
+        self.progress: float | None = None
+        self.total: float | None = None
+
+    def __repr__(self):
+        return f"McpToolContext(progress={self.progress}, " \
+            f"total={self.total}, " \
+            f"chunkSize={self.chunkSize})"
+
+    def canReport(self) -> bool:
+        """
+        can notifications be sent, only when the client asked for progress.
+
+        Return:
+            true if the request has a progress token; else false.
+        """
+        try:
+            meta: Any = self.context.request_context.meta
+            return meta is not None and meta.progressToken is not None
+        except Exception:
+            # called outside of a request, e.g. McpServerBase.callTool.
+            return False
+
+    async def notify(self, progress: float, message: Dict[str, Any]) -> None:
+        """
+        send a progress notification.
+
+        Args:
+            progress:    the progress value.
+            message:    the message envelope.
+        """
+        if not self.canReport():
+            return
+
+        # progress must increase with each notification.
+        if self.progress is None or progress > self.progress:
+            self.progress = progress
+        else:
+            self.progress = math.nextafter(self.progress, math.inf)
+
+        await self.context.report_progress(self.progress, self.total, json.dumps(message))
+
+    async def reportProgress(self, progress: float, total: float | None = None, message: str | None = None) -> None:
+        """
+        report the tool progress.
+
+        Args:
+            progress:    the progress value, e.g. 24.
+            total:    the total value, e.g. 100.
+            message:    the progress message, e.g. "evaluating".
+        """
+        if total is not None:
+            self.total = total
+
+        await self.notify(progress, { "type": "progress", "message": message })
+
+    async def sendContent(self, text: str) -> None:
+        """
+        send partial content, large text is split into chunks.
+
+        Args:
+            text:    the partial text content.
+        """
+        for start in range(0, len(text), self.chunkSize):
+            await self.notify(self.progress if self.progress is not None else 0.0, { "type": "content", "text": text[start:start + self.chunkSize] })
+
 # Model context protocol server base.
 class McpServerBase:
     """
@@ -23,7 +106,8 @@ class McpServerBase:
                  version: str,
                  instructions: str,
                  capabilities: Any,
-                 stateless: bool = True):
+                 stateless: bool = True,
+                 jsonResponse: bool = True):
         """
         Args:
             name:    server name
@@ -31,6 +115,8 @@ class McpServerBase:
             instructions:    server instructions
             capabilities:    server capabilities
             stateless:       is http stateless: true: else false (default is true).
+            jsonResponse:    answer http requests with one JSON response: true; else an SSE stream
+                             that also carries the progress notifications (default is true).
 
         Example:
             name: "weather",
@@ -50,12 +136,13 @@ class McpServerBase:
         self.instructions = instructions
         self.capabilities = capabilities
         self.stateless = stateless
+        self.jsonResponse = jsonResponse
 
         # Create an MCP server
         self.mcp: FastMCP = FastMCP(name=name, 
                                     instructions=instructions, 
                                     stateless_http=stateless, 
-                                    json_response=True)
+                                    json_response=jsonResponse)
         self.mcp._mcp_server.version = self.version
 
     def __repr__(self):
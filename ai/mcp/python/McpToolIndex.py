@@ -0,0 +1,228 @@
+import re
+import math
+import heapq
+
+from typing import Optional, Any, List, Union, Dict, Tuple
+
+from .McpTypes import McpFunctionTool
+
+# Model context protocol tool index.
+class McpToolIndex:
+    """
+    Model context protocol tool index.
+    BM25 index over the tool name, description and schema property names,
+    tools are added and removed incrementally.
+    """
+
+    # common words that do not help to select a tool.
+    stopWords = frozenset([
+        "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+        "it", "of", "on", "or", "that", "the", "this", "to", "use", "with"
+    ])
+
+    def __init__(self,
+                 k1: float = 1.2,
+                 b: float = 0.75,
+                 nameWeight: int = 3,
+                 propertyWeight: int = 2):
+        """
+        Args:
+            k1:    BM25 term frequency saturation.
+            b:    BM25 document length normalisation.
+            nameWeight:    the number of times name terms are counted.
+            propertyWeight:    the number of times schema property names are counted.
+        """
+        self.k1 = k1
+        self.b = b
+        self.nameWeight = nameWeight
+        self.propertyWeight = propertyWeight
+
+        # init
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.tools: Dict[str, McpFunctionTool] = {}
+        self.lengths: Dict[str, int] = {}
+        self.terms: Dict[str, Dict[str, int]] = {}
+        self.totalLength: int = 0
+
+    def __repr__(self):
+        return f"McpToolIndex(tools={len(self.lengths)}, " \
+            f"terms={len(self.postings)})"
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    @staticmethod
+    def tokenize(text: str | None) -> List[str]:
+        """
+        split text into lower case terms, CamelCase and snake_case names are split.
+
+        Args:
+            text:    the text.
+
+        Return:
+            the list of terms.
+        """
+        if not text:
+            return []
+
+        # split words, then split each word on case changes.
+        terms: List[str] = []
+        for word in re.findall(r"[A-Za-z0-9]+", text):
+            parts: List[str] = re.findall(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+", word)
+            for part in parts:
+                term: str = part.lower()
+                if term not in McpToolIndex.stopWords:
+                    terms.append(term)
+
+            # keep the whole compound word as well.
+            if len(parts) > 1:
+                terms.append(word.lower())
+
+        # return the terms.
+        return terms
+
+    def getToolTerms(self, tool: McpFunctionTool) -> Dict[str, int]:
+        """
+        get the weighted term frequencies of a tool.
+
+        Args:
+            tool:    the function tool.
+
+        Return:
+            the term frequencies.
+        """
+        frequencies: Dict[str, int] = {}
+
+        def add(terms: List[str], weight: int) -> None:
+            for term in terms:
+                frequencies[term] = frequencies.get(term, 0) + weight
+
+        # the name and description.
+        add(self.tokenize(tool.name), self.nameWeight)
+        add(self.tokenize(tool.description), 1)
+
+        # the schema property names.
+        parameters: Dict[str, Any] | None = None
+        if tool.parameters is not None and tool.parameters.parameters is not None:
+            parameters = tool.parameters.parameters
+        elif isinstance(tool.inputSchema, dict):
+            parameters = tool.inputSchema
+
+        if parameters is not None:
+            properties: Any = parameters.get("properties")
+            if isinstance(properties, dict):
+                for name in properties.keys():
+                    add(self.tokenize(name), self.propertyWeight)
+
+        # return the term frequencies.
+        return frequencies
+
+    def addTool(self, tool: McpFunctionTool) -> None:
+        """
+        add or replace a tool.
+
+        Args:
+            tool:    the function tool, the name is the unique key.
+        """
+        # replace an existing tool.
+        if tool.name in self.lengths:
+            self.removeTool(tool.name)
+
+        frequencies: Dict[str, int] = self.getToolTerms(tool)
+        length: int = sum(frequencies.values())
+
+        # update postings.
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[tool.name] = frequency
+
+        self.tools[tool.name] = tool
+        self.terms[tool.name] = frequencies
+        self.lengths[tool.name] = length
+        self.totalLength += length
+
+    def removeTool(self, name: str) -> bool:
+        """
+        remove a tool.
+
+        Args:
+            name:    the unique name.
+
+        Return:
+            true if removed; else false.
+        """
+        frequencies: Dict[str, int] | None = self.terms.pop(name, None)
+        if frequencies is None:
+            return False
+
+        # update postings.
+        for term in frequencies.keys():
+            posting: Dict[str, int] = self.postings[term]
+            posting.pop(name, None)
+            if len(posting) <= 0:
+                del self.postings[term]
+
+        del self.tools[name]
+        self.totalLength -= self.lengths.pop(name)
+        return True
+
+    def clear(self) -> None:
+        """
+        remove all tools.
+        """
+        self.postings = {}
+        self.tools = {}
+        self.lengths = {}
+        self.terms = {}
+        self.totalLength = 0
+
+    def getTool(self, name: str) -> McpFunctionTool | None:
+        """
+        get an indexed tool.
+
+        Args:
+            name:    the unique name.
+
+        Return:
+            the function tool; else none.
+        """
+        return self.tools.get(name)
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """
+        search the most relevant tools.
+
+        Args:
+            query:    the query text.
+            k:    the maximum number of tools.
+
+        Return:
+            the list of (name, score), best first.
+        """
+        count: int = len(self.lengths)
+        if count <= 0 or k <= 0:
+            return []
+
+        # constant parts of the length normalisation.
+        k1: float = self.k1
+        base: float = k1 * (1.0 - self.b)
+        scale: float = k1 * self.b * count / self.totalLength if self.totalLength > 0 else 0.0
+        lengths: Dict[str, int] = self.lengths
+        scores: Dict[str, float] = {}
+
+        # score each distinct query term.
+        for term in set(self.tokenize(query)):
+            posting: Dict[str, int] | None = self.postings.get(term)
+            if posting is None:
+                continue
+
+            frequency: int = len(posting)
+            idf: float = math.log(1.0 + (count - frequency + 0.5) / (frequency + 0.5))
+
+            weight: float = idf * (k1 + 1.0)
+
+            for name, termFrequency in posting.items():
+                scores[name] = scores.get(name, 0.0) + \
+                    weight * termFrequency / (termFrequency + base + scale * lengths[name])
+
+        # return the top k.
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
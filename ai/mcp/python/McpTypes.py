@@ -1,5 +1,8 @@
-from pydantic import AnyUrl, TypeAdapter
-from typing import Optional, Any, List, Union, Dict
+from datetime import timedelta
+from typing import Optional, Any, List, Union, Dict, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pydantic import AnyUrl
 
 # Model context protocol tool parameters.
 class McpToolParameters:
@@ -67,7 +70,7 @@ class McpResource:
                  name: str,
                  title: str,
                  description: str,
-                 uri: AnyUrl,
+                 uri: "AnyUrl",
                  mimeType: str):
         self.name = name
         self.title = title
@@ -128,4 +131,69 @@ class McpFunctionTool:
             f"description={self.description}, " \
             f"strict={self.strict}, " \
             f"inputSchema={self.inputSchema}, " \
-            f"parameters={self.parameters})"
\ No newline at end of file
+            f"parameters={self.parameters})"
+
+# Model context protocol tool event.
+class McpToolEvent:
+    """
+    Model context protocol tool event.
+    a streamed tool call yields "progress" and "content" events, then one "result" event.
+    """
+    def __init__(self,
+                 type: str,
+                 progress: float | None = None,
+                 total: float | None = None,
+                 message: str | None = None,
+                 text: str | None = None,
+                 result: Any | None = None):
+        self.type = type
+        self.progress = progress
+        self.total = total
+        self.message = message
+        self.text = text
+        self.result = result
+
+    def __repr__(self):
+        return f"McpToolEvent(type={self.type}, " \
+            f"progress={self.progress}, " \
+            f"total={self.total}, " \
+            f"message={self.message}, " \
+            f"text={self.text}, " \
+            f"result={self.result})"
+
+# Model context protocol call policy.
+class McpCallPolicy:
+    """
+    Model context protocol call policy, for a tool, prompt or resource.
+    retries and hedging only apply when the operation is idempotent.
+    """
+    def __init__(self,
+                 timeout: timedelta | None = None,
+                 retries: int = 0,
+                 backoff: timedelta = timedelta(milliseconds=200),
+                 backoffMultiplier: float = 2.0,
+                 hedgeDelay: timedelta | None = None,
+                 idempotent: bool = False):
+        """
+        Args:
+            timeout:    the call timeout; else the client timeout.
+            retries:    the number of retries after a timeout or connection error.
+            backoff:    the delay before the first retry.
+            backoffMultiplier:    the delay multiplier for each further retry.
+            hedgeDelay:    send a second identical request if no response after this delay.
+            idempotent:    the operation can safely run more than once.
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoffMultiplier = backoffMultiplier
+        self.hedgeDelay = hedgeDelay
+        self.idempotent = idempotent
+
+    def __repr__(self):
+        return f"McpCallPolicy(timeout={self.timeout}, " \
+            f"retries={self.retries}, " \
+            f"backoff={self.backoff}, " \
+            f"backoffMultiplier={self.backoffMultiplier}, " \
+            f"hedgeDelay={self.hedgeDelay}, " \
+            f"idempotent={self.idempotent})"
@@ -0,0 +1,226 @@
+import time
+import anyio
+import asyncio
+import multiprocessing
+
+from typing import Optional, Any, List, Union, Callable, Dict
+
+def runWorker(connection: Any) -> None:
+    """
+    the worker process loop, run each (function, args) job and send back the result.
+
+    Args:
+        connection:    the worker end of the pipe.
+    """
+    while True:
+        try:
+            job: Any = connection.recv()
+        except EOFError:
+            break
+
+        # stop.
+        if job is None:
+            break
+
+        function, args = job
+        try:
+            connection.send((True, function(*args)))
+        except Exception as e:
+            connection.send((False, e))
+
+# Model context protocol worker.
+class McpWorker:
+    """
+    Model context protocol worker, one process.
+    """
+    def __init__(self, context: Any):
+        """
+        Args:
+            context:    the multiprocessing context.
+        """
+        self.connection, workerConnection = context.Pipe()
+        self.process = context.Process(target=runWorker, args=(workerConnection,), daemon=True)
+        self.process.start()
+        workerConnection.close()
+
+    def __repr__(self):
+        return f"McpWorker(pid={self.process.pid}, " \
+            f"alive={self.process.is_alive()})"
+
+    def kill(self) -> None:
+        """
+        kill the worker process, the running job is abandoned.
+        """
+        try:
+            self.process.kill()
+            self.process.join(5)
+        finally:
+            self.connection.close()
+
+    def stop(self) -> None:
+        """
+        stop the worker process once it is idle.
+        """
+        try:
+            self.connection.send(None)
+            self.process.join(5)
+        except Exception:
+            self.process.kill()
+        finally:
+            self.connection.close()
+
+# Model context protocol worker pool.
+class McpWorkerPool:
+    """
+    Model context protocol worker pool.
+    runs blocking work in worker processes, when the awaiting call is cancelled
+    (e.g. an MCP cancel notification) the worker is killed so the compute is reclaimed.
+    """
+    def __init__(self, size: int = 2, startMethod: str = "spawn"):
+        """
+        Args:
+            size:    the maximum number of worker processes.
+            startMethod:    the multiprocessing start method.
+        """
+        self.size = size
+        self.context = multiprocessing.get_context(startMethod)
+        self.logEvent: Callable[[str, str, str, Any], None] | None = None
+
+        # init
+        self.idle: List[McpWorker] = []
+        self.count: int = 0
+        self.available: asyncio.Condition | None = None
+        self.metrics: Dict[str, float] = {
+            "calls": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "workersKilled": 0,
+            "computeSeconds": 0.0,
+            "cancelledSeconds": 0.0
+        }
+
+    def __repr__(self):
+        return f"McpWorkerPool(size={self.size}, " \
+            f"workers={self.count}, " \
+            f"metrics={self.metrics})"
+
+    def onEvent(self, event: Callable[[str, str, str, Any], None]) -> None:
+        """
+        subscribe to the on event.
+        Args:
+            event:   the log event handler.
+        """
+        self.logEvent = event
+
+    def getMetrics(self) -> Dict[str, float]:
+        """
+        get the pool metrics.
+        cancelledSeconds is the compute spent on calls before they were cancelled,
+        each cancelled call kills its worker so no compute is spent after the cancel.
+
+        Return:
+            the metrics.
+        """
+        return dict(self.metrics)
+
+    async def acquire(self) -> McpWorker:
+        """
+        get an idle worker, start a new one if the pool is not full.
+
+        Return:
+            the worker.
+        """
+        if self.available is None:
+            self.available = asyncio.Condition()
+
+        async with self.available:
+            while len(self.idle) <= 0 and self.count >= self.size:
+                await self.available.wait()
+
+            if len(self.idle) > 0:
+                return self.idle.pop()
+
+            self.count += 1
+
+        # start outside the lock.
+        try:
+            return await anyio.to_thread.run_sync(McpWorker, self.context)
+        except BaseException:
+            with anyio.CancelScope(shield=True):
+                await self.release(None)
+            raise
+
+    async def release(self, worker: McpWorker | None) -> None:
+        """
+        return a worker to the pool, none if the worker was killed.
+
+        Args:
+            worker:    the worker.
+        """
+        async with self.available:
+            if worker is None:
+                self.count -= 1
+            else:
+                self.idle.append(worker)
+            self.available.notify()
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        run the function in a worker process.
+
+        Args:
+            function:    a module level (picklable) function.
+            args:    the picklable arguments.
+
+        Return:
+            the function result, the function exception is re-raised.
+        """
+        worker: McpWorker = await self.acquire()
+        start: float = time.perf_counter()
+        self.metrics["calls"] += 1
+
+        try:
+            worker.connection.send((function, args))
+
+            # wait in a thread, the wait is abandoned if this call is cancelled.
+            ok, value = await anyio.to_thread.run_sync(worker.connection.recv, abandon_on_cancel=True)
+
+        except BaseException as e:
+            elapsed: float = time.perf_counter() - start
+
+            # cancelled or broken, kill the worker to stop the computation.
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(worker.kill)
+                await self.release(None)
+
+            self.metrics["workersKilled"] += 1
+            if isinstance(e, (asyncio.CancelledError, anyio.get_cancelled_exc_class())):
+                self.metrics["cancelled"] += 1
+                self.metrics["cancelledSeconds"] += elapsed
+                if (self.logEvent):
+                    self.logEvent("info", "cancel", f"worker killed after {elapsed:.3f} seconds", function.__name__)
+            else:
+                self.metrics["failed"] += 1
+            raise
+
+        await self.release(worker)
+        self.metrics["computeSeconds"] += time.perf_counter() - start
+
+        # return the result.
+        if ok:
+            self.metrics["completed"] += 1
+            return value
+        else:
+            self.metrics["failed"] += 1
+            raise value
+
+    def close(self) -> None:
+        """
+        stop all idle workers.
+        """
+        for worker in self.idle:
+            worker.stop()
+
+        self.count -= len(self.idle)
+        self.idle = []
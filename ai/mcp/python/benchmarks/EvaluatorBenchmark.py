@@ -0,0 +1,69 @@
+import time
+import argparse
+import statistics
+
+from typing import List, Dict, Tuple, Callable
+
+from sympy import sympify
+
+from ..servers.SymPyNumeric import evaluateNumeric
+
+# the classes of evaluator input, each (expression, precision).
+inputs: Dict[str, List[Tuple[str, int]]] = {
+    "arithmetic": [("2*3 + 4/7", 15), ("(1 + 2)**10 - 17 % 5", 15), ("1/3 + 1/7 - 0.25", 15), ("2^16/3", 15)],
+    "functions": [("sin(0.5) + exp(2)", 15), ("sqrt(2)*log(10)", 15), ("atan2(1, 2) + cos(pi/3)", 15), ("gamma(4.5)", 15)],
+    "precision 50": [("sqrt(2)", 50), ("pi*E", 50), ("exp(1)/3", 50), ("log(10, 2)", 50)],
+    "precision 500": [("sqrt(2)", 500), ("pi*E", 500), ("exp(1)/3", 500), ("atan(1)*4", 500)],
+    "symbolic": [("integrate(x**2, x)", 15), ("sin(pi)", 15), ("sqrt(-4)", 15), ("diff(sin(x)*x, x)", 15)]
+}
+
+def evaluateSymPy(expression: str, precision: int) -> str:
+    """
+    evaluate with SymPy only.
+    """
+    return str(sympify(expression).evalf(precision))
+
+def evaluateFast(expression: str, precision: int) -> str:
+    """
+    evaluate with the fast path, SymPy when it is not a plain numeric expression.
+    """
+    result: str | None = evaluateNumeric(expression, precision)
+    return result if result is not None else evaluateSymPy(expression, precision)
+
+def measure(function: Callable[[str, int], str], items: List[Tuple[str, int]], repeat: int) -> List[float]:
+    """
+    measure the latency of each call in microseconds.
+    """
+    latencies: List[float] = []
+    for _ in range(repeat):
+        for expression, precision in items:
+            start: float = time.perf_counter()
+            function(expression, precision)
+            latencies.append((time.perf_counter() - start) * 1000000.0)
+
+    return sorted(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluator fast path benchmark.")
+    parser.add_argument('--repeat', type=int, default=200, help='Passes over each input class')
+    args = parser.parse_args()
+
+    # warm up the imports and caches.
+    for items in inputs.values():
+        measure(evaluateFast, items, 1)
+        measure(evaluateSymPy, items, 1)
+
+    print(f"{'input':<14} {'fast path':>9} {'sympy p50 us':>13} {'fast p50 us':>12} {'fast p95 us':>12} {'speedup':>8}")
+    for name, items in inputs.items():
+        hits: int = sum(1 for expression, precision in items if evaluateNumeric(expression, precision) is not None)
+        sympy: List[float] = measure(evaluateSymPy, items, args.repeat)
+        fast: List[float] = measure(evaluateFast, items, args.repeat)
+        print(f"{name:<14} {hits:>4}/{len(items):<4} " \
+              f"{statistics.median(sympy):>13.1f} " \
+              f"{statistics.median(fast):>12.1f} " \
+              f"{fast[int(len(fast) * 0.95)]:>12.1f} " \
+              f"{statistics.median(sympy) / statistics.median(fast):>7.1f}x")
+
+# python -m nequeo.ai.mcp.benchmarks.EvaluatorBenchmark
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+
+from typing import List, Dict, Tuple
+
+from ..McpClient import McpClient
+
+# the package root, e.g. nequeo.ai.mcp.
+package: str = __package__.rsplit(".", 1)[0]
+
+# the modules imported by hosts, clients and the spawned stdio server.
+modules: List[str] = [ "McpTypes", "McpClient", "McpHost", "McpServerBase", "servers.SymPyMath" ]
+
+# the stdio server, started the way a client spawns it.
+serverScript: str = f"from {package}.servers.SymPyMath import mainSymPyMathServer; mainSymPyMathServer()"
+
+def measureImport(module: str) -> Tuple[float, Dict[str, float]]:
+    """
+    import the module in a new interpreter with -X importtime.
+
+    Return:
+        the cumulative import milliseconds and the self milliseconds of each imported module.
+    """
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {package}.{module}"],
+                             capture_output=True, text=True, check=True)
+
+    # import time: self [us] | cumulative | imported package
+    selfTimes: Dict[str, float] = {}
+    cumulative: float = 0.0
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        selfText, cumulativeText, name = line[len("import time:"):].split("|")
+        selfTimes[name.strip()] = int(selfText) / 1000.0
+        if name.strip() == f"{package}.{module}":
+            cumulative = int(cumulativeText) / 1000.0
+
+    return cumulative, selfTimes
+
+async def measureSpawn() -> float:
+    """
+    spawn the SymPy stdio server and wait for the tool list, as McpClient.openConnectionStdio does.
+
+    Return:
+        the milliseconds until the client is connected.
+    """
+    client: McpClient = McpClient()
+    start: float = time.perf_counter()
+    await client.openConnectionStdioCustom(sys.executable, ["-c", serverScript], dict(os.environ))
+    elapsed: float = (time.perf_counter() - start) * 1000.0
+    await client.closeConnection()
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time and stdio server spawn benchmark.")
+    parser.add_argument('--repeat', type=int, default=5, help='Runs of each measurement')
+    parser.add_argument('--top', type=int, default=10, help='Slowest modules imported by the server')
+    args = parser.parse_args()
+
+    print(f"{'module':<20} {'import p50 ms':>14}")
+    serverTimes: Dict[str, List[float]] = {}
+    for module in modules:
+        runs: List[Tuple[float, Dict[str, float]]] = [measureImport(module) for _ in range(args.repeat)]
+        print(f"{module:<20} {statistics.median(run[0] for run in runs):>14.1f}")
+        if module == modules[-1]:
+            for _, selfTimes in runs:
+                for name, milliseconds in selfTimes.items():
+                    serverTimes.setdefault(name, []).append(milliseconds)
+
+    spawn: List[float] = [asyncio.run(measureSpawn()) for _ in range(args.repeat)]
+    print(f"\nstdio server spawn to tool list: p50 {statistics.median(spawn):.1f} ms, max {max(spawn):.1f} ms")
+
+    # the heaviest self import time, what a spawned server pays before it answers.
+    print(f"\n{'server import, self':<48} {'p50 ms':>8}")
+    slowest = sorted(serverTimes.items(), key=lambda item: statistics.median(item[1]), reverse=True)[:args.top]
+    for name, milliseconds in slowest:
+        print(f"{name:<48} {statistics.median(milliseconds):>8.1f}")
+
+# python -m nequeo.ai.mcp.benchmarks.ImportTimeBenchmark
+if __name__ == "__main__":
+    main()
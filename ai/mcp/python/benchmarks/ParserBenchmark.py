@@ -0,0 +1,59 @@
+import time
+import argparse
+import statistics
+
+from typing import List, Dict, Callable, Any
+
+from sympy import sympify
+
+from ..servers.SymPyParser import SymPyParser
+
+# the classes of parser input.
+inputs: Dict[str, List[str]] = {
+    "numeric": ["2*3 + 4/7", "(1 + 2)**10 - 17 % 5", "sqrt(2)*log(10)", "0.25 + 1e-3"],
+    "polynomial": ["x**2 + 2*x*y + y**2", "3*x**5 - 2*x**3 + x - 7", "(x + 1)**3*(y - 2)", "x^4 - y^4"],
+    "functions": ["sin(x)**2 + cos(x)**2", "exp(-x**2/2)/sqrt(2*pi)", "atan2(y, x) + Abs(x - y)", "log(x, 2) + gamma(x)"],
+    "calculus": ["Integral(x**2, (x, 0, 1))", "Derivative(sin(x)*x, x)", "Sum(1/k**2, (k, 1, oo))", "Limit(sin(x)/x, x, 0)"]
+}
+
+def measure(parse: Callable[[str], Any], items: List[str], repeat: int) -> List[float]:
+    """
+    measure the latency of each parse in microseconds.
+    """
+    latencies: List[float] = []
+    for _ in range(repeat):
+        for expression in items:
+            start: float = time.perf_counter()
+            parse(expression)
+            latencies.append((time.perf_counter() - start) * 1000000.0)
+
+    return sorted(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description="Restricted parser against sympify benchmark.")
+    parser.add_argument('--repeat', type=int, default=200, help='Passes over each input class')
+    args = parser.parse_args()
+
+    # no cache, every call parses; and the default cache.
+    uncached: SymPyParser = SymPyParser(cacheSize=0)
+    cached: SymPyParser = SymPyParser()
+
+    # both must build the same trees.
+    for items in inputs.values():
+        for expression in items:
+            if uncached.parse(expression) != sympify(expression):
+                raise ValueError(f"different tree for {expression}")
+
+    print(f"{'input':<12} {'sympify p50 us':>15} {'parser p50 us':>14} {'cached p50 us':>14} {'speedup':>8}")
+    for name, items in inputs.items():
+        sympy: List[float] = measure(sympify, items, args.repeat)
+        parse: List[float] = measure(uncached.parse, items, args.repeat)
+        cache: List[float] = measure(cached.parse, items, args.repeat)
+        print(f"{name:<12} {statistics.median(sympy):>15.1f} " \
+              f"{statistics.median(parse):>14.1f} " \
+              f"{statistics.median(cache):>14.1f} " \
+              f"{statistics.median(sympy) / statistics.median(parse):>7.1f}x")
+
+# python -m nequeo.ai.mcp.benchmarks.ParserBenchmark
+if __name__ == "__main__":
+    main()
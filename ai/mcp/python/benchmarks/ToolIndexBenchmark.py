@@ -0,0 +1,81 @@
+import time
+import random
+import argparse
+import statistics
+
+from typing import List
+
+from ..McpTypes import McpFunctionTool, McpToolParameters
+from ..McpToolIndex import McpToolIndex
+
+# the vocabulary used to generate tools.
+words: List[str] = [
+    "math", "expression", "integral", "derivative", "matrix", "weather", "city", "forecast",
+    "search", "document", "learn", "azure", "file", "read", "write", "image", "vision", "text",
+    "translate", "language", "stock", "price", "calendar", "event", "email", "send", "user",
+    "account", "invoice", "order", "shipping", "database", "query", "table", "vector", "index",
+    "latex", "series", "solve", "equation", "plot", "graph", "audio", "video", "cache", "token"
+]
+
+def createTool(id: int, rand: random.Random) -> McpFunctionTool:
+    """
+    create a random tool.
+
+    Args:
+        id:    the tool id.
+        rand:    the random generator.
+
+    Return:
+        the tool.
+    """
+    name: str = "".join(word.capitalize() for word in rand.sample(words, 3)) + str(id)
+    description: str = " ".join(rand.choices(words, k=12))
+    properties = { word: { "type": "string" } for word in rand.sample(words, 3) }
+
+    # return the tool.
+    return McpFunctionTool("", "benchmark", "function", name, description, True, None,
+                           McpToolParameters({ "type": "object", "properties": properties }))
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool index selection benchmark.")
+    parser.add_argument('--tools', type=int, default=10000, help='Number of tools')
+    parser.add_argument('--queries', type=int, default=1000, help='Number of queries')
+    parser.add_argument('--k', type=int, default=8, help='Tools selected per query')
+    args = parser.parse_args()
+
+    rand: random.Random = random.Random(7)
+    tools: List[McpFunctionTool] = [createTool(i, rand) for i in range(args.tools)]
+    queries: List[str] = [" ".join(rand.choices(words, k=8)) for _ in range(args.queries)]
+
+    # build.
+    index: McpToolIndex = McpToolIndex()
+    start: float = time.perf_counter()
+    for tool in tools:
+        index.addTool(tool)
+    build: float = time.perf_counter() - start
+
+    # select.
+    latencies: List[float] = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, args.k)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+
+    # incremental update.
+    start = time.perf_counter()
+    for tool in tools[:1000]:
+        index.removeTool(tool.name)
+        index.addTool(tool)
+    update: float = (time.perf_counter() - start) * 1000.0 / 1000
+
+    latencies.sort()
+    print(f"tools: {args.tools}, terms: {len(index.postings)}")
+    print(f"build: {build * 1000.0:.1f} ms")
+    print(f"update (remove + add): {update:.3f} ms per tool")
+    print(f"select k={args.k}: mean {statistics.mean(latencies):.3f} ms, " \
+          f"p50 {latencies[len(latencies) // 2]:.3f} ms, " \
+          f"p95 {latencies[int(len(latencies) * 0.95)]:.3f} ms")
+
+# python -m nequeo.ai.mcp.benchmarks.ToolIndexBenchmark --tools 10000
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+from datetime import timedelta
+from typing import Optional, Any, List, Union, Dict, AsyncIterator
+
+from ..McpClient import McpClient
+from ..McpTypes import McpToolEvent, McpCallPolicy
+
+# Local Model text generation.
+class LocalModel(McpClient):
+    """
+    Local Model text generation.
+    """
+    def __init__(self):
+        super().__init__()
+
+        # a generation waits for its batch and can be long, a sampled completion differs each time.
+        self.setPolicy("tool", "GenerateText", McpCallPolicy(
+            timeout = timedelta(seconds=600)))
+
+        # prompts and resources are cheap, fail fast and retry.
+        self.setPolicy("prompt", "*", McpCallPolicy(
+            timeout = timedelta(seconds=10), retries = 2, idempotent = True))
+        self.setPolicy("resource", "*", McpCallPolicy(
+            timeout = timedelta(seconds=5), retries = 2, idempotent = True))
+
+    async def callGenerateTextTool(self, prompt: str, maxTokens: int | None = None, temperature: float | None = None) -> Union[Any, None]:
+        """
+        call the generate text tool.
+
+        Args:
+            prompt: the prompt to complete.
+            maxTokens: the maximum number of generated tokens; else the server default.
+            temperature: the sampling temperature; else greedy.
+
+        Return:
+            the generated text.
+        """
+        res: Any = await self.callTool("GenerateText", args=self.getGenerateTextArgs(prompt, maxTokens, temperature))
+
+        # return the result.
+        return res
+
+    async def callGenerateTextToolStream(self, prompt: str, maxTokens: int | None = None, temperature: float | None = None) -> AsyncIterator[McpToolEvent]:
+        """
+        call the generate text tool, yield the text while it is generated.
+
+        Args:
+            prompt: the prompt to complete.
+            maxTokens: the maximum number of generated tokens; else the server default.
+            temperature: the sampling temperature; else greedy.
+
+        Return:
+            the progress and content events, then the "result" event.
+        """
+        async for event in self.callToolStream("GenerateText", args=self.getGenerateTextArgs(prompt, maxTokens, temperature)):
+            yield event
+
+    def getGenerateTextArgs(self, prompt: str, maxTokens: int | None, temperature: float | None) -> Dict[str, Any]:
+        """
+        get the generate text tool arguments.
+        """
+        args: Dict[str, Any] = {"prompt": prompt}
+        if maxTokens is not None:
+            args["max_tokens"] = maxTokens
+        if temperature is not None:
+            args["temperature"] = temperature
+        return args
+
+    async def callGenerateTextPrompt(self, text: str) -> Union[Any, None]:
+        """
+        call the generate text prompt.
+
+        Args:
+            text: the text to complete.
+
+        Return:
+            the prompt result.
+        """
+        res: Any = await self.callPrompt("GenerateText", args={"text": text})
+
+        # return the result.
+        return res
+
+    async def callMetricsResource(self) -> Union[Any, None]:
+        """
+        call the engine metrics resource.
+
+        Return:
+            the resource result.
+        """
+        res: Any = await self.callResource("localmodel://metrics")
+
+        # return the result.
+        return res
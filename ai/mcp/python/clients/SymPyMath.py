@@ -1,6 +1,8 @@
-from typing import Optional, Any, List, Union
+from datetime import timedelta
+from typing import Optional, Any, List, Union, Dict, AsyncIterator
 
 from ..McpClient import McpClient
+from ..McpTypes import McpToolEvent, McpCallPolicy
 
 # SymPy Math Expression Evaluator.
 class SymPyMath(McpClient):
@@ -10,17 +12,127 @@ class SymPyMath(McpClient):
     def __init__(self):
         super().__init__()
 
-    async def callMathExpressionEvaluatorTool(self, expression: str) -> Union[Any, None]:
+        # expressions such as integrals can take a long time, the result is the same each time.
+        self.setPolicy("tool", "MathExpressionEvaluator", McpCallPolicy(
+            timeout = timedelta(seconds=300), idempotent = True))
+        self.setPolicy("tool", "MathExpressionNativeEvaluator", McpCallPolicy(
+            timeout = timedelta(seconds=120), idempotent = True))
+        self.setPolicy("tool", "SeriesExpansion", McpCallPolicy(
+            timeout = timedelta(seconds=300), idempotent = True))
+        self.setPolicy("tool", "MathTranslator", McpCallPolicy(
+            timeout = timedelta(seconds=30), retries = 1, idempotent = True))
+        self.setPolicy("tool", "MathTranslatorBatch", McpCallPolicy(
+            timeout = timedelta(seconds=300), idempotent = True))
+
+        # prompts and resources are cheap, fail fast and retry.
+        self.setPolicy("prompt", "*", McpCallPolicy(
+            timeout = timedelta(seconds=10), retries = 2, idempotent = True))
+        self.setPolicy("resource", "*", McpCallPolicy(
+            timeout = timedelta(seconds=5), retries = 2, idempotent = True))
+
+    async def callMathExpressionEvaluatorTool(self, expression: str, precision: int | None = None) -> Union[Any, None]:
         """
         call the math expression evaluator tool.
 
         Args:
             expression: the math expression.
+            precision: the number of significant digits; else the server default.
 
         Return:
             the evaluated expression.
         """
-        res: Any = await self.callTool("MathExpressionEvaluator", args={"expression": expression})
+        args: Dict[str, Any] = {"expression": expression}
+        if precision is not None:
+            args["precision"] = precision
+
+        res: Any = await self.callTool("MathExpressionEvaluator", args=args)
+
+        # return the result.
+        return res
+
+    async def callMathExpressionEvaluatorToolStream(self, expression: str) -> AsyncIterator[McpToolEvent]:
+        """
+        call the math expression evaluator tool, yield progress while it is evaluated.
+
+        Args:
+            expression: the math expression.
+
+        Return:
+            the progress events, then the "result" event.
+        """
+        async for event in self.callToolStream("MathExpressionEvaluator", args={"expression": expression}):
+            yield event
+
+    async def callMathExpressionNativeEvaluatorTool(self, expression: str, values: Dict[str, List[float]]) -> Union[Any, None]:
+        """
+        call the math expression native evaluator tool.
+
+        Args:
+            expression: the math expression.
+            values: the values of each symbol.
+
+        Return:
+            the JSON results and the engine used.
+        """
+        res: Any = await self.callTool("MathExpressionNativeEvaluator", args={"expression": expression, "values": values})
+
+        # return the result.
+        return res
+
+    async def callSeriesExpansionTool(self, 
+                                      expression: str, 
+                                      variable: str = "x", 
+                                      point: str = "0", 
+                                      order: int = 6, 
+                                      format: str = "sympy") -> Union[Any, None]:
+        """
+        call the series expansion tool.
+
+        Args:
+            expression: the math expression.
+            variable: the expansion variable.
+            point: the expansion point.
+            order: the order.
+            format: "sympy", "latex" or "mathematica".
+
+        Return:
+            the series.
+        """
+        res: Any = await self.callTool("SeriesExpansion", args={"expression": expression, "variable": variable, "point": point, "order": order, "format": format})
+
+        # return the result.
+        return res
+
+    async def callMathTranslatorTool(self, expression: str, fromFormat: str, toFormats: List[str]) -> Union[Any, None]:
+        """
+        call the math translator tool.
+
+        Args:
+            expression: the math expression.
+            fromFormat: the format of the expression, "latex", "sympy", "cpp", "javascript" or "mathematica".
+            toFormats: the formats to convert the expression to.
+
+        Return:
+            the JSON object of each format and converted expression.
+        """
+        res: Any = await self.callTool("MathTranslator", args={"expression": expression, "fromFormat": fromFormat, "toFormats": toFormats})
+
+        # return the result.
+        return res
+
+    async def callMathTranslatorBatchTool(self, expressions: List[str], fromFormat: str, toFormats: List[str]) -> Union[Any, None]:
+        """
+        call the math translator batch tool.
+
+        Args:
+            expressions: the math expressions.
+            fromFormat: the format of the expressions.
+            toFormats: the formats to convert the expressions to.
+
+        Return:
+            the JSON list of converted expressions, in expression order.
+        """
+        res: Any = await self.callTool("MathTranslatorBatch", args={"expressions": expressions, "fromFormat": fromFormat, "toFormats": toFormats})
 
         # return the result.
         return res
@@ -67,6 +179,18 @@ class SymPyMath(McpClient):
         # return the result.
         return res
 
+    async def callMetricsResource(self) -> Union[Any, None]:
+        """
+        call the evaluation worker metrics resource.
+
+        Return:
+            the resource result.
+        """
+        res: Any = await self.callResource("sympy://metrics")
+
+        # return the result.
+        return res
+
     async def callSymPyDocsUrlVersionResource(self, version: str) -> Union[Any, None]:
         """
         call the SymPy documentation URL resource.
@@ -0,0 +1,50 @@
+# Mcp item, config: mcp
+class McpItem:
+    """
+    Mcp item, config: mcp.
+    """
+    def __init__(self,
+                 query: str,
+                 provider: str = "openai",
+                 model: str = "gpt-5-mini",
+                 max_output_tokens: int | None = None,
+                 temperature: float | None = None,
+                 top_p: float | None = None,
+                 max_turns: int = 8,
+                 max_tools: int | None = None,
+                 api_key: str | None = None,
+                 base_url: str | None = None):
+        """
+        Args:
+            query:    the user query.
+            provider:    the AI provider, e.g. "openai".
+            model:    the model name.
+            max_output_tokens:    the maximum output tokens per request.
+            temperature:    the sampling temperature.
+            top_p:    the nucleus sampling probability.
+            max_turns:    the maximum number of model requests in the tool loop.
+            max_tools:    send only the most relevant tools for the query; else all tools.
+            api_key:    the provider API key.
+            base_url:    the provider base URL, e.g. a local model server.
+        """
+        self.query = query
+        self.provider = provider
+        self.model = model
+        self.max_output_tokens = max_output_tokens
+        self.temperature = temperature
+        self.top_p = top_p
+        self.max_turns = max_turns
+        self.max_tools = max_tools
+        self.api_key = api_key
+        self.base_url = base_url
+
+    def __repr__(self):
+        return f"McpItem(query={self.query}, " \
+            f"provider={self.provider}, " \
+            f"model={self.model}, " \
+            f"max_output_tokens={self.max_output_tokens}, " \
+            f"temperature={self.temperature}, " \
+            f"top_p={self.top_p}, " \
+            f"max_turns={self.max_turns}, " \
+            f"max_tools={self.max_tools}, " \
+            f"base_url={self.base_url})"
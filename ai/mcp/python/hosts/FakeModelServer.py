@@ -0,0 +1,187 @@
+import json
+import asyncio
+import argparse
+import threading
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Any, List, Union, Dict, Tuple
+
+from .AiTypes import McpItem
+from .openai import executeQueryOpenAI
+from ..McpHost import McpHost
+from ..servers.SymPyMath import SymPyMath
+
+# Fake model server.
+class FakeModelServer:
+    """
+    Fake model server, an OpenAI compatible /v1/responses endpoint that answers with scripted turns.
+    each turn is a list of (name, arguments) function calls, or the answer text.
+    """
+    def __init__(self, turns: List[Union[str, List[Tuple[str, Dict[str, Any]]]]], repeat: bool = False):
+        """
+        Args:
+            turns:    the scripted model turns, in request order.
+            repeat:    repeat the last turn when the script runs out; else answer "done".
+        """
+        self.turns = turns
+        self.repeat = repeat
+
+        # init
+        self.requests: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+        self.server: ThreadingHTTPServer | None = None
+        self.thread: threading.Thread | None = None
+
+    def __repr__(self):
+        return f"FakeModelServer(turns={len(self.turns)}, " \
+            f"requests={len(self.requests)})"
+
+    def getResponse(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        get the response of the next scripted turn.
+
+        Args:
+            request:    the responses request.
+
+        Return:
+            the response.
+        """
+        with self.lock:
+            self.requests.append(request)
+            index: int = len(self.requests) - 1
+            turn: Any = self.turns[min(index, len(self.turns) - 1)] \
+                if index < len(self.turns) or (self.repeat and len(self.turns) > 0) else "done"
+
+        output: List[Dict[str, Any]] = []
+        if isinstance(turn, str):
+            output.append({
+                "type": "message", "id": f"msg_{index}", "role": "assistant", "status": "completed",
+                "content": [{ "type": "output_text", "text": turn, "annotations": [] }]
+            })
+        else:
+            output.extend({
+                "type": "function_call", "id": f"fc_{index}_{call}", "call_id": f"call_{index}_{call}",
+                "name": name, "arguments": json.dumps(arguments), "status": "completed"
+            } for call, (name, arguments) in enumerate(turn))
+
+        # return the response.
+        return {
+            "id": f"resp_{index}", "object": "response", "created_at": 0, "model": request.get("model"),
+            "status": "completed", "output": output, "parallel_tool_calls": True, "tool_choice": "auto", "tools": []
+        }
+
+    def start(self) -> str:
+        """
+        start the server on a free local port.
+
+        Return:
+            the base URL.
+        """
+        fake: FakeModelServer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body: bytes = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+                if self.path.rstrip("/") != "/v1/responses":
+                    self.send_error(404)
+                    return
+
+                data: bytes = json.dumps(fake.getResponse(json.loads(body))).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+        # return the base URL.
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def stop(self) -> None:
+        """
+        stop the server.
+        """
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+async def checkToolLoop(mcpHost: McpHost) -> List[str]:
+    """
+    run the OpenAI host loop against the fake model server.
+
+    Args:
+        mcpHost:    the mcp host.
+
+    Return:
+        the failed checks.
+    """
+    failed: List[str] = []
+    call: Tuple[str, Dict[str, Any]] = ("MathExpressionEvaluator", { "expression": "integrate(x**2, x)" })
+
+    # two tool calls in one turn, then the answer.
+    fake: FakeModelServer = FakeModelServer([[call, call], "x**3/3"])
+    try:
+        mcpPrompt: McpItem = McpItem("integrate x**2", model="fake-model", api_key="test", base_url=fake.start())
+        result, results = await executeQueryOpenAI(mcpPrompt, mcpHost)
+    finally:
+        fake.stop()
+
+    outputs: List[Dict[str, Any]] = fake.requests[-1]["input"] if len(fake.requests) == 2 else []
+    if result != "success" or len(results) != 3 or results[-1] != "x**3/3" \
+            or any(output.startswith("error") for output in results[:2]):
+        failed.append(f"tool turn: {result} {results}")
+    if [item.get("type") for item in outputs] != ["function_call_output"] * 2 \
+            or fake.requests[-1].get("previous_response_id") != "resp_0":
+        failed.append(f"tool outputs: {len(fake.requests)} requests, {outputs}")
+
+    # the model keeps calling tools, the turns run out.
+    fake = FakeModelServer([[call]], repeat=True)
+    try:
+        mcpPrompt = McpItem("integrate x**2", model="fake-model", api_key="test", base_url=fake.start(), max_turns=3)
+        result, results = await executeQueryOpenAI(mcpPrompt, mcpHost)
+    finally:
+        fake.stop()
+
+    if result != "error: no answer after 3 turns" or len(fake.requests) != 3 or len(results) != 3:
+        failed.append(f"max turns: {result} {results}")
+
+    # return the failed checks.
+    return failed
+
+async def mainCheck() -> int:
+    """
+    check the host loop.
+
+    Return:
+        the exit status.
+    """
+    mcpHost: McpHost = McpHost()
+    sympyMath: SymPyMath = SymPyMath()
+    sympyMath.register()
+    await mcpHost.addServerFunctionTools("sympyMath", sympyMath)
+
+    try:
+        failed: List[str] = await checkToolLoop(mcpHost)
+    finally:
+        sympyMath.workerPool.close()
+
+    for failure in failed:
+        print(f"failed: {failure}")
+    print("host loop: " + ("failed" if len(failed) > 0 else "passed"))
+    return 1 if len(failed) > 0 else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the OpenAI host loop against a fake model server.")
+    parser.parse_args()
+    raise SystemExit(asyncio.run(mainCheck()))
+
+# python -m nequeo.ai.mcp.hosts.FakeModelServer
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from ..McpHost import McpHost
+from ..servers.SymPyMath import SymPyMath
+from ..clients.MicrosoftLearn import MicrosoftLearn
+
+async def createMcpHost() -> McpHost:
+    """
+    create a new mcp host.
+    clients stay open for the life of the host, close with closeAll.
+
+    Return:
+        the host.
+    """
+    # create a new host.
+    mcpHost: McpHost = McpHost()
+
+    # load SymPy server
+    sympyMath: SymPyMath = SymPyMath()
+    sympyMath.register()
+    await mcpHost.addServerFunctionTools("sympyMath", sympyMath)
+
+    # load Microsoft Learn client
+    microsoftLearn: MicrosoftLearn = MicrosoftLearn()
+    await microsoftLearn.openMicrosoftLearn()
+    mcpHost.addClientFunctionTools("microsoftlearn", microsoftLearn)
+
+    # return the mcp host.
+    return mcpHost
@@ -0,0 +1,234 @@
+import json
+
+from openai import AsyncOpenAI
+from typing import Optional, Any, List, Union, Dict, Tuple
+
+from .AiTypes import McpItem
+from ..McpHost import McpHost
+from ..McpTypes import McpFunctionTool
+
+async def executeQueryOpenAI(mcpPrompt: McpItem, mcpHost: McpHost) -> Tuple[str, List[str]]:
+    """
+    execute query OpenAI.
+    the model is called in a loop, all function calls from one model turn are
+    executed concurrently and their outputs are sent back in one follow-up request.
+
+    Args:
+        mcpPrompt:    the query.
+        mcpHost:    the mcp host.
+
+    Return:
+        the (result, results) response.
+    """
+    result: str = ""
+    results: List[str] = []
+
+    try:
+        # open open ai, base_url can point at any compatible (or local fake) server.
+        openai = AsyncOpenAI(
+            api_key = mcpPrompt.api_key if mcpPrompt.api_key is not None else "OPENAI-API-KEY",
+            base_url = mcpPrompt.base_url)
+
+        # the tools
+        tools: List[Dict[str, Any]] = getTools(mcpHost, mcpPrompt.query, mcpPrompt.max_tools)
+        toolCalled: bool = False
+
+        # first request.
+        input: List[Dict[str, Any]] = [
+            {
+                "role": "user",
+                "content": mcpPrompt.query
+            }
+        ]
+        previousResponseId: str | None = None
+
+        # model/tool loop.
+        for turn in range(mcpPrompt.max_turns):
+
+            # run the AI
+            response = await openai.responses.create(**getRequest(mcpPrompt, input, tools, previousResponseId))
+
+            # get the function calls of this turn.
+            functionCalls: List[Any] = [
+                item for item in (response.output or []) if item.type == "function_call"
+            ]
+
+            # if no tool call, the model has answered.
+            if len(functionCalls) <= 0:
+                if response.output_text:
+                    results.append(response.output_text)
+                else:
+                    results.append("error: no response")
+                break
+
+            # execute all tool calls at once.
+            toolCalled = True
+            outputs: List[str] = await callTools(functionCalls, mcpHost)
+            results.extend(outputs)
+
+            # feed all outputs back in one request.
+            previousResponseId = response.id
+            input = [
+                {
+                    "type": "function_call_output",
+                    "call_id": functionCall.call_id,
+                    "output": output
+                }
+                for functionCall, output in zip(functionCalls, outputs)
+            ]
+        else:
+            # the model was still calling tools when the turns ran out.
+            raise RuntimeError(f"no answer after {mcpPrompt.max_turns} turns")
+
+        # return the result.
+        result = "success" if toolCalled else "info"
+
+    except Exception as e:
+        result = f"error: {e}"
+
+    # return the result.
+    return result, results
+
+def getRequest(mcpPrompt: McpItem,
+               input: List[Dict[str, Any]],
+               tools: List[Dict[str, Any]],
+               previousResponseId: str | None = None) -> Dict[str, Any]:
+    """
+    get the responses request arguments.
+
+    Args:
+        mcpPrompt:    the query.
+        input:    the request input items.
+        tools:    the list of tools.
+        previousResponseId:    the previous response id, if continuing a turn.
+
+    Return:
+        the request arguments.
+    """
+    request: Dict[str, Any] = {
+        "model": mcpPrompt.model,
+        "input": input
+    }
+
+    # optional settings.
+    if mcpPrompt.max_output_tokens is not None:
+        request["max_output_tokens"] = mcpPrompt.max_output_tokens
+    if mcpPrompt.temperature is not None:
+        request["temperature"] = mcpPrompt.temperature
+    if mcpPrompt.top_p is not None:
+        request["top_p"] = mcpPrompt.top_p
+    if len(tools) > 0:
+        request["tools"] = tools
+    if previousResponseId is not None:
+        request["previous_response_id"] = previousResponseId
+
+    # return the request.
+    return request
+
+def getTools(mcpHost: McpHost, query: str | None = None, maxTools: int | None = None) -> List[Dict[str, Any]]:
+    """
+    get the tools.
+
+    Args:
+        mcpHost:    the mcp host.
+        query:    the query used to select the relevant tools.
+        maxTools:    the maximum number of tools; else all tools.
+
+    Return:
+        the list of tools
+    """
+    tools: List[Dict[str, Any]] = []
+
+    # get the host.
+    functionTools: List[McpFunctionTool] = mcpHost.getFunctionTools()
+    if query is not None and maxTools is not None:
+        # a query that matches no indexed term keeps the first tools.
+        functionTools = mcpHost.selectTools(query, maxTools) or functionTools[:maxTools]
+
+    for tool in functionTools:
+        parameters: Dict[str, Any] = {}
+        if tool.parameters is not None and tool.parameters.parameters is not None:
+            parameters = tool.parameters.parameters
+
+        properties: Dict[str, Any] = parameters.get("properties", {})
+        required: List[str] = parameters.get("required", [])
+
+        # add to tools, strict schemas must require every property.
+        tools.append({
+            "type": "function",
+            "name": tool.name,
+            "description": tool.description,
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": required,
+                "additionalProperties": False
+            },
+            "strict": set(required) == set(properties)
+        })
+
+    # return the tools
+    return tools
+
+async def callTools(functionCalls: List[Any], mcpHost: McpHost) -> List[str]:
+    """
+    execute the function calls of one model turn concurrently.
+
+    Args:
+        functionCalls:    the function call output items.
+        mcpHost:    the mcp host.
+
+    Return:
+        the list of tool outputs, in call order.
+    """
+    calls: List[Tuple[str, Dict[str, Any] | None]] = []
+    outputs: List[str] = []
+
+    # parse the arguments.
+    for functionCall in functionCalls:
+        try:
+            calls.append((functionCall.name, json.loads(functionCall.arguments or "{}")))
+        except Exception as e:
+            calls.append((functionCall.name, None))
+
+    # call all tools.
+    payloads: List[Any] = await mcpHost.callFunctionTools(calls)
+    for payload in payloads:
+        if isinstance(payload, BaseException):
+            outputs.append(f"error: {payload}")
+        elif payload is None:
+            outputs.append("error: tool not found")
+        else:
+            outputs.append(getResultText(payload))
+
+    # return the outputs
+    return outputs
+
+def getResultText(payload: Any) -> str:
+    """
+    get the text of a tool result.
+
+    Args:
+        payload:    the client (CallToolResult) or server (content, structured) result.
+
+    Return:
+        the result text.
+    """
+    content: Any = payload
+
+    # server tools return (content, structured).
+    if isinstance(content, tuple):
+        content = content[0]
+
+    # client tools return a call tool result.
+    if hasattr(content, "content"):
+        content = content.content
+
+    # join the text content.
+    if isinstance(content, (list, tuple)):
+        return "".join(
+            item.text for item in content if getattr(item, "type", None) == "text"
+        )
+
+    # return
+    return str(content)
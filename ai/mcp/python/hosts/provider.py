@@ -0,0 +1,23 @@
+from typing import Optional, Any, List, Union, Tuple
+
+from .openai import executeQueryOpenAI
+from .AiTypes import McpItem
+from ..McpHost import McpHost
+
+async def executeProvider(mcpPrompt: McpItem, mcpHost: McpHost) -> Tuple[str, List[str]]:
+    """
+    execute provider.
+
+    Args:
+        mcpPrompt:    the prompt.
+        mcpHost:    the mcp host.
+
+    Return:
+        the (result, results) response.
+    """
+    # select provider.
+    if mcpPrompt.provider.lower() == "openai":
+        # open ai
+        return await executeQueryOpenAI(mcpPrompt, mcpHost)
+    else:
+        return "error: provider not supported", [ "error: no result" ]
@@ -0,0 +1,275 @@
+import os
+import json
+import asyncio
+
+from typing import Optional, Any, List, Union, Callable, Awaitable, Dict, TYPE_CHECKING
+
+from mcp.server.fastmcp import Context
+from mcp.server.fastmcp.prompts.base import PromptArgument, Message, TextContent
+
+from ..McpServerBase import McpServerBase, McpToolContext
+from ..McpTypes import McpPromptHelper
+
+# torch and transformers are imported when the model is loaded.
+if TYPE_CHECKING:
+    from .LocalModelEngine import LocalModelEngine, LocalModelRequest
+
+# Local Model text generation.
+class LocalModel(McpServerBase):
+    """
+    Local model text generation, one model loaded in the server and shared by every client.
+    """
+    def __init__(self,
+                 modelName: str = "microsoft/phi-2",
+                 maxBatchSize: int = 8,
+                 maxWait: float = 0.02,
+                 maxTokens: int = 1024,
+                 prefixCacheSize: int = 16,
+                 dtype: str = "auto",
+                 threads: int | None = None):
+        """
+        Args:
+            modelName:    the model name or path.
+            maxBatchSize:    the maximum number of requests decoded together.
+            maxWait:    the seconds a request waits for others to batch with.
+            maxTokens:    the largest max_tokens a request can ask for.
+            prefixCacheSize:    the number of prompt layer caches kept for shared prefixes, 0 for none.
+            dtype:    the weight dtype, "auto" keeps the dtype of the weight files.
+            threads:    the torch intra-op threads; else the torch default.
+        """
+        super().__init__("LocalModel", "1.0.0", "Local model text generation",
+                         dict( resources={}, tools={}, prompts={}), jsonResponse=False)
+
+        self.modelName = modelName
+        self.maxBatchSize = maxBatchSize
+        self.maxWait = maxWait
+        self.maxTokens = maxTokens
+        self.prefixCacheSize = prefixCacheSize
+        self.dtype = dtype
+        self.threads = threads
+
+        # created by loadModel, before the server starts.
+        self.engine: "LocalModelEngine | None" = None
+
+    def loadModel(self) -> None:
+        """
+        load the model and start the engine, once.
+        """
+        if self.engine is not None:
+            return
+
+        from .LocalModelEngine import LocalModelEngine, loadLocalModel
+
+        model, tokenizer = loadLocalModel(self.modelName, self.dtype, self.threads)
+        self.engine = LocalModelEngine(model, tokenizer, self.maxBatchSize, self.maxWait, self.prefixCacheSize)
+
+        if (self.logEvent):
+            self.logEvent("info", "model", f"loaded {self.modelName}", self.engine)
+
+    def registerTool_GenerateText(self) -> bool:
+        """
+        register tool generate text.
+
+        Return:
+            true if tool registered; else false.
+        """
+        result: bool = self.registerTool(
+            "GenerateText",
+            self.generateText,
+            "Generate a completion of the prompt with the local model")
+
+        # if added
+        if (result):
+            # set parameters
+            self.setToolParameters("GenerateText", {
+                "type": "object",
+                "properties": {
+                    "prompt": {
+                        "type": "string",
+                        "description": "the prompt to complete"
+                    },
+                    "max_tokens": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "maximum": self.maxTokens,
+                        "description": "the maximum number of generated tokens, default 128"
+                    },
+                    "temperature": {
+                        "type": "number",
+                        "minimum": 0,
+                        "maximum": 2,
+                        "description": "the sampling temperature, 0 is greedy, default 0"
+                    }
+                },
+                "required": ["prompt"],
+                "additionalProperties": False
+            })
+        return result
+
+    def registerPrompt_GenerateText(self) -> bool:
+        """
+        register prompt generate text.
+
+        Return:
+            true if prompt registered; else false.
+        """
+        return self.registerPrompt(
+            "GenerateText",
+            self.generateTextPrompt,
+            "Complete the text with the local model",
+            [ PromptArgument(name = "text", description = "the text to complete", required = True) ]
+        )
+
+    def registerResource_Metrics(self) -> bool:
+        """
+        register resource engine metrics.
+
+        Return:
+            true if resource registered; else false.
+        """
+        return self.registerResource(
+            "LocalModelMetrics",
+            "localmodel://metrics",
+            self.localModelMetricsResource,
+            "Get the engine metrics, batches, tokens per second and time to first token",
+            "application/json"
+        )
+
+    def generateTextPrompt(self, text: str) -> List[Message]:
+        """
+        prompt generate text.
+
+        Args:
+            text:    the text to complete.
+
+        Return:
+            the prompt result.
+        """
+        return [
+            Message(
+                role = "user",
+                content = TextContent(
+                    type = "text",
+                    text = f"complete the text: {text}")
+            )
+        ]
+
+    async def generateText(self, prompt: str, ctx: Context, max_tokens: int = 128, temperature: float = 0.0) -> str:
+        """
+        generate text, concurrent calls are batched into the same forward passes.
+        the text is sent as partial content while it is generated.
+
+        Args:
+            prompt:    the prompt to complete.
+            ctx:    the tool context.
+            max_tokens:    the maximum number of generated tokens.
+            temperature:    the sampling temperature, 0 is greedy.
+
+        Return:
+            the generated text.
+        """
+        self.loadModel()
+
+        toolContext: McpToolContext = McpToolContext(ctx)
+        maxTokens: int = max(1, min(max_tokens, self.maxTokens))
+        request: "LocalModelRequest" = self.engine.submit(prompt, maxTokens, max(0.0, min(temperature, 2.0)))
+        parts: List[str] = []
+
+        try:
+            async for text in request.stream():
+                parts.append(text)
+                await toolContext.reportProgress(len(request.generated), maxTokens, "generating")
+                await toolContext.sendContent(text)
+        except asyncio.CancelledError:
+            # the request leaves its batch at the next step.
+            request.cancelled = True
+            raise
+
+        await toolContext.reportProgress(maxTokens, maxTokens, request.finishReason)
+
+        # return the result.
+        return "".join(parts)
+
+    def localModelMetricsResource(self) -> str:
+        """
+        engine metrics resource.
+
+        Return:
+            the resource result.
+        """
+        return json.dumps(self.engine.getMetrics() if self.engine is not None else {})
+
+    def stopServer(self):
+        """
+        stop the server and the engine.
+        """
+        if self.engine is not None:
+            self.engine.close()
+            self.engine = None
+        super().stopServer()
+
+    def register(self) -> bool:
+        """
+        register all tools, prompts, resources.
+
+        Return:
+            true if registered; else false.
+        """
+        registeredAll: bool = True
+
+        # ternary conditional statement.
+        # register tools.
+        registeredAll = True if (self.registerTool_GenerateText() and registeredAll) else False
+        registeredAll = True if (self.registerPrompt_GenerateText() and registeredAll) else False
+        registeredAll = True if (self.registerResource_Metrics() and registeredAll) else False
+
+        # if all registered.
+        return registeredAll
+
+    def getPromptHelpers(self) -> List[McpPromptHelper]:
+        """
+        get the list of prompt helpers.
+
+        Return:
+            the list of prompt helpers.
+        """
+        prompts: List[McpPromptHelper] = []
+
+        # add prompt.
+        prompts.append(McpPromptHelper(
+            "GenerateText",
+            "complete the text: {text}"
+        ))
+
+        # return the helper list.
+        return prompts
+
+# if main.
+def mainLocalModelServer(useStreamableHttp: bool = False, modelName: str | None = None) -> LocalModel | None:
+    """
+    start the local model server, the model is loaded before the server starts.
+
+    Args:
+            useStreamableHttp:    use streamable HTTP to receiving messages.
+            modelName:    the model name or path; else $LOCAL_MODEL_NAME, else microsoft/phi-2.
+    """
+    # start server.
+    localmodel_server = LocalModel(
+        modelName or os.environ.get("LOCAL_MODEL_NAME", "microsoft/phi-2"),
+        maxBatchSize = int(os.environ.get("LOCAL_MODEL_MAX_BATCH", "8")))
+
+    # if registered
+    if (localmodel_server.register()):
+        # load the model once, before the first client connects.
+        localmodel_server.loadModel()
+
+        # start server.
+        if (useStreamableHttp):
+            localmodel_server.startServerHttp()
+        else:
+            localmodel_server.startServerStdio()
+
+        # return the server.
+        return localmodel_server
+    else:
+        return None
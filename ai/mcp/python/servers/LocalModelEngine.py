@@ -0,0 +1,500 @@
+import time
+import queue
+import asyncio
+import threading
+
+from collections import OrderedDict
+from typing import Optional, Any, List, Tuple, Dict, Iterator, AsyncIterator
+
+import torch
+
+from transformers import AutoModelForCausalLM, AutoTokenizer, DynamicCache
+
+# the key and value tensors of each layer, [batch, heads, tokens, head size].
+LayerCache = List[Tuple[torch.Tensor, torch.Tensor]]
+
+def loadLocalModel(modelName: str, dtype: Any = "auto", threads: int | None = None) -> Tuple[Any, Any]:
+    """
+    load the model and tokenizer once, on CPU.
+
+    Args:
+        modelName:    the model name or path.
+        dtype:    the weight dtype, "auto" keeps the dtype of the weight files.
+        threads:    the torch intra-op threads; else the torch default.
+
+    Return:
+        the model and tokenizer.
+    """
+    if threads is not None and threads > 0:
+        torch.set_num_threads(threads)
+
+    torch.set_default_device("cpu")
+    model = AutoModelForCausalLM.from_pretrained(modelName, dtype=dtype, trust_remote_code=True)
+    tokenizer = AutoTokenizer.from_pretrained(modelName, trust_remote_code=True)
+    return model.eval(), tokenizer
+
+def sharedPrefix(a: Any, b: Any, limit: int) -> int:
+    """
+    the number of leading tokens a and b share, at most limit.
+    """
+    limit = min(limit, len(a), len(b))
+    for index in range(limit):
+        if a[index] != b[index]:
+            return index
+    return limit
+
+# Local model request.
+class LocalModelRequest:
+    """
+    Local model request, one prompt waiting for, or in, a batch.
+    the engine thread puts each text chunk on the queue, then an exception or none at the end.
+    a request submitted on an event loop is read with stream(), else by iterating it.
+    """
+    def __init__(self, prompt: str, maxTokens: int, temperature: float, loop: asyncio.AbstractEventLoop | None = None):
+        """
+        Args:
+            prompt:    the prompt.
+            maxTokens:    the maximum number of generated tokens.
+            temperature:    the sampling temperature, 0 is greedy.
+            loop:    the event loop of the caller; else none for a blocking caller.
+        """
+        self.prompt = prompt
+        self.maxTokens = maxTokens
+        self.temperature = temperature
+        self.loop = loop
+        self.queue: Any = asyncio.Queue() if loop is not None else queue.Queue()
+
+        self.submitted: float = time.perf_counter()
+        self.ids: List[int] = []
+        self.generated: List[int] = []
+        self.sent: int = 0
+        self.ttft: float | None = None
+        self.seconds: float = 0.0
+        self.finishReason: str | None = None
+
+        # set by the caller, e.g. the MCP request was cancelled; the request leaves its batch at the next step.
+        self.cancelled: bool = False
+
+    def __repr__(self):
+        return f"LocalModelRequest(maxTokens={self.maxTokens}, " \
+            f"tokens={len(self.generated)}, " \
+            f"finishReason={self.finishReason})"
+
+    def put(self, item: Any) -> None:
+        """
+        called by the engine thread: a text chunk, an exception, or none at the end.
+        """
+        if self.loop is None:
+            self.queue.put(item)
+            return
+
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, item)
+        except RuntimeError:
+            # the event loop is closed, nobody is waiting.
+            pass
+
+    async def stream(self) -> AsyncIterator[str]:
+        """
+        the text as it is generated, on the event loop.
+
+        Return:
+            the text chunks.
+        """
+        while True:
+            item: Any = await self.queue.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        the text as it is generated, blocking.
+        """
+        while True:
+            item: Any = self.queue.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+# Local model prefix cache.
+class LocalModelPrefixCache:
+    """
+    Local model prefix cache, the layer caches of recent prompts. a new prompt reuses the longest
+    token prefix it shares with one of them (e.g. the same file header or instructions) and
+    computes only the rest.
+    """
+    def __init__(self, maxEntries: int = 16, minTokens: int = 8):
+        """
+        Args:
+            maxEntries:    the maximum number of cached prompts, 0 for none.
+            minTokens:    the shortest prefix worth reusing.
+        """
+        self.maxEntries = maxEntries
+        self.minTokens = minTokens
+        self.entries: "OrderedDict[Tuple[int, ...], LayerCache]" = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __repr__(self):
+        return f"LocalModelPrefixCache(maxEntries={self.maxEntries}, " \
+            f"entries={len(self.entries)}, " \
+            f"hits={self.hits}, " \
+            f"misses={self.misses})"
+
+    def lookup(self, ids: List[int]) -> Tuple[int, LayerCache | None]:
+        """
+        find the longest cached prefix of the prompt.
+        at least the last prompt token is left to compute, its logits give the first new token.
+
+        Return:
+            the number of prompt tokens found and their layer cache; else 0 and none.
+        """
+        bestKey: Tuple[int, ...] | None = None
+        best: int = 0
+        for key in self.entries:
+            shared: int = sharedPrefix(key, ids, len(ids) - 1)
+            if shared > best:
+                bestKey, best = key, shared
+
+        if bestKey is None or best < self.minTokens:
+            self.misses += 1
+            return 0, None
+
+        self.hits += 1
+        self.entries.move_to_end(bestKey)
+        return best, [(keys[:, :, :best], values[:, :, :best]) for keys, values in self.entries[bestKey]]
+
+    def put(self, ids: List[int], layers: LayerCache) -> None:
+        """
+        cache the layer cache of the prompt, the least recently used prompt is dropped.
+        """
+        if self.maxEntries <= 0 or len(ids) < self.minTokens:
+            return
+
+        key: Tuple[int, ...] = tuple(ids)
+        self.entries[key] = layers
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxEntries:
+            self.entries.popitem(last=False)
+
+# Local model engine.
+class LocalModelEngine:
+    """
+    Local model engine, a model loaded once and shared by all callers.
+    requests that arrive within maxWait seconds of each other are decoded together,
+    up to maxBatchSize, so concurrent tool calls share each forward pass, and each prompt
+    reuses the layer cache of a prefix it shares with a recent prompt.
+    """
+    def __init__(self,
+                 model: Any,
+                 tokenizer: Any,
+                 maxBatchSize: int = 8,
+                 maxWait: float = 0.02,
+                 prefixCacheSize: int = 16,
+                 minPrefixTokens: int = 8):
+        """
+        Args:
+            model:    the causal language model.
+            tokenizer:    the tokenizer of the model.
+            maxBatchSize:    the maximum number of requests decoded together.
+            maxWait:    the seconds a request waits for others to batch with.
+            prefixCacheSize:    the number of prompt layer caches kept, 0 for none.
+            minPrefixTokens:    the shortest shared prefix that is reused.
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.maxBatchSize = maxBatchSize
+        self.maxWait = maxWait
+        self.prefixCache: LocalModelPrefixCache = LocalModelPrefixCache(prefixCacheSize, minPrefixTokens)
+        self.eosTokenId: int | None = tokenizer.eos_token_id
+        self.pending: "queue.Queue[LocalModelRequest | None]" = queue.Queue()
+        self.metrics: Dict[str, float] = {
+            "requests": 0,
+            "completed": 0,
+            "cancelled": 0,
+            "failed": 0,
+            "batches": 0,
+            "maxBatch": 0,
+            "promptTokens": 0,
+            "cachedPromptTokens": 0,
+            "generatedTokens": 0,
+            "prefillSeconds": 0.0,
+            "decodeSeconds": 0.0,
+            "ttftSeconds": 0.0
+        }
+
+        self.thread = threading.Thread(target=self.run, name="local-model-engine", daemon=True)
+        self.thread.start()
+
+    def __repr__(self):
+        return f"LocalModelEngine(maxBatchSize={self.maxBatchSize}, " \
+            f"maxWait={self.maxWait}, " \
+            f"pending={self.pending.qsize()}, " \
+            f"prefixCache={self.prefixCache})"
+
+    def submit(self, prompt: str, maxTokens: int = 128, temperature: float = 0.0) -> LocalModelRequest:
+        """
+        queue a prompt, on the event loop or from a blocking caller.
+
+        Args:
+            prompt:    the prompt.
+            maxTokens:    the maximum number of generated tokens.
+            temperature:    the sampling temperature, 0 is greedy.
+
+        Return:
+            the request, iterate request.stream() on the event loop, else the request, for the text.
+        """
+        try:
+            loop: asyncio.AbstractEventLoop | None = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        request: LocalModelRequest = LocalModelRequest(prompt, maxTokens, temperature, loop)
+        self.pending.put(request)
+        return request
+
+    def generate(self, prompt: str, maxTokens: int = 128, temperature: float = 0.0) -> str:
+        """
+        generate the whole text, blocking, not called on the event loop.
+
+        Args:
+            prompt:    the prompt.
+            maxTokens:    the maximum number of generated tokens.
+            temperature:    the sampling temperature, 0 is greedy.
+
+        Return:
+            the generated text.
+        """
+        return "".join(self.submit(prompt, maxTokens, temperature))
+
+    def getMetrics(self) -> Dict[str, float]:
+        """
+        get the engine metrics.
+        tokensPerSecond is the generated tokens over the time spent generating.
+
+        Return:
+            the metrics.
+        """
+        metrics: Dict[str, float] = dict(self.metrics)
+        busy: float = metrics["prefillSeconds"] + metrics["decodeSeconds"]
+        metrics["tokensPerSecond"] = metrics["generatedTokens"] / busy if busy > 0 else 0.0
+        metrics["meanBatch"] = metrics["requests"] / metrics["batches"] if metrics["batches"] > 0 else 0.0
+        metrics["meanTtftSeconds"] = metrics["ttftSeconds"] / metrics["completed"] if metrics["completed"] > 0 else 0.0
+        return metrics
+
+    def close(self) -> None:
+        """
+        finish the queued requests and stop the engine thread.
+        """
+        self.pending.put(None)
+        self.thread.join()
+
+    def run(self) -> None:
+        """
+        the engine thread loop.
+        """
+        while True:
+            batch: List[LocalModelRequest] | None = self.nextBatch()
+            if batch is None:
+                return
+
+            try:
+                with torch.inference_mode():
+                    self.generateBatch(batch)
+            except Exception as e:
+                for request in batch:
+                    if request.finishReason is None:
+                        request.finishReason = "error"
+                        self.metrics["failed"] += 1
+                        request.put(e)
+
+    def nextBatch(self) -> List[LocalModelRequest] | None:
+        """
+        wait for a request, then up to maxWait for others to batch with it.
+
+        Return:
+            the batch; else none to stop.
+        """
+        first: LocalModelRequest | None = self.pending.get()
+        if first is None:
+            return None
+
+        batch: List[LocalModelRequest] = [first]
+        deadline: float = time.perf_counter() + self.maxWait
+        while len(batch) < self.maxBatchSize:
+            timeout: float = deadline - time.perf_counter()
+            try:
+                request: LocalModelRequest | None = self.pending.get(timeout=timeout) if timeout > 0 else self.pending.get_nowait()
+            except queue.Empty:
+                break
+
+            # stop after this batch.
+            if request is None:
+                self.pending.put(None)
+                break
+            batch.append(request)
+
+        self.metrics["batches"] += 1
+        self.metrics["requests"] += len(batch)
+        self.metrics["maxBatch"] = max(self.metrics["maxBatch"], len(batch))
+        return batch
+
+    def nextToken(self, logits: torch.Tensor, temperature: float) -> int:
+        """
+        the next token, greedy or sampled.
+        """
+        if temperature <= 0:
+            return int(torch.argmax(logits))
+        probabilities: torch.Tensor = torch.softmax(logits.float() / temperature, dim=-1)
+        return int(torch.multinomial(probabilities, 1))
+
+    def finish(self, request: LocalModelRequest, reason: str) -> None:
+        """
+        end the request stream.
+        """
+        request.finishReason = reason
+        request.seconds = time.perf_counter() - request.submitted
+        if reason == "cancelled":
+            self.metrics["cancelled"] += 1
+        else:
+            self.metrics["completed"] += 1
+            self.metrics["generatedTokens"] += len(request.generated)
+            self.metrics["ttftSeconds"] += request.ttft or 0.0
+        request.put(None)
+
+    def emit(self, request: LocalModelRequest, token: int) -> bool:
+        """
+        send the new text of the request.
+
+        Return:
+            true when the request is finished.
+        """
+        if request.ttft is None:
+            request.ttft = time.perf_counter() - request.submitted
+
+        reason: str | None = None
+        if token == self.eosTokenId:
+            reason = "stop"
+        else:
+            request.generated.append(token)
+            if len(request.generated) >= request.maxTokens:
+                reason = "length"
+
+        # a byte-level token can end inside a character, it is sent with the next token.
+        text: str = self.tokenizer.decode(request.generated, skip_special_tokens=True)
+        if reason is not None or not text.endswith("�"):
+            if len(text) > request.sent:
+                request.put(text[request.sent:])
+            request.sent = len(text)
+
+        if reason is not None:
+            self.finish(request, reason)
+            return True
+        return False
+
+    def prefill(self, request: LocalModelRequest) -> Tuple[LayerCache, torch.Tensor]:
+        """
+        compute the prompt tokens not found in the prefix cache.
+
+        Return:
+            the layer cache and the last logits.
+        """
+        ids: List[int] = request.ids
+        cached, layers = self.prefixCache.lookup(ids)
+        past: Any = DynamicCache(layers) if layers is not None else DynamicCache()
+
+        output: Any = self.model(input_ids=torch.tensor([ids[cached:]]),
+                                 position_ids=torch.arange(cached, len(ids)).unsqueeze(0),
+                                 past_key_values=past,
+                                 use_cache=True)
+
+        layers = [(layer.keys, layer.values) for layer in output.past_key_values.layers]
+        self.prefixCache.put(ids, layers)
+        self.metrics["promptTokens"] += len(ids)
+        self.metrics["cachedPromptTokens"] += cached
+        return layers, output.logits[0, -1]
+
+    def generateBatch(self, batch: List[LocalModelRequest]) -> None:
+        """
+        prefill each prompt, then decode the batch one token per step. the prompt caches are
+        left padded to the same length, a finished or cancelled request leaves the batch at once.
+        """
+        start: float = time.perf_counter()
+        active: List[LocalModelRequest] = []
+        caches: List[LayerCache] = []
+        tokens: List[int] = []
+        for request in batch:
+            if request.cancelled:
+                self.finish(request, "cancelled")
+                continue
+
+            request.ids = self.tokenizer(request.prompt)["input_ids"] or [self.eosTokenId]
+            layers, logits = self.prefill(request)
+            token: int = self.nextToken(logits, request.temperature)
+            if request.maxTokens <= 0:
+                self.finish(request, "length")
+            elif not self.emit(request, token):
+                active.append(request)
+                caches.append(layers)
+                tokens.append(token)
+
+        decodeStart: float = time.perf_counter()
+        self.metrics["prefillSeconds"] += decodeStart - start
+        if not active:
+            return
+
+        # left pad the caches, the mask hides the padding.
+        lengths: torch.Tensor = torch.tensor([len(request.ids) for request in active])
+        width: int = int(lengths.max())
+        mask: torch.Tensor = torch.zeros(len(active), width, dtype=torch.long)
+        for row, length in enumerate(lengths.tolist()):
+            mask[row, width - length:] = 1
+
+        merged: LayerCache = []
+        for layer in range(len(caches[0])):
+            keys: List[torch.Tensor] = []
+            values: List[torch.Tensor] = []
+            for cache in caches:
+                layerKeys, layerValues = cache[layer]
+                padding: int = width - layerKeys.shape[2]
+                keys.append(torch.nn.functional.pad(layerKeys, (0, 0, padding, 0)))
+                values.append(torch.nn.functional.pad(layerValues, (0, 0, padding, 0)))
+            merged.append((torch.cat(keys), torch.cat(values)))
+        past: Any = DynamicCache(merged)
+        del caches, merged
+
+        while active:
+            mask = torch.cat([mask, torch.ones(len(active), 1, dtype=torch.long)], dim=1)
+            output: Any = self.model(input_ids=torch.tensor(tokens).unsqueeze(1),
+                                     attention_mask=mask,
+                                     position_ids=lengths.unsqueeze(1),
+                                     past_key_values=past,
+                                     use_cache=True)
+            past = output.past_key_values
+            lengths = lengths + 1
+
+            keep: List[int] = []
+            for row, request in enumerate(active):
+                if request.cancelled:
+                    self.finish(request, "cancelled")
+                    continue
+
+                token = self.nextToken(output.logits[row, -1], request.temperature)
+                if not self.emit(request, token):
+                    keep.append(row)
+                    tokens[row] = token
+
+            # drop the finished rows from the cache.
+            if len(keep) < len(active):
+                index: torch.Tensor = torch.tensor(keep, dtype=torch.long)
+                past.batch_select_indices(index)
+                mask, lengths = mask[index], lengths[index]
+                active = [active[row] for row in keep]
+                tokens = [tokens[row] for row in keep]
+
+        self.metrics["decodeSeconds"] += time.perf_counter() - decodeStart
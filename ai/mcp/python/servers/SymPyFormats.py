@@ -0,0 +1,10 @@
+from typing import List
+
+# the supported translator formats.
+formats: List[str] = [ "latex", "sympy", "cpp", "javascript", "mathematica" ]
+
+# the supported series formats.
+seriesFormats: List[str] = [ "sympy", "latex", "mathematica" ]
+
+# the highest series order, a series takes longer with each order.
+maxSeriesOrder: int = 32
@@ -1,24 +1,41 @@
-from sympy import *
-from sympy import sympify
+import json
+import asyncio
 
-from typing import Optional, Any, List, Union, Callable, Awaitable
+from typing import Optional, Any, List, Union, Callable, Awaitable, Dict, TYPE_CHECKING
 
 from mcp.types import ToolAnnotations
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import FastMCP, Context
 from mcp.server.fastmcp.prompts.base import PromptArgument, Message, TextContent
 
-from ..McpServerBase import McpServerBase
+from ..McpServerBase import McpServerBase, McpToolContext
+from ..McpWorkerPool import McpWorkerPool
 from ..McpTypes import McpPromptHelper
+from .SymPyFormats import formats, seriesFormats, maxSeriesOrder
+
+# SymPy, mpmath and numpy are imported by the first tool call that needs them, so a spawned
+# stdio server answers the initialize request without loading them.
+if TYPE_CHECKING:
+    from .SymPySeries import SymPySeriesState, SymPySeriesCache
 
 # SymPy Math Expression Evaluator.
 class SymPyMath(McpServerBase):
     """
     SymPy math expression evaluator.
     """
-    def __init__(self):
+    def __init__(self, workers: int = 2):
+        """
+        Args:
+            workers:    the number of evaluation worker processes.
+        """
         super().__init__("SymPyMathExpression", "1.2.1", "SymPy math expression evaluator", 
                          dict( resources={}, tools={}, prompts={}))
 
+        # evaluations run in worker processes, a cancelled call kills its worker.
+        self.workerPool: McpWorkerPool = McpWorkerPool(workers)
+
+        # series are cached here and extended by the workers, created by the first expansion.
+        self.seriesCache: "SymPySeriesCache | None" = None
+
     def registerTool_MathExpressionEvaluator(self) -> bool:
         """
         register tool math expression evaluator.
@@ -40,6 +57,92 @@ class SymPyMath(McpServerBase):
                     "expression": {
                         "type": "string",
                         "description": "the SymPy mathematical expression"
+                    },
+                    "precision": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "maximum": 10000,
+                        "description": "the number of significant digits, default 15"
+                    }
+                },
+                "required": ["expression"],
+                "additionalProperties": False
+            })
+        return result
+
+    def registerTool_MathExpressionNativeEvaluator(self) -> bool:
+        """
+        register tool math expression native evaluator.
+
+        Return:
+            true if tool registered; else false.
+        """
+        result: bool = self.registerTool(
+            "MathExpressionNativeEvaluator", 
+            self.mathExpressionNativeEvaluator,
+            "Evaluate a math expression for many values of its symbols, compiled to native code")
+
+        # if added
+        if (result):
+            # set parameters
+            self.setToolParameters("MathExpressionNativeEvaluator", {
+                "type": "object",
+                "properties": {
+                    "expression": {
+                        "type": "string",
+                        "description": "the mathematical expression"
+                    },
+                    "values": {
+                        "type": "object",
+                        "additionalProperties": { "type": "array", "items": { "type": "number" } },
+                        "description": "the values of each symbol, all arrays the same length"
+                    }
+                },
+                "required": ["expression", "values"],
+                "additionalProperties": False
+            })
+        return result
+
+    def registerTool_SeriesExpansion(self) -> bool:
+        """
+        register tool series expansion.
+
+        Return:
+            true if tool registered; else false.
+        """
+        result: bool = self.registerTool(
+            "SeriesExpansion", 
+            self.seriesExpansion,
+            "Use SymPy to expand a math expression as a series about a point")
+
+        # if added
+        if (result):
+            # set parameters
+            self.setToolParameters("SeriesExpansion", {
+                "type": "object",
+                "properties": {
+                    "expression": {
+                        "type": "string",
+                        "description": "the SymPy mathematical expression"
+                    },
+                    "variable": {
+                        "type": "string",
+                        "description": "the expansion variable, default x"
+                    },
+                    "point": {
+                        "type": "string",
+                        "description": "the expansion point, default 0"
+                    },
+                    "order": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "maximum": maxSeriesOrder,
+                        "description": "the order, terms below (variable - point)**order are returned, default 6"
+                    },
+                    "format": {
+                        "type": "string",
+                        "enum": seriesFormats,
+                        "description": "the output format, default sympy"
                     }
                 },
                 "required": ["expression"],
@@ -47,6 +150,83 @@ class SymPyMath(McpServerBase):
             })
         return result
 
+    def registerTool_MathTranslator(self) -> bool:
+        """
+        register tool math translator.
+
+        Return:
+            true if tool registered; else false.
+        """
+        result: bool = self.registerTool(
+            "MathTranslator", 
+            self.mathTranslator,
+            "Use SymPy to convert a math expression between LaTeX, SymPy, C++, JavaScript and Mathematica")
+
+        # if added
+        if (result):
+            # set parameters
+            self.setToolParameters("MathTranslator", {
+                "type": "object",
+                "properties": {
+                    "expression": {
+                        "type": "string",
+                        "description": "the mathematical expression"
+                    },
+                    "fromFormat": {
+                        "type": "string",
+                        "enum": formats,
+                        "description": "the format of the expression"
+                    },
+                    "toFormats": {
+                        "type": "array",
+                        "items": { "type": "string", "enum": formats },
+                        "description": "the formats to convert the expression to"
+                    }
+                },
+                "required": ["expression", "fromFormat", "toFormats"],
+                "additionalProperties": False
+            })
+        return result
+
+    def registerTool_MathTranslatorBatch(self) -> bool:
+        """
+        register tool math translator batch.
+
+        Return:
+            true if tool registered; else false.
+        """
+        result: bool = self.registerTool(
+            "MathTranslatorBatch", 
+            self.mathTranslatorBatch,
+            "Use SymPy to convert many math expressions between LaTeX, SymPy, C++, JavaScript and Mathematica")
+
+        # if added
+        if (result):
+            # set parameters
+            self.setToolParameters("MathTranslatorBatch", {
+                "type": "object",
+                "properties": {
+                    "expressions": {
+                        "type": "array",
+                        "items": { "type": "string" },
+                        "description": "the mathematical expressions"
+                    },
+                    "fromFormat": {
+                        "type": "string",
+                        "enum": formats,
+                        "description": "the format of the expressions"
+                    },
+                    "toFormats": {
+                        "type": "array",
+                        "items": { "type": "string", "enum": formats },
+                        "description": "the formats to convert the expressions to"
+                    }
+                },
+                "required": ["expressions", "fromFormat", "toFormats"],
+                "additionalProperties": False
+            })
+        return result
+
     def registerPrompt_MathExpressionEvaluator(self) -> bool:
         """
         register prompt math expression evaluator.
@@ -105,6 +285,21 @@ class SymPyMath(McpServerBase):
             "text/plain"
         )
 
+    def registerResource_Metrics(self) -> bool:
+        """
+        register resource evaluation worker metrics.
+
+        Return:
+            true if resource registered; else false.
+        """
+        return self.registerResource(
+            "MathExpressionMetrics",
+            "sympy://metrics",
+            self.mathExpressionMetricsResource,
+            "Get the evaluation worker metrics, including cancelled compute",
+            "application/json"
+        )
+
     def mathExpressionEvaluatorPrompt(self, expression: str) -> List[Message]:
         """
         prompt math expression evaluator.
@@ -143,31 +338,145 @@ class SymPyMath(McpServerBase):
             )
         ]
 
-    def mathExpressionEvaluator(self, expression: str) -> str:
+    async def mathExpressionEvaluator(self, expression: str, ctx: Context, precision: int = 15) -> str:
         """
         math expression evaluator.
+        plain numeric expressions are evaluated here with floats or mpmath, anything else
+        is evaluated by SymPy off the event loop, so progress is sent while it runs.
 
         Args:
             expression:    expression to evaluate.
+            ctx:    the tool context.
+            precision:    the number of significant digits.
 
         Return:
             the expression result.
         """
-        result = ""
-        
+        from .SymPyNumeric import evaluateNumeric
+
+        # the fast path.
+        result: str | None = evaluateNumeric(expression, precision)
+        if result is not None:
+            return result
+
+        toolContext: McpToolContext = McpToolContext(ctx)
+        await toolContext.reportProgress(0, 1, "evaluating")
+
+        # evaluate, a cancelled call kills the worker.
+        result = await self.workerPool.run(evaluateExpression, expression, precision)
+        await toolContext.reportProgress(1, 1, "evaluated")
+
+        # return the result.
+        return result
+
+    async def mathExpressionNativeEvaluator(self, expression: str, values: Dict[str, List[float]]) -> str:
+        """
+        math expression native evaluator, the expression is compiled once and cached on disk,
+        evalf is used when there is no compiler.
+
+        Args:
+            expression:    expression to evaluate.
+            values:    the values of each symbol.
+
+        Return:
+            the JSON "results" and "engine", or an "error".
+        """
+        from .SymPyNative import evaluateNativeText
+
+        result: str = await self.workerPool.run(evaluateNativeText, expression, values)
+
+        # return the result.
+        return result
+
+    async def seriesExpansion(self, 
+                              expression: str, 
+                              variable: str = "x", 
+                              point: str = "0", 
+                              order: int = 6, 
+                              format: str = "sympy") -> str:
+        """
+        series expansion, a lower order is truncated from a cached expansion, a higher order
+        recomputes the series to at least twice the cached order.
+
+        Args:
+            expression:    expression to expand.
+            variable:    the expansion variable.
+            point:    the expansion point.
+            order:    the order.
+            format:    "sympy", "latex" or "mathematica".
+
+        Return:
+            the series.
+        """
+        from .SymPySeries import SymPySeriesCache, expandSeries
+
+        if self.seriesCache is None:
+            self.seriesCache = SymPySeriesCache()
+
+        key = self.seriesCache.getKey(expression, variable, point)
+        state: "SymPySeriesState | None" = self.seriesCache.get(key, order)
+
         try:
-            expr = sympify(expression)
-            result = expr.evalf(15)
+            state, result = await self.workerPool.run(expandSeries, state, expression, variable, point, order, format)
         except Exception as e:
-            try:
-                expr = sympify(expression)
-                result = str(expr)
-            except Exception as e:
-                result = f"error: {e}"
+            return f"error: {e}"
+
+        self.seriesCache.put(key, state)
 
         # return the result.
         return result
 
+    async def mathTranslator(self, expression: str, fromFormat: str, toFormats: List[str]) -> str:
+        """
+        math translator.
+
+        Args:
+            expression:    expression to convert.
+            fromFormat:    the format of the expression.
+            toFormats:    the formats to convert the expression to.
+
+        Return:
+            the JSON object of each format and converted expression, or an "error".
+        """
+        from .SymPyTranslator import translateExpression
+
+        result: Dict[str, str] = await self.workerPool.run(translateExpression, expression, fromFormat, toFormats)
+
+        # return the result.
+        return json.dumps(result)
+
+    async def mathTranslatorBatch(self, expressions: List[str], fromFormat: str, toFormats: List[str], ctx: Context) -> str:
+        """
+        math translator batch, the expressions are converted in parallel by the workers.
+
+        Args:
+            expressions:    expressions to convert.
+            fromFormat:    the format of the expressions.
+            toFormats:    the formats to convert the expressions to.
+            ctx:    the tool context.
+
+        Return:
+            the JSON list of converted expressions, in expression order.
+        """
+        from .SymPyTranslator import translateChunk
+
+        toolContext: McpToolContext = McpToolContext(ctx)
+        chunkSize: int = max(1, -(-len(expressions) // (self.workerPool.size * 4)))
+        chunks: List[List[str]] = [expressions[i:i + chunkSize] for i in range(0, len(expressions), chunkSize)]
+        completed: List[int] = [0]
+
+        async def translate(chunk: List[str]) -> List[Dict[str, str]]:
+            translated: List[Dict[str, str]] = await self.workerPool.run(translateChunk, chunk, fromFormat, toFormats)
+            completed[0] += len(chunk)
+            await toolContext.reportProgress(completed[0], len(expressions), "translated")
+            return translated
+
+        # translate all chunks.
+        results: List[List[Dict[str, str]]] = await asyncio.gather(*[translate(chunk) for chunk in chunks])
+
+        # return the result.
+        return json.dumps([item for chunk in results for item in chunk])
+
     def mathExpressionSymPyDocsUrlResource(self) -> str:
         """
         SymPy documentation URL resource.
@@ -189,6 +498,22 @@ class SymPyMath(McpServerBase):
         """
         return f"The document version {version}"
 
+    def mathExpressionMetricsResource(self) -> str:
+        """
+        evaluation worker metrics resource.
+
+        Return:
+            the resource result.
+        """
+        return json.dumps(self.workerPool.getMetrics())
+
+    def stopServer(self):
+        """
+        stop the server and the evaluation workers.
+        """
+        self.workerPool.close()
+        super().stopServer()
+
     def register(self) -> bool:
         """
         register all tools, prompts, resources.
@@ -201,10 +526,15 @@ class SymPyMath(McpServerBase):
         # ternary conditional statement.
         # register tools.
         registeredAll = True if (self.registerTool_MathExpressionEvaluator() and registeredAll) else False
+        registeredAll = True if (self.registerTool_MathExpressionNativeEvaluator() and registeredAll) else False
+        registeredAll = True if (self.registerTool_SeriesExpansion() and registeredAll) else False
+        registeredAll = True if (self.registerTool_MathTranslator() and registeredAll) else False
+        registeredAll = True if (self.registerTool_MathTranslatorBatch() and registeredAll) else False
         registeredAll = True if (self.registerPrompt_MathExpressionEvaluator() and registeredAll) else False
         registeredAll = True if (self.registerPrompt_MathExpressionResult() and registeredAll) else False
         registeredAll = True if (self.registerResource_SymPyDocsUrl() and registeredAll) else False
         registeredAll = True if (self.registerResource_SymPyDocsUrl_Version() and registeredAll) else False
+        registeredAll = True if (self.registerResource_Metrics() and registeredAll) else False
 
         # if all registered.
         return registeredAll
@@ -232,6 +562,34 @@ class SymPyMath(McpServerBase):
         # return the helper list.
         return prompts
 
+def evaluateExpression(expression: str, precision: int = 15) -> str:
+    """
+    evaluate the math expression.
+
+    Args:
+        expression:    expression to evaluate.
+        precision:    the number of significant digits.
+
+    Return:
+        the expression result.
+    """
+    from .SymPyParser import parseExpression, evaluateParsed
+
+    result = ""
+
+    try:
+        # integrate, solve, ... run here, in the worker.
+        expr = evaluateParsed(parseExpression(expression))
+        try:
+            result = str(expr.evalf(precision))
+        except Exception:
+            result = str(expr)
+    except Exception as e:
+        result = f"error: {e}"
+
+    # return the result.
+    return result
+
 # if main.
 def mainSymPyMathServer(useStreamableHttp: bool = False) -> SymPyMath | None:
     """
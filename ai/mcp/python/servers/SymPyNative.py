@@ -0,0 +1,282 @@
+import os
+import json
+import ctypes
+import _ctypes
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+import sysconfig
+
+from collections import OrderedDict
+from typing import Optional, Any, List, Union, Dict
+
+import numpy as np
+
+from sympy import sympify, srepr, Symbol
+from sympy.utilities.codegen import codegen, CodeGenError
+
+from .SymPyParser import parseExpression, evaluateParsed
+
+# the vectorized entry point, calls the generated scalar function for each element.
+vectorTemplate: str = """
+void {name}_vector({parameters}double* out, long n) {{
+    for (long i = 0; i < n; ++i)
+        out[i] = {name}({arguments});
+}}
+"""
+
+# SymPy native function.
+class SymPyNativeFunction:
+    """
+    SymPy native function, a compiled expression loaded through ctypes.
+    """
+    def __init__(self, library: Any, symbols: List[Symbol], path: str):
+        """
+        Args:
+            library:    the loaded shared object.
+            symbols:    the argument symbols, in call order.
+            path:    the shared object path.
+        """
+        self.library = library
+        self.symbols = symbols
+        self.path = path
+
+        # the vectorized function.
+        self.function = library.expression_vector
+        self.function.restype = None
+        self.function.argtypes = [ctypes.c_void_p] * (len(symbols) + 1) + [ctypes.c_long]
+
+    def __repr__(self):
+        return f"SymPyNativeFunction(symbols={self.symbols}, " \
+            f"path={self.path})"
+
+    def __del__(self):
+        # unload the shared object, nothing can call it once the function is released.
+        dlclose = getattr(_ctypes, "dlclose", None)
+        library = getattr(self, "library", None)
+        if dlclose is not None and library is not None:
+            self.function = None
+            dlclose(library._handle)
+
+    def __call__(self, *values: Any) -> np.ndarray:
+        """
+        evaluate the expression for each element, the values are broadcast together.
+
+        Args:
+            values:    a scalar or array for each argument symbol.
+
+        Return:
+            the results.
+        """
+        if len(values) != len(self.symbols):
+            raise ValueError(f"expected {len(self.symbols)} values for {self.symbols}")
+
+        arrays: List[np.ndarray] = [np.ascontiguousarray(array, dtype=np.float64) for array in np.broadcast_arrays(*values)]
+        shape: tuple = arrays[0].shape if len(arrays) > 0 else ()
+        out: np.ndarray = np.empty(shape, dtype=np.float64)
+
+        # call the native loop.
+        self.function(*[array.ctypes.data for array in arrays], out.ctypes.data, out.size)
+        return out
+
+# SymPy native.
+class SymPyNative:
+    """
+    SymPy native, compiles expressions to C with the local compiler.
+    each shared object is cached on disk by the expression hash and loaded once per process.
+    """
+    def __init__(self,
+                 cacheDirectory: str | None = None,
+                 compiler: str | None = None,
+                 flags: List[str] | None = None,
+                 cacheSize: int = 256):
+        """
+        Args:
+            cacheDirectory:    the shared object directory; else the user cache directory.
+            compiler:    the C compiler; else $CC or cc.
+            flags:    the compiler flags; else -O2 -shared -fPIC.
+            cacheSize:    the maximum number of loaded functions, the least recently used is released.
+        """
+        self.cacheDirectory = cacheDirectory or os.path.join(
+            os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "nequeo", "sympy-native")
+        self.compiler = compiler or os.environ.get("CC", "cc")
+        self.flags = flags or ["-O2", "-shared", "-fPIC"]
+
+        self.cacheSize = cacheSize
+
+        # init
+        self.functions: OrderedDict[str, SymPyNativeFunction] = OrderedDict()
+        self.lock = threading.Lock()
+        self.compiled: int = 0
+        self.loaded: int = 0
+
+    def __repr__(self):
+        return f"SymPyNative(cacheDirectory={self.cacheDirectory}, " \
+            f"compiler={self.compiler}, " \
+            f"functions={len(self.functions)}, " \
+            f"compiled={self.compiled}, " \
+            f"loaded={self.loaded})"
+
+    def isAvailable(self) -> bool:
+        """
+        is the compiler available.
+
+        Return:
+            true if the compiler is found; else false.
+        """
+        return shutil.which(self.compiler) is not None
+
+    def getKey(self, expr: Any, symbols: List[Symbol]) -> str:
+        """
+        get the cache key of the expression.
+
+        Args:
+            expr:    the SymPy expression.
+            symbols:    the argument symbols.
+
+        Return:
+            the expression hash.
+        """
+        text: str = "\n".join([srepr(expr), ",".join(s.name for s in symbols), self.compiler, " ".join(self.flags)])
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def getSource(self, expr: Any, symbols: List[Symbol]) -> str:
+        """
+        get the C source of the expression.
+
+        Args:
+            expr:    the SymPy expression.
+            symbols:    the argument symbols.
+
+        Return:
+            the C source.
+        """
+        [(_, source), _] = codegen(("expression", expr), "C99", argument_sequence=symbols, header=False, empty=False)
+        source = source.replace('#include "expression.h"\n', "")
+
+        # arguments are passed by position, named a0, a1, ...
+        parameters: str = "".join(f"const double* a{i}, " for i in range(len(symbols)))
+        arguments: str = ", ".join(f"a{i}[i]" for i in range(len(symbols)))
+        return source + vectorTemplate.format(name="expression", parameters=parameters, arguments=arguments)
+
+    def compile(self, expression: Union[str, Any], symbols: List[str] | None = None) -> SymPyNativeFunction:
+        """
+        compile the expression, or load it from the cache.
+
+        Args:
+            expression:    the expression.
+            symbols:    the argument names, in call order; else the free symbols sorted by name.
+
+        Return:
+            the native function.
+        """
+        expr: Any = evaluateParsed(parseExpression(expression)) if isinstance(expression, str) else sympify(expression)
+        arguments: List[Symbol] = [Symbol(name) for name in symbols] if symbols is not None \
+            else sorted(expr.free_symbols, key=lambda s: s.name)
+
+        key: str = self.getKey(expr, arguments)
+        with self.lock:
+            if key in self.functions:
+                self.functions.move_to_end(key)
+                return self.functions[key]
+
+        path: str = os.path.join(self.cacheDirectory, key + (sysconfig.get_config_var("SHLIB_SUFFIX") or ".so"))
+
+        # compile once, the shared object is renamed into place so other processes never load a partial file.
+        if not os.path.exists(path):
+            os.makedirs(self.cacheDirectory, exist_ok=True)
+            with tempfile.TemporaryDirectory(dir=self.cacheDirectory) as directory:
+                source: str = os.path.join(directory, "expression.c")
+                target: str = os.path.join(directory, "expression.so")
+                with open(source, "w") as file:
+                    file.write(self.getSource(expr, arguments))
+
+                subprocess.run([self.compiler, *self.flags, source, "-o", target, "-lm"],
+                               check=True, capture_output=True, text=True)
+                os.replace(target, path)
+                self.compiled += 1
+
+        function: SymPyNativeFunction = SymPyNativeFunction(ctypes.CDLL(path), arguments, path)
+        with self.lock:
+            self.loaded += 1
+            self.functions[key] = function
+            if len(self.functions) > self.cacheSize:
+                self.functions.popitem(last=False)
+
+        # return the function.
+        return function
+
+# the native compiler of this process.
+defaultNative: SymPyNative = SymPyNative()
+
+def finiteResults(results: np.ndarray) -> Any:
+    """
+    the results as JSON values, an infinite or NaN result is none.
+
+    Args:
+        results:    the results.
+
+    Return:
+        the nested lists of the results, or a number.
+    """
+    return np.where(np.isfinite(results), results, None).tolist()
+
+def evaluateNative(expression: str, values: Dict[str, List[float]], native: SymPyNative | None = None) -> Dict[str, Any]:
+    """
+    evaluate the expression for each element of the values, compiled when a compiler is
+    available; else with SymPy evalf.
+
+    Args:
+        expression:    the expression.
+        values:    the values of each symbol, scalars are broadcast.
+        native:    the native compiler; else the process compiler.
+
+    Return:
+        the "results" and the "engine" used, "native" or "evalf".
+    """
+    native = native or defaultNative
+    expr: Any = evaluateParsed(parseExpression(expression))
+    names: List[str] = sorted(set(values.keys()) | set(s.name for s in expr.free_symbols))
+
+    missing: List[str] = [name for name in names if name not in values]
+    if len(missing) > 0:
+        raise ValueError(f"no values for {missing}")
+
+    arrays: List[Any] = [values[name] for name in names]
+
+    # a constant.
+    if len(names) <= 0:
+        return { "engine": "evalf", "results": finiteResults(np.float64(float(expr.evalf()))) }
+
+    if native.isAvailable():
+        try:
+            results: np.ndarray = native.compile(expr, names)(*arrays)
+            return { "engine": "native", "results": finiteResults(results) }
+        except (OSError, subprocess.CalledProcessError, CodeGenError):
+            pass
+
+    # evalf for each element.
+    symbols: List[Symbol] = [Symbol(name) for name in names]
+    results = np.empty(np.broadcast_shapes(*[np.shape(array) for array in arrays]), dtype=np.float64)
+    for index, point in zip(np.ndindex(results.shape), zip(*[np.broadcast_to(array, results.shape).ravel() for array in arrays])):
+        results[index] = float(expr.evalf(subs=dict(zip(symbols, point))))
+
+    return { "engine": "evalf", "results": finiteResults(results) }
+
+def evaluateNativeText(expression: str, values: Dict[str, List[float]]) -> str:
+    """
+    evaluate the expression for each element of the values, used by worker processes.
+
+    Args:
+        expression:    the expression.
+        values:    the values of each symbol.
+
+    Return:
+        the JSON result, or an "error".
+    """
+    try:
+        return json.dumps(evaluateNative(expression, values), allow_nan=False)
+    except Exception as e:
+        return json.dumps({ "error": f"error: {e}" })
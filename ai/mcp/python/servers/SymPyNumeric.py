@@ -0,0 +1,219 @@
+import ast
+import math
+import operator
+
+from typing import Optional, Any, List, Union, Dict, Callable
+
+import mpmath
+
+from sympy import Float
+
+# the largest precision evaluated on the fast path.
+maxNumericPrecision: int = 1000
+
+# the guard digits added to the mpmath working precision.
+guardDigits: int = 15
+
+# the significant digits of a float.
+floatDigits: float = 53 * math.log10(2)
+
+# binary operators.
+binaryOperators: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+    ast.FloorDiv: operator.floordiv,
+    ast.Pow: operator.pow
+}
+
+# unary operators.
+unaryOperators: Dict[type, Callable[[Any], Any]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg
+}
+
+def floatLog(value: float, base: float | None = None) -> float:
+    return math.log(value) if base is None else math.log(value) / math.log(base)
+
+def mpmathLog(value: Any, base: Any = None) -> Any:
+    return mpmath.log(value) if base is None else mpmath.log(value) / mpmath.log(base)
+
+# float functions, by SymPy name.
+floatFunctions: Dict[str, Callable[..., float]] = {
+    "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "cot": lambda x: 1.0 / math.tan(x), "sec": lambda x: 1.0 / math.cos(x), "csc": lambda x: 1.0 / math.sin(x),
+    "asin": math.asin, "acos": math.acos, "atan": math.atan, "atan2": math.atan2,
+    "sinh": math.sinh, "cosh": math.cosh, "tanh": math.tanh,
+    "asinh": math.asinh, "acosh": math.acosh, "atanh": math.atanh,
+    "exp": math.exp, "log": floatLog, "ln": floatLog, "sqrt": math.sqrt,
+    "Abs": abs, "abs": abs, "floor": math.floor, "ceiling": math.ceil,
+    "gamma": math.gamma, "factorial": lambda x: math.gamma(x + 1.0), "erf": math.erf
+}
+
+# mpmath functions, by SymPy name.
+mpmathFunctions: Dict[str, Callable[..., Any]] = {
+    "sin": mpmath.sin, "cos": mpmath.cos, "tan": mpmath.tan,
+    "cot": mpmath.cot, "sec": mpmath.sec, "csc": mpmath.csc,
+    "asin": mpmath.asin, "acos": mpmath.acos, "atan": mpmath.atan, "atan2": mpmath.atan2,
+    "sinh": mpmath.sinh, "cosh": mpmath.cosh, "tanh": mpmath.tanh,
+    "asinh": mpmath.asinh, "acosh": mpmath.acosh, "atanh": mpmath.atanh,
+    "exp": mpmath.exp, "log": mpmathLog, "ln": mpmathLog, "sqrt": mpmath.sqrt,
+    "Abs": abs, "abs": abs, "floor": mpmath.floor, "ceiling": mpmath.ceil,
+    "gamma": mpmath.gamma, "factorial": mpmath.factorial, "erf": mpmath.erf
+}
+
+# not a plain numeric expression, SymPy is used.
+class SymPyNumericUnsupported(Exception):
+    pass
+
+# SymPy numeric.
+class SymPyNumeric:
+    """
+    SymPy numeric, evaluates plain numeric expressions with floats or mpmath,
+    without building a SymPy expression. anything else is unsupported, e.g. symbols,
+    complex results, domain errors or digits lost to cancellation.
+    """
+    def __init__(self, useFloat: bool, useFloatLiterals: bool = True, tolerance: float = 0.0):
+        """
+        Args:
+            useFloat:    use floats; else mpmath at the current working precision.
+            useFloatLiterals:    allow float literals such as 0.1, SymPy keeps them at 15 digits
+                so above 15 digits they are left to SymPy.
+            tolerance:    the relative error that can be lost to rounding, a pole closer
+                than this, e.g. tan(pi/2), is unsupported.
+        """
+        self.useFloat = useFloat
+        self.useFloatLiterals = useFloatLiterals
+        self.tolerance = tolerance
+        self.functions: Dict[str, Callable[..., Any]] = floatFunctions if useFloat else mpmathFunctions
+        self.constants: Dict[str, Any] = { "pi": math.pi, "E": math.e } if useFloat \
+            else { "pi": mpmath.pi, "E": mpmath.e }
+
+        # the largest magnitude seen, used to detect cancellation.
+        self.scale: Any = 0
+
+    def number(self, value: Any) -> Any:
+        """
+        check and track a value.
+
+        Args:
+            value:    the value.
+
+        Return:
+            the value.
+        """
+        if isinstance(value, (complex, mpmath.mpc)):
+            raise SymPyNumericUnsupported("complex")
+
+        magnitude: Any = abs(value)
+        if self.useFloat:
+            if not math.isfinite(magnitude):
+                raise SymPyNumericUnsupported("not finite")
+        elif mpmath.isinf(magnitude) or mpmath.isnan(magnitude):
+            raise SymPyNumericUnsupported("not finite")
+
+        if magnitude > self.scale:
+            self.scale = magnitude
+        return value
+
+    def checkPole(self, name: str, args: List[Any]) -> None:
+        """
+        check the function argument is not within rounding error of a pole.
+
+        Args:
+            name:    the function name.
+            args:    the arguments.
+        """
+        if len(args) != 1:
+            return
+
+        x: Any = args[0]
+        error: Any = self.scale * self.tolerance
+        functions: Any = math if self.useFloat else mpmath
+
+        if name in ("tan", "sec"):
+            distance: Any = abs(functions.cos(x))
+        elif name in ("cot", "csc"):
+            distance = abs(functions.sin(x))
+        elif name in ("gamma", "factorial"):
+            shifted: Any = x if name == "gamma" else x + 1
+            distance = abs(shifted - round(shifted)) if shifted <= 0 else 1
+        else:
+            return
+
+        if distance <= error:
+            raise SymPyNumericUnsupported(f"{name} pole")
+
+    def evaluate(self, node: ast.AST) -> Any:
+        """
+        evaluate the node.
+
+        Args:
+            node:    the expression node.
+
+        Return:
+            the value.
+        """
+        if isinstance(node, ast.Constant) and type(node.value) is int:
+            return self.number(float(node.value) if self.useFloat else mpmath.mpf(node.value))
+        elif isinstance(node, ast.Constant) and type(node.value) is float and self.useFloatLiterals:
+            return self.number(node.value if self.useFloat else mpmath.mpf(node.value))
+        elif isinstance(node, ast.BinOp) and type(node.op) in binaryOperators:
+            return self.number(binaryOperators[type(node.op)](self.evaluate(node.left), self.evaluate(node.right)))
+        elif isinstance(node, ast.UnaryOp) and type(node.op) in unaryOperators:
+            return self.number(unaryOperators[type(node.op)](self.evaluate(node.operand)))
+        elif isinstance(node, ast.Name) and node.id in self.constants:
+            return self.number(self.constants[node.id])
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in self.functions \
+                and len(node.keywords) <= 0:
+            args: List[Any] = [self.evaluate(arg) for arg in node.args]
+            self.checkPole(node.func.id, args)
+            return self.number(self.functions[node.func.id](*args))
+        else:
+            raise SymPyNumericUnsupported(type(node).__name__)
+
+def evaluateNumeric(expression: str, precision: int = 15) -> str | None:
+    """
+    evaluate a plain numeric expression on the fast path, floats up to 15 digits; else mpmath.
+
+    Args:
+        expression:    the expression.
+        precision:    the number of significant digits.
+
+    Return:
+        the result in the SymPy evalf form; else none if SymPy is needed.
+    """
+    if precision > maxNumericPrecision:
+        return None
+
+    # ^ is power as in sympify, replaced before parsing so it has the ** precedence.
+    try:
+        tree: ast.Expression = ast.parse(expression.strip().replace("^", "**"), mode="eval")
+    except (SyntaxError, ValueError):
+        return None
+
+    # floats, then mpmath with guard digits when the float digits are not enough.
+    attempts: List[bool] = [True, False] if precision <= 15 else [False]
+    for useFloat in attempts:
+        working: float = floatDigits if useFloat else precision + guardDigits
+        numeric: SymPyNumeric = SymPyNumeric(useFloat, precision <= 15, 10.0 ** (precision - working))
+
+        try:
+            if useFloat:
+                value: Any = numeric.evaluate(tree.body)
+            else:
+                with mpmath.workdps(int(working)):
+                    value = numeric.evaluate(tree.body)
+        except (SymPyNumericUnsupported, ArithmeticError, ValueError, TypeError, RecursionError):
+            continue
+
+        # the digits lost to cancellation, e.g. sin(pi) or 1e16 + 1 - 1e16.
+        if numeric.scale > 0 and (value == 0 or abs(value) < numeric.scale * numeric.tolerance):
+            continue
+
+        return str(Float(value, precision))
+
+    # return to SymPy.
+    return None
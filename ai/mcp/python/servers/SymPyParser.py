@@ -0,0 +1,393 @@
+import ast
+import math
+import threading
+
+from collections import OrderedDict
+from typing import Optional, Any, List, Union, Dict, Callable, Set
+
+import sympy
+
+from sympy import Symbol, Integer, Float, Tuple as SymPyTuple
+
+# the functions that can be called, by name.
+parserFunctions: Dict[str, Callable[..., Any]] = { name: getattr(sympy, name) for name in [
+    "sin", "cos", "tan", "cot", "sec", "csc", "asin", "acos", "atan", "atan2", "acot", "asec", "acsc",
+    "sinh", "cosh", "tanh", "coth", "sech", "csch", "asinh", "acosh", "atanh", "acoth",
+    "exp", "log", "ln", "sqrt", "cbrt", "root", "real_root", "Abs", "sign", "floor", "ceiling", "frac",
+    "re", "im", "arg", "conjugate", "Min", "Max", "Mod", "gcd", "lcm",
+    "factorial", "factorial2", "binomial", "gamma", "loggamma", "beta", "erf", "erfc", "zeta", "polygamma",
+    "Rational", "Integer", "Float", "Eq", "Ne", "Lt", "Le", "Gt", "Ge", "Piecewise",
+    "diff", "Derivative", "integrate", "Integral", "limit", "Limit", "summation", "Sum", "product", "Product",
+    "series", "simplify", "expand", "factor", "cancel", "apart", "together", "trigsimp", "nsimplify",
+    "solve", "solveset", "Matrix", "det", "N"
+] }
+
+# the functions that can run for a long time, e.g. integrate or solve. the parser keeps their calls
+# unevaluated (ParserCall) and evaluateParsed runs them, so parsing untrusted input stays fast
+# and the work is done where it can be timed out, e.g. in an evaluation worker.
+parserDeferred: Set[str] = {
+    "diff", "integrate", "limit", "summation", "product",
+    "series", "simplify", "expand", "factor", "cancel", "apart", "together", "trigsimp", "nsimplify",
+    "solve", "solveset", "det", "N", "polygamma", "zeta"
+}
+
+# the functions computed exactly from their integer or rational arguments, e.g. gamma(200000),
+# the arguments are limited to maxInteger. Float is checked on its precision, not its value.
+parserInteger: Set[str] = {
+    "factorial", "factorial2", "binomial", "gamma", "loggamma", "beta"
+}
+
+# the constants, by name.
+parserConstants: Dict[str, Any] = {
+    "pi": sympy.pi, "E": sympy.E, "I": sympy.I, "oo": sympy.oo, "zoo": sympy.zoo, "nan": sympy.nan,
+    "EulerGamma": sympy.EulerGamma, "GoldenRatio": sympy.GoldenRatio, "Catalan": sympy.Catalan
+}
+
+# binary operators.
+parserOperators: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: a / b,
+    ast.Mod: lambda a, b: a % b,
+    ast.FloorDiv: lambda a, b: a // b,
+    ast.Pow: lambda a, b: a ** b
+}
+
+# comparison operators.
+parserComparisons: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Lt: sympy.Lt,
+    ast.LtE: sympy.Le,
+    ast.Gt: sympy.Gt,
+    ast.GtE: sympy.Ge
+}
+
+# the expression is not accepted.
+class SymPyParserError(ValueError):
+    pass
+
+# a deferred function call.
+class ParserCall(sympy.Expr):
+    """
+    a call of a parserDeferred function, kept unevaluated by the parser, e.g. simplify(x).
+    args are the function name, the positional arguments and the (name, value) keyword pairs.
+    """
+    is_commutative = True
+
+    def __new__(cls, name: str, args: List[Any], kwargs: Dict[str, Any]):
+        return sympy.Expr.__new__(cls, Symbol(name),
+            SymPyTuple(*[toBasic(arg) for arg in args]),
+            SymPyTuple(*[SymPyTuple(Symbol(key), toBasic(value)) for key, value in kwargs.items()]))
+
+    @property
+    def name(self) -> str:
+        return self.args[0].name
+
+    def call(self) -> Any:
+        """
+        evaluate the arguments, then call the function.
+
+        Return:
+            the function result.
+        """
+        args: List[Any] = [evaluateParsed(arg) for arg in self.args[1]]
+        kwargs: Dict[str, Any] = { key.name: evaluateParsed(value) for key, value in self.args[2] }
+        return parserFunctions[self.name](*args, **kwargs)
+
+    def doit(self, **hints) -> Any:
+        return self.call()
+
+    def _sympystr(self, printer: Any) -> str:
+        args: List[str] = [printer.doprint(arg) for arg in self.args[1]]
+        args += [f"{key.name}={printer.doprint(value)}" for key, value in self.args[2]]
+        return f"{self.name}({', '.join(args)})"
+
+    def _latex(self, printer: Any) -> str:
+        return f"\\operatorname{{{self.name}}}\\left({', '.join(printer.doprint(arg) for arg in self.args[1])}\\right)"
+
+def toBasic(value: Any) -> Any:
+    """
+    a SymPy argument of a deferred call, lists become tuples and matrices immutable.
+    """
+    if isinstance(value, (list, tuple)):
+        return SymPyTuple(*[toBasic(item) for item in value])
+    elif isinstance(value, sympy.MatrixBase):
+        return sympy.ImmutableMatrix(value)
+    return value
+
+def evaluateParsed(expr: Any) -> Any:
+    """
+    run the deferred calls of a parsed expression, innermost first.
+
+    Args:
+        expr:    the parsed expression.
+
+    Return:
+        the evaluated expression.
+    """
+    if isinstance(expr, list):
+        return [evaluateParsed(item) for item in expr]
+    elif not isinstance(expr, sympy.Basic) or not expr.has(ParserCall):
+        return expr
+    elif isinstance(expr, ParserCall):
+        return expr.call()
+    return expr.func(*[evaluateParsed(arg) for arg in expr.args])
+
+# SymPy parser.
+class SymPyParser:
+    """
+    SymPy parser, a restricted replacement for sympify on untrusted input.
+    the Python AST is walked and the SymPy tree is built directly, only numbers, symbols,
+    the whitelisted functions and constants, and arithmetic are accepted, nothing is evaluated
+    by Python. parsed expressions are cached.
+    """
+    def __init__(self,
+                 symbols: Set[str] | None = None,
+                 locals: Dict[str, Any] | None = None,
+                 maxLength: int = 10000,
+                 maxDepth: int = 100,
+                 maxInteger: int = 10000,
+                 maxBits: int = 1 << 20,
+                 cacheSize: int = 4096):
+        """
+        Args:
+            symbols:    the symbol names that are accepted; else any name that is not private.
+            locals:    extra names, e.g. constants or functions, mapped to SymPy objects.
+            maxLength:    the maximum expression length.
+            maxDepth:    the maximum nesting depth.
+            maxInteger:    the largest argument of factorial, binomial, gamma and the other parserInteger
+                functions, and the largest Float precision, larger numbers would be computed exactly
+                when the tree is built.
+            maxBits:    the largest exact power, in bits of the result, e.g. (9999**9999)**9999 is rejected.
+            cacheSize:    the maximum number of cached parsed expressions.
+        """
+        self.symbols = symbols
+        self.locals = locals or {}
+        self.maxLength = maxLength
+        self.maxDepth = maxDepth
+        self.maxInteger = maxInteger
+        self.maxBits = maxBits
+        self.cacheSize = cacheSize
+
+        # init
+        self.cache: OrderedDict[str, Any] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f"SymPyParser(symbols={self.symbols}, " \
+            f"maxLength={self.maxLength}, " \
+            f"maxDepth={self.maxDepth}, " \
+            f"cached={len(self.cache)})"
+
+    def parse(self, expression: str) -> Any:
+        """
+        parse the expression.
+
+        Args:
+            expression:    the expression text.
+
+        Return:
+            the SymPy expression.
+        """
+        text: str = expression.strip()
+        with self.lock:
+            if text in self.cache:
+                self.cache.move_to_end(text)
+                return self.cache[text]
+
+        if len(text) > self.maxLength:
+            raise SymPyParserError(f"expression longer than {self.maxLength}")
+
+        # ^ is power as in sympify, replaced before parsing so it has the ** precedence.
+        source: str = text.replace("^", "**")
+
+        try:
+            tree: ast.Expression = ast.parse(source, mode="eval")
+        except (SyntaxError, ValueError) as e:
+            raise SymPyParserError(f"invalid expression: {e}")
+
+        expr: Any = self.build(tree.body, source, 0)
+
+        # only immutable results are shared, e.g. not a Matrix or list.
+        if isinstance(expr, sympy.Basic):
+            with self.lock:
+                self.cache[text] = expr
+                if len(self.cache) > self.cacheSize:
+                    self.cache.popitem(last=False)
+
+        # return the expression.
+        return expr
+
+    def build(self, node: ast.AST, text: str, depth: int) -> Any:
+        """
+        build the SymPy tree of the node.
+
+        Args:
+            node:    the node.
+            text:    the expression text, used for the float literal digits.
+            depth:    the nesting depth.
+
+        Return:
+            the SymPy object.
+        """
+        if depth > self.maxDepth:
+            raise SymPyParserError(f"expression nested deeper than {self.maxDepth}")
+        depth += 1
+
+        if isinstance(node, ast.Constant):
+            if type(node.value) is bool:
+                return sympy.true if node.value else sympy.false
+            elif type(node.value) is int:
+                return Integer(node.value)
+            elif type(node.value) is float:
+                # the literal keeps its digits, as sympify.
+                return Float(ast.get_source_segment(text, node).replace("_", ""))
+            else:
+                raise SymPyParserError(f"{type(node.value).__name__} literal is not allowed")
+
+        elif isinstance(node, ast.Name):
+            return self.getName(node.id)
+
+        elif isinstance(node, ast.BinOp) and type(node.op) in parserOperators:
+            left: Any = self.build(node.left, text, depth)
+            right: Any = self.build(node.right, text, depth)
+            if isinstance(node.op, ast.Pow):
+                self.checkPower(left, right)
+            return parserOperators[type(node.op)](left, right)
+
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            operand: Any = self.build(node.operand, text, depth)
+            return -operand if isinstance(node.op, ast.USub) else operand
+
+        elif isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in parserComparisons:
+            return parserComparisons[type(node.ops[0])](
+                self.build(node.left, text, depth), self.build(node.comparators[0], text, depth))
+
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and self.isFunction(node.func.id):
+            args: List[Any] = [self.build(arg, text, depth) for arg in node.args]
+            kwargs: Dict[str, Any] = {}
+            for keyword in node.keywords:
+                if keyword.arg is None:
+                    raise SymPyParserError("** arguments are not allowed")
+                kwargs[keyword.arg] = self.build(keyword.value, text, depth)
+
+            if node.func.id in parserInteger:
+                self.checkInteger(args + list(kwargs.values()))
+            elif node.func.id == "Float":
+                self.checkInteger(args[1:] + list(kwargs.values()))
+            if node.func.id not in self.locals and node.func.id in parserDeferred:
+                return ParserCall(node.func.id, args, kwargs)
+            return self.locals.get(node.func.id, parserFunctions.get(node.func.id))(*args, **kwargs)
+
+        elif isinstance(node, ast.Tuple):
+            return SymPyTuple(*[self.build(item, text, depth) for item in node.elts])
+
+        elif isinstance(node, ast.List):
+            return [self.build(item, text, depth) for item in node.elts]
+
+        else:
+            raise SymPyParserError(f"{type(node).__name__} is not allowed")
+
+    def isFunction(self, name: str) -> bool:
+        """
+        is the name a function that can be called.
+
+        Args:
+            name:    the name.
+
+        Return:
+            true if a whitelisted function or a callable local; else false.
+        """
+        if name in self.locals:
+            return callable(self.locals[name])
+        return name in parserFunctions
+
+    def getName(self, name: str) -> Any:
+        """
+        get the SymPy object of a name.
+
+        Args:
+            name:    the name.
+
+        Return:
+            the local, constant or symbol.
+        """
+        if name in self.locals:
+            return self.locals[name]
+        elif name in parserConstants:
+            return parserConstants[name]
+        elif name.startswith("_"):
+            raise SymPyParserError(f"name {name} is not allowed")
+        elif self.symbols is not None and name not in self.symbols:
+            raise SymPyParserError(f"symbol {name} is not allowed")
+
+        # e.g. gamma or beta as a variable.
+        return Symbol(name)
+
+    def checkPower(self, base: Any, exponent: Any) -> None:
+        """
+        reject exact powers too large to build, e.g. 10**10**10 or (9999**9999)**9999.
+        the size of the result is |exponent| * log2(|base|) bits.
+
+        Args:
+            base:    the base.
+            exponent:    the exponent.
+        """
+        if getattr(base, "is_Rational", False) and getattr(exponent, "is_Rational", False):
+            size: int = max(abs(int(base.p)), int(base.q))
+            if size > 1 and abs(exponent.p) * math.log2(size) > self.maxBits * exponent.q:
+                raise SymPyParserError(f"power larger than {self.maxBits} bits")
+
+    def rebuild(self, expr: Any, depth: int = 0) -> Any:
+        """
+        rebuild a trusted but unevaluated tree with evaluation, e.g. the output of latex2sympy,
+        so 1*x**2/2 is folded to x**2/2. powers and factorials are checked as in parse.
+
+        Args:
+            expr:    the SymPy expression.
+            depth:    the nesting depth.
+
+        Return:
+            the evaluated expression.
+        """
+        if depth > self.maxDepth:
+            raise SymPyParserError(f"expression nested deeper than {self.maxDepth}")
+        if not isinstance(expr, sympy.Basic) or expr.is_Atom or not expr.args:
+            return expr
+
+        args: List[Any] = [self.rebuild(arg, depth + 1) for arg in expr.args]
+        if isinstance(expr, sympy.Pow):
+            self.checkPower(args[0], args[1])
+        elif isinstance(expr, tuple(parserFunctions[name] for name in parserInteger)):
+            self.checkInteger(args)
+        elif isinstance(expr, (sympy.polygamma, sympy.zeta)):
+            # kept unevaluated, as the parser defers them.
+            return expr.func(*args, evaluate=False)
+        return expr.func(*args)
+
+    def checkInteger(self, args: List[Any]) -> None:
+        """
+        reject integer and rational arguments too large to build, e.g. factorial(10**9)
+        or gamma(400001/2).
+
+        Args:
+            args:    the arguments.
+        """
+        for arg in args:
+            if getattr(arg, "is_Rational", False) and abs(int(arg.p)) > self.maxInteger * int(arg.q):
+                raise SymPyParserError(f"argument larger than {self.maxInteger}")
+
+# the parser of this process.
+defaultParser: SymPyParser = SymPyParser()
+
+def parseExpression(expression: str) -> Any:
+    """
+    parse the expression with the process parser.
+
+    Args:
+        expression:    the expression text.
+
+    Return:
+        the SymPy expression.
+    """
+    return defaultParser.parse(expression)
@@ -0,0 +1,215 @@
+import threading
+
+from collections import OrderedDict
+from typing import Optional, Any, List, Union, Dict, Tuple
+
+from sympy import latex, mathematica_code, series, Symbol, Order
+
+from .SymPyParser import parseExpression, evaluateParsed
+from .SymPyFormats import seriesFormats, maxSeriesOrder
+
+# SymPy series state.
+class SymPySeriesState:
+    """
+    SymPy series state, the SymPy series computed so far.
+    a lower order is truncated from it, a higher order at least doubles it, so asking for
+    one more term at a time computes a few series, not one per term.
+    """
+    def __init__(self, expr: Any, variable: Symbol, point: Any):
+        """
+        Args:
+            expr:    the SymPy expression.
+            variable:    the expansion variable.
+            point:    the expansion point.
+        """
+        self.expr = expr
+        self.variable = variable
+        self.point = point
+
+        # init
+        self.order: int = 0
+        self.series: Any = None
+
+    def __repr__(self):
+        return f"SymPySeriesState(expr={self.expr}, " \
+            f"variable={self.variable}, " \
+            f"point={self.point}, " \
+            f"order={self.order})"
+
+    def extend(self, order: int) -> None:
+        """
+        extend the expansion to the order.
+
+        Args:
+            order:    the order, terms below (x - point)**order are kept.
+        """
+        if self.series is not None and self.order >= order:
+            return
+
+        # series expands the whole expression at once, repeated derivatives swell, e.g. tan(x).
+        order = max(order, min(2 * self.order, maxSeriesOrder))
+        self.series = series(self.expr, self.variable, self.point, order)
+        self.order = order
+
+    def getSeries(self, order: int) -> Any:
+        """
+        get the expansion truncated at the order.
+
+        Args:
+            order:    the order, at most the state order.
+
+        Return:
+            the series with its order term.
+        """
+        if order >= self.order:
+            return self.series
+
+        # the order term absorbs the higher terms, about infinity the series is in 1/x.
+        term: Any = self.variable - self.point if self.point.is_finite else 1 / self.variable
+        return self.series.removeO() + Order(term ** order, (self.variable, self.point))
+
+def createSeriesState(expression: str, variable: str, point: str) -> SymPySeriesState:
+    """
+    create the series state of the expression.
+
+    Args:
+        expression:    the expression.
+        variable:    the expansion variable name.
+        point:    the expansion point.
+
+    Return:
+        the series state.
+    """
+    expr: Any = evaluateParsed(parseExpression(expression))
+    return SymPySeriesState(expr, Symbol(variable), evaluateParsed(parseExpression(point)))
+
+def formatSeries(expr: Any, format: str) -> str:
+    """
+    format the series.
+
+    Args:
+        expr:    the series.
+        format:    "sympy", "latex" or "mathematica", the Mathematica form has no order term.
+
+    Return:
+        the series text.
+    """
+    if format == "sympy":
+        return str(expr)
+    elif format == "latex":
+        return latex(expr)
+    elif format == "mathematica":
+        return mathematica_code(expr.removeO())
+    else:
+        raise ValueError(f"format must be one of {seriesFormats}")
+
+def expandSeries(state: SymPySeriesState | None,
+                 expression: str,
+                 variable: str,
+                 point: str,
+                 order: int,
+                 format: str) -> Tuple[SymPySeriesState, str]:
+    """
+    expand the series, continuing from the state when given, used by worker processes.
+
+    Args:
+        state:    the cached state; else none.
+        expression:    the expression.
+        variable:    the expansion variable name.
+        point:    the expansion point.
+        order:    the order.
+        format:    the output format.
+
+    Return:
+        the extended state and the series text.
+    """
+    if order < 1 or order > maxSeriesOrder:
+        raise ValueError(f"order must be 1 to {maxSeriesOrder}")
+
+    if state is None:
+        state = createSeriesState(expression, variable, point)
+
+    # the series is recomputed only above the state order.
+    if state.order < order:
+        state.extend(order)
+
+    return state, formatSeries(state.getSeries(order), format)
+
+# SymPy series cache.
+class SymPySeriesCache:
+    """
+    SymPy series cache, the series states by (expression, variable, point).
+    """
+    def __init__(self, cacheSize: int = 256):
+        """
+        Args:
+            cacheSize:    the maximum number of cached series.
+        """
+        self.cacheSize = cacheSize
+        self.cache: OrderedDict[Tuple[str, str, str], SymPySeriesState] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits: int = 0
+        self.extended: int = 0
+        self.misses: int = 0
+
+    def __repr__(self):
+        return f"SymPySeriesCache(cacheSize={self.cacheSize}, " \
+            f"cached={len(self.cache)}, " \
+            f"hits={self.hits}, " \
+            f"extended={self.extended}, " \
+            f"misses={self.misses})"
+
+    def getKey(self, expression: str, variable: str, point: str) -> Tuple[str, str, str]:
+        """
+        get the cache key.
+
+        Args:
+            expression:    the expression.
+            variable:    the expansion variable name.
+            point:    the expansion point.
+
+        Return:
+            the key.
+        """
+        return ("".join(expression.split()), variable.strip(), "".join(point.split()))
+
+    def get(self, key: Tuple[str, str, str], order: int) -> SymPySeriesState | None:
+        """
+        get the cached state.
+
+        Args:
+            key:    the cache key.
+            order:    the requested order, used for the metrics.
+
+        Return:
+            the state; else none.
+        """
+        with self.lock:
+            state: SymPySeriesState | None = self.cache.get(key)
+            if state is None:
+                self.misses += 1
+                return None
+
+            self.cache.move_to_end(key)
+            if state.order >= order:
+                self.hits += 1
+            else:
+                self.extended += 1
+            return state
+
+    def put(self, key: Tuple[str, str, str], state: SymPySeriesState) -> None:
+        """
+        cache the state, a lower order state does not replace a higher one.
+
+        Args:
+            key:    the cache key.
+            state:    the state.
+        """
+        with self.lock:
+            cached: SymPySeriesState | None = self.cache.get(key)
+            if cached is None or cached.order < state.order:
+                self.cache[key] = state
+
+            self.cache.move_to_end(key)
+            if len(self.cache) > self.cacheSize:
+                self.cache.popitem(last=False)
@@ -0,0 +1,231 @@
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Any, List, Union, Dict, Tuple
+
+from sympy import latex, cxxcode, jscode, mathematica_code, pi, E, sqrt, Pow, Abs, evaluate
+from sympy.parsing.mathematica import parse_mathematica
+
+from .SymPyParser import SymPyParser, defaultParser, evaluateParsed, parseExpression as parseSymPy
+from .SymPyFormats import formats
+
+# C++ <cmath> constants.
+cppConstants: Dict[str, Any] = {
+    "M_PI": pi, "M_PI_2": pi / 2, "M_PI_4": pi / 4, "M_1_PI": 1 / pi, "M_2_PI": 2 / pi,
+    "M_2_SQRTPI": 2 / sqrt(pi), "M_SQRT2": sqrt(2), "M_SQRT1_2": 1 / sqrt(2), "M_E": E
+}
+
+# JavaScript Math constants, after "Math." is removed.
+javascriptConstants: Dict[str, Any] = {
+    "PI": pi, "E": E, "SQRT2": sqrt(2), "SQRT1_2": 1 / sqrt(2)
+}
+
+# the C++ and JavaScript parsers, with the constants and the functions not named as in SymPy.
+cppParser: SymPyParser = SymPyParser(locals={ **cppConstants, "pow": Pow, "fabs": Abs, "abs": Abs })
+javascriptParser: SymPyParser = SymPyParser(locals={ **javascriptConstants, "pow": Pow, "abs": Abs })
+
+# SymPy math translator.
+class SymPyTranslator:
+    """
+    SymPy math translator.
+    converts between LaTeX, SymPy, C++, JavaScript and Mathematica,
+    each parsed expression is cached so one parse feeds every output printer.
+    """
+    def __init__(self, cacheSize: int = 4096):
+        """
+        Args:
+            cacheSize:    the maximum number of cached parsed expressions.
+        """
+        self.cacheSize = cacheSize
+        self.cache: OrderedDict[Tuple[str, str], Any] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __repr__(self):
+        return f"SymPyTranslator(cacheSize={self.cacheSize}, " \
+            f"cached={len(self.cache)}, " \
+            f"hits={self.hits}, " \
+            f"misses={self.misses})"
+
+    def parse(self, expression: str, format: str) -> Any:
+        """
+        parse the expression, the parsed expression is cached.
+
+        Args:
+            expression:    the expression text.
+            format:    the expression format.
+
+        Return:
+            the SymPy expression.
+        """
+        key: Tuple[str, str] = (format, expression.strip())
+
+        # cached.
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key]
+
+        expr: Any = parseExpression(key[1], format)
+
+        with self.lock:
+            self.misses += 1
+            self.cache[key] = expr
+            if len(self.cache) > self.cacheSize:
+                self.cache.popitem(last=False)
+
+        # return the expression.
+        return expr
+
+    def translate(self, expression: str, fromFormat: str, toFormats: List[str]) -> Dict[str, str]:
+        """
+        translate the expression to each format.
+
+        Args:
+            expression:    the expression text.
+            fromFormat:    the expression format.
+            toFormats:    the output formats.
+
+        Return:
+            the output text for each format, a format that can not print the expression
+            is "error: ...", the other formats are still printed.
+        """
+        expr: Any = self.parse(expression, fromFormat)
+
+        # one parse, every printer.
+        result: Dict[str, str] = {}
+        for format in toFormats:
+            try:
+                result[format] = printExpression(expr, format)
+            except Exception as e:
+                result[format] = f"error: {e}"
+
+        # return the result.
+        return result
+
+    def translateBatch(self,
+                       expressions: List[str],
+                       fromFormat: str,
+                       toFormats: List[str],
+                       workers: int | None = None,
+                       chunkSize: int = 64) -> List[Dict[str, str]]:
+        """
+        translate many expressions in parallel worker processes.
+
+        Args:
+            expressions:    the expression texts.
+            fromFormat:    the expression format.
+            toFormats:    the output formats.
+            workers:    the number of worker processes; else one per CPU.
+            chunkSize:    the number of expressions sent to a worker at once.
+
+        Return:
+            the output text for each format, or an "error", in expression order.
+        """
+        # each distinct expression is translated once.
+        unique: List[str] = list(dict.fromkeys(expressions))
+        chunks: List[List[str]] = [unique[i:i + chunkSize] for i in range(0, len(unique), chunkSize)]
+        results: Dict[str, Dict[str, str]] = {}
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk, translated in zip(chunks, executor.map(
+                    translateChunk, chunks, [fromFormat] * len(chunks), [toFormats] * len(chunks))):
+                results.update(zip(chunk, translated))
+
+        # return in expression order.
+        return [results[expression] for expression in expressions]
+
+def parseExpression(expression: str, format: str) -> Any:
+    """
+    parse the expression.
+
+    Args:
+        expression:    the expression text.
+        format:    the expression format.
+
+    Return:
+        the SymPy expression.
+    """
+    if format == "latex":
+        # imported on first use, loads the antlr parser.
+        from latex2sympy2 import latex2sympy
+
+        # latex2sympy builds the tree unevaluated, e.g. \binom{400000}{200000} is not computed,
+        # then it is rebuilt with the parser checks, which also folds the products, e.g. 1*x**2/2.
+        with evaluate(False):
+            expr: Any = latex2sympy(expression)
+        return defaultParser.rebuild(expr)
+    elif format == "sympy":
+        return evaluateParsed(parseSymPy(expression))
+    elif format == "cpp":
+        return evaluateParsed(cppParser.parse(expression.replace("std::", "")))
+    elif format == "javascript":
+        return evaluateParsed(javascriptParser.parse(expression.replace("Math.", "")))
+    elif format == "mathematica":
+        return parse_mathematica(expression)
+    else:
+        raise ValueError(f"format must be one of {formats}")
+
+def printExpression(expr: Any, format: str) -> str:
+    """
+    print the expression.
+
+    Args:
+        expr:    the SymPy expression.
+        format:    the output format.
+
+    Return:
+        the expression text.
+    """
+    if format == "latex":
+        return latex(expr)
+    elif format == "sympy":
+        return str(expr)
+    elif format == "cpp":
+        return cxxcode(expr, standard='C++11')
+    elif format == "javascript":
+        return jscode(expr)
+    elif format == "mathematica":
+        code: str = mathematica_code(expr)
+        if code.startswith("Hold[") and code.endswith("]"):
+            code = code[len("Hold["):-1]
+        return code
+    else:
+        raise ValueError(f"format must be one of {formats}")
+
+# the translator of this process.
+defaultTranslator: SymPyTranslator = SymPyTranslator()
+
+def translateExpression(expression: str, fromFormat: str, toFormats: List[str]) -> Dict[str, str]:
+    """
+    translate the expression with the process translator.
+
+    Args:
+        expression:    the expression text.
+        fromFormat:    the expression format.
+        toFormats:    the output formats.
+
+    Return:
+        the output text for each format, or an "error".
+    """
+    try:
+        return defaultTranslator.translate(expression, fromFormat, toFormats)
+    except Exception as e:
+        return { "error": f"error: {e}" }
+
+def translateChunk(expressions: List[str], fromFormat: str, toFormats: List[str]) -> List[Dict[str, str]]:
+    """
+    translate a chunk of expressions with the process translator, used by worker processes.
+
+    Args:
+        expressions:    the expression texts.
+        fromFormat:    the expression format.
+        toFormats:    the output formats.
+
+    Return:
+        the output text for each format, or an "error", in expression order.
+    """
+    return [translateExpression(expression, fromFormat, toFormats) for expression in expressions]
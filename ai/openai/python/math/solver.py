@@ -1,5 +1,11 @@
+import sys
 import openai
 
+# add search path
+sys.path.append("../")
+
+from model_stream import stream_chat
+
 # supply your API key however you choose
 openai.api_key = "OPENAI_API_KEY"
 
@@ -11,8 +17,10 @@ system_prompt = (
 
 # Pass the image to the LLM for interpretation  
 def get_math_solver(prompt):
-
-    response = openai.ChatCompletion.create(
+    """
+    the streamed solution, the time to first token and tokens per second are logged when it ends.
+    """
+    return stream_chat(
         model="gpt-4o-mini",
         messages=[
             {
@@ -25,11 +33,11 @@ def get_math_solver(prompt):
             }
         ],
     )
-    return response
 
 
 problem = "What is the integral of x to the power of 3, between 0 and 2?, respond in latex format with the math equation only, do not include the answer."
 response = get_math_solver("I need to solve the following math problem: " + problem)
-print(response['choices'][0]['message']['content'])
-print(response)
-
+for token in response:
+    print(token, end="", flush=True)
+print()
+print(response.metrics)
@@ -5,7 +5,9 @@ import asyncio
 
 # add search path
 sys.path.append("../publish/")
+sys.path.append("../")
 
+from model_stream import astream_response
 from nequeo.ai.mcp.clients.MathJsMath import MathJsMath
 
 # supply your API key however you choose
@@ -75,8 +77,9 @@ async def main():
                 # display result.
                 print(result.content[0].text)
 
-                # run the AI on result
-                responseEval = openai.responses.create(
+                # run the AI on result, the description is printed as it streams.
+                responseEval = astream_response(
+                    client = openai.AsyncOpenAI(api_key = openai.api_key),
                     model = "gpt-4.1-nano",
                     input = [
                         {
@@ -86,8 +89,11 @@ async def main():
                     ]
                 )
 
-                # print response.
-                print(responseEval.output_text)
+                # print response, the stream is closed when the block exits.
+                async with responseEval:
+                    async for token in responseEval:
+                        print(token, end = "", flush = True)
+                print()
 
 if __name__ == "__main__":
     asyncio.run(main())
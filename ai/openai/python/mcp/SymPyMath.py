@@ -5,7 +5,10 @@ import asyncio
 
 # add search path
 sys.path.append("../publish/")
+sys.path.append("../")
 
+from model_stream import astream_response
+from nequeo.ai.mcp.McpClientPool import McpClientPool
 from nequeo.ai.mcp.clients.SymPyMath import SymPyMath
 
 # supply your API key however you choose
@@ -19,6 +22,21 @@ async def main():
     # the math to evaluate.
     mathExpression = "integrate(x**2, x)";
 
+    # warm servers start while the model responds, a symbolic call loads SymPy in the server.
+    pool = McpClientPool("PATH-TO-SYMPY-SERVER", size = 2, maxCalls = 500, maxMemory = 1024 * 1024 * 1024,
+        clientFactory = SymPyMath, warmup = lambda client: client.callMathExpressionEvaluatorTool("x"))
+    await pool.start()
+
+    try:
+        await runMath(pool, mathExpression)
+    finally:
+        await pool.close()
+
+async def runMath(pool: McpClientPool, mathExpression: str):
+    """
+    run math with a client from the pool.
+    """
+
     # the tools
     tools = [
         {
@@ -42,8 +60,11 @@ async def main():
         }    
     ]
 
+    # the async client, so the pool keeps starting servers while the model responds.
+    client = openai.AsyncOpenAI(api_key = openai.api_key)
+
     # run the AI
-    response = openai.responses.create(
+    response = await client.responses.create(
         model = "gpt-4.1-nano",
         input = [
             {
@@ -61,22 +82,28 @@ async def main():
         """
         if output
         """
-        for tool in response.output:
-            if (tool.name == "MathExpressionEvaluator" and tool.type == "function_call"):
-
-                # connect to the server from the client.
-                sympymathClient = SymPyMath()
-                await sympymathClient.openConnectionStdio("PATH-TO-SYMPY-SERVER")
+        # the math tool calls of this turn.
+        toolCalls = [
+            tool for tool in response.output
+            if (tool.type == "function_call" and tool.name == "MathExpressionEvaluator")
+        ]
 
-                # call the tool
-                result = await sympymathClient.callMathExpressionEvaluatorTool(json.loads(tool.arguments)["expression"])
-                await sympymathClient.closeConnection()
+        if (len(toolCalls) > 0):
+            # a warm client from the pool, for all calls.
+            async with pool.connection() as sympymathClient:
+                # call the tools concurrently.
+                results = await asyncio.gather(*[
+                    sympymathClient.callMathExpressionEvaluatorTool(json.loads(tool.arguments)["expression"])
+                    for tool in toolCalls
+                ])
 
+            for result in results:
                 # display result.
                 print(result.content[0].text)
 
-                # run the AI on result
-                responseEval = openai.responses.create(
+                # run the AI on result, the description is printed as it streams.
+                responseEval = astream_response(
+                    client = client,
                     model = "gpt-4.1-nano",
                     input = [
                         {
@@ -86,8 +113,11 @@ async def main():
                     ]
                 )
 
-                # print response.
-                print(responseEval.output_text)
+                # print response, the stream is closed when the block exits.
+                async with responseEval:
+                    async for token in responseEval:
+                        print(token, end = "", flush = True)
+                print()
 
 if __name__ == "__main__":
     asyncio.run(main())
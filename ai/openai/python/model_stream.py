@@ -0,0 +1,227 @@
+import sys
+import time
+
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+
+import openai
+
+# the log event handler of the MCP classes, (level, kind, message, data).
+LogEvent = Callable[[str, str, str, Any], None]
+
+def print_event(level: str, kind: str, message: str, data: Any = None):
+    """
+    write the event to stderr, so the streamed tokens on stdout are not interleaved with it.
+    """
+    print(f"[{level}] {kind}: {message}", file=sys.stderr)
+
+@dataclass
+class CallMetrics:
+    """
+    the timing of one model call. tokens is the reported completion tokens; else the number of
+    streamed chunks. tokens_per_second is the generation rate after the first token.
+    """
+    model: str
+    ttft: Optional[float] = None
+    seconds: float = 0.0
+    tokens: int = 0
+    tokens_per_second: float = 0.0
+    completed: bool = False
+
+class StreamRecorder:
+    """
+    collects the tokens of a streamed call and measures it.
+    """
+    def __init__(self, model: str, log_event: Optional[LogEvent] = None, responses: bool = False):
+        self.model = model
+        self.log_event = log_event
+        self.responses = responses
+        self.metrics = CallMetrics(model)
+        self.parts: List[str] = []
+        self.finish_reason: Optional[str] = None
+        self.usage: Optional[Dict[str, Any]] = None
+        self.start = 0.0
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    def begin(self):
+        self.start = time.perf_counter()
+
+    def token(self, event: Any) -> Optional[str]:
+        """
+        the text of a chat completion chunk or a responses event; else none.
+        """
+        text = None
+        if self.responses:
+            if event.type == "response.output_text.delta":
+                text = event.delta
+            elif event.type == "response.completed" and event.response.usage is not None:
+                self.usage = event.response.usage.model_dump()
+                self.metrics.tokens = event.response.usage.output_tokens
+        else:
+            if event.choices:
+                text = event.choices[0].delta.content
+                self.finish_reason = event.choices[0].finish_reason or self.finish_reason
+            if getattr(event, "usage", None) is not None:
+                self.usage = event.usage.model_dump()
+                self.metrics.tokens = event.usage.completion_tokens
+
+        if not text:
+            return None
+        if self.metrics.ttft is None:
+            self.metrics.ttft = time.perf_counter() - self.start
+        self.parts.append(text)
+        return text
+
+    def end(self, completed: bool):
+        metrics = self.metrics
+        metrics.seconds = time.perf_counter() - self.start
+        metrics.completed = completed
+        if self.usage is None:
+            metrics.tokens = len(self.parts)
+
+        generating = metrics.seconds - (metrics.ttft or 0.0)
+        metrics.tokens_per_second = (metrics.tokens - 1) / generating if metrics.tokens > 1 and generating > 0 else 0.0
+
+        if self.log_event:
+            ttft = f"{metrics.ttft:.3f}" if metrics.ttft is not None else "-"
+            self.log_event("info" if completed else "error", "metrics",
+                           f"{self.model} ttft {ttft}s, {metrics.tokens_per_second:.1f} tokens/s, "
+                           f"{metrics.tokens} tokens in {metrics.seconds:.3f}s", metrics)
+
+    def completion(self) -> Dict[str, Any]:
+        """
+        the streamed call as a chat completion, e.g. to cache it.
+        """
+        return {
+            "id": "stream",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": self.model,
+            "choices": [{"index": 0, "finish_reason": self.finish_reason or "stop",
+                         "message": {"role": "assistant", "content": self.text}}],
+            "usage": self.usage if not self.responses else None
+        }
+
+class ModelStream(StreamRecorder):
+    """
+    iterate for the tokens as they arrive, then text, metrics and usage hold the whole call.
+    """
+    def __init__(self, create: Callable[[], Any], model: str, log_event: Optional[LogEvent] = None, responses: bool = False):
+        super().__init__(model, log_event, responses)
+        self.create = create
+
+    def __iter__(self) -> Iterator[str]:
+        self.begin()
+        completed = False
+        stream = None
+        try:
+            stream = self.create()
+            for event in stream:
+                text = self.token(event)
+                if text is not None:
+                    yield text
+            completed = True
+        finally:
+            # a stream left early closes its connection.
+            if stream is not None:
+                stream.close()
+            self.end(completed)
+
+class AsyncModelStream(StreamRecorder):
+    """
+    the async client stream, iterate with async for. an async generator left early is only closed
+    when it is collected, so iterate inside async with, or call aclose, to close the connection
+    and send the metrics at once.
+    """
+    def __init__(self, create: Callable[[], Awaitable[Any]], model: str, log_event: Optional[LogEvent] = None, responses: bool = False):
+        super().__init__(model, log_event, responses)
+        self.create = create
+        self.iterator: Optional[AsyncGenerator[str, None]] = None
+
+    async def __aenter__(self) -> "AsyncModelStream":
+        return self
+
+    async def __aexit__(self, *exc_info: Any):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        stop the call if it is still streaming, the metrics record it as not completed.
+        """
+        if self.iterator is not None:
+            await self.iterator.aclose()
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        self.iterator = self.tokens()
+        return self.iterator
+
+    async def tokens(self) -> AsyncGenerator[str, None]:
+        self.begin()
+        completed = False
+        stream = None
+        try:
+            stream = await self.create()
+            async for event in stream:
+                text = self.token(event)
+                if text is not None:
+                    yield text
+            completed = True
+        finally:
+            # a stream left early closes its connection.
+            if stream is not None:
+                await stream.close()
+            self.end(completed)
+
+def stream_chat(messages: List[Dict[str, Any]],
+                model: str,
+                client: Any = None,
+                log_event: Optional[LogEvent] = print_event,
+                include_usage: bool = True,
+                **kwargs) -> ModelStream:
+    """
+    a streamed chat completion, no request is made until it is iterated.
+    include_usage asks for the token counts, turn it off for servers that do not support it.
+    """
+    client = client or openai
+    options = {"stream_options": {"include_usage": True}} if include_usage else {}
+    return ModelStream(lambda: client.chat.completions.create(model=model, messages=messages, stream=True, **options, **kwargs),
+                       model, log_event)
+
+def astream_chat(messages: List[Dict[str, Any]],
+                 model: str,
+                 client: "openai.AsyncOpenAI",
+                 log_event: Optional[LogEvent] = print_event,
+                 include_usage: bool = True,
+                 **kwargs) -> AsyncModelStream:
+    """
+    a streamed chat completion of the async client.
+    """
+    options = {"stream_options": {"include_usage": True}} if include_usage else {}
+    return AsyncModelStream(lambda: client.chat.completions.create(model=model, messages=messages, stream=True, **options, **kwargs),
+                            model, log_event)
+
+def stream_response(input: Any,
+                    model: str,
+                    client: Any = None,
+                    log_event: Optional[LogEvent] = print_event,
+                    **kwargs) -> ModelStream:
+    """
+    a streamed responses API call.
+    """
+    client = client or openai
+    return ModelStream(lambda: client.responses.create(model=model, input=input, stream=True, **kwargs),
+                       model, log_event, responses=True)
+
+def astream_response(input: Any,
+                     model: str,
+                     client: "openai.AsyncOpenAI",
+                     log_event: Optional[LogEvent] = print_event,
+                     **kwargs) -> AsyncModelStream:
+    """
+    a streamed responses API call of the async client.
+    """
+    return AsyncModelStream(lambda: client.responses.create(model=model, input=input, stream=True, **kwargs),
+                            model, log_event, responses=True)
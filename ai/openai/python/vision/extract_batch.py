@@ -0,0 +1,52 @@
+import sys
+import asyncio
+import argparse
+
+from vision_extraction import prompts, default_model, read_directory, read_manifest, run_batch
+from image_preprocess import PreprocessOptions
+from vision_cache import VisionCache, default_cache_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract math from many images with a vision model.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--images', type=str, help='Directory of images')
+    source.add_argument('--manifest', type=str, help='File of image paths or JSONL {"image", "id", "mode", "prompt"}')
+    parser.add_argument('--output', type=str, required=True, help='Results JSONL, also the checkpoint to resume from')
+    parser.add_argument('--mode', type=str, default='math', choices=list(prompts), help='Extraction prompt')
+    parser.add_argument('--model', type=str, default=default_model, help='Vision model')
+    parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight')
+    parser.add_argument('--rpm', type=float, default=0, help='Requests per minute, 0 for no limit')
+    parser.add_argument('--base-url', type=str, default=None, help='OpenAI-compatible API URL, e.g. a local server')
+    parser.add_argument('--api-key', type=str, default=None, help='API key, else OPENAI_API_KEY')
+    parser.add_argument('--max-retries', type=int, default=5, help='Retries of rate limited and failed requests')
+    parser.add_argument('--timeout', type=float, default=120, help='Request timeout in seconds')
+    parser.add_argument('--no-preprocess', action='store_true', help='Send the image files as they are')
+    parser.add_argument('--max-side', type=int, default=2048, help='Longest image side after preprocessing')
+    parser.add_argument('--max-short-side', type=int, default=768, help='Shortest image side after preprocessing')
+    parser.add_argument('--color', action='store_true', help='Keep color, else grayscale')
+    parser.add_argument('--no-crop', action='store_true', help='Keep the whitespace border')
+    parser.add_argument('--image-format', type=str, default='auto', choices=['auto', 'png', 'jpeg', 'webp'], help='Recompressed format, auto keeps the smaller of PNG and JPEG')
+    parser.add_argument('--quality', type=int, default=85, help='JPEG and WebP quality')
+    parser.add_argument('--cache', type=str, default=default_cache_path, help='Result cache, shared with the vision scripts')
+    parser.add_argument('--cache-size', type=int, default=256, help='Result cache size in MB')
+    parser.add_argument('--no-cache', action='store_true', help='Always call the model')
+
+    args = parser.parse_args()
+    preprocess = None if args.no_preprocess else PreprocessOptions(
+        args.max_side, args.max_short_side, not args.color, not args.no_crop, format=args.image_format, quality=args.quality)
+    cache = None if args.no_cache else VisionCache(args.cache, args.cache_size * 1024 * 1024)
+    items = list(read_directory(args.images, args.mode) if args.images else read_manifest(args.manifest, args.mode))
+
+    counts = asyncio.run(run_batch(items, args.output, args.model, args.concurrency, args.rpm,
+                                   args.base_url, args.api_key, args.max_retries, args.timeout, preprocess, cache))
+    print(counts)
+    if counts["failed"] > 0:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
+
+# python extract_batch.py --images worksheets/ --output worksheets.jsonl --mode handwritten --concurrency 16 --rpm 500
+# {'total': 2400, 'skipped': 0, 'completed': 2398, 'cached': 310, 'failed': 2}
+# python extract_batch.py --images worksheets/ --output worksheets.jsonl --mode handwritten --concurrency 16 --rpm 500
+# {'total': 2400, 'skipped': 2398, 'completed': 2, 'cached': 0, 'failed': 0}
@@ -0,0 +1,76 @@
+import os
+import sys
+import json
+import asyncio
+import tempfile
+
+from typing import List
+
+from vision_extraction import VisionItem, read_completed, run_batch
+from fake_openai_server import FakeOpenAIServer
+
+async def check_batch(directory: str) -> List[str]:
+    """
+    run a batch against the fake server twice, the failed checks. the first run is rate limited
+    on one image and fails on another, the second run resumes from the checkpoint.
+    """
+    failed: List[str] = []
+    items: List[VisionItem] = []
+    for name, prompt in (("a", "image contains math"), ("b", "rate limit"), ("c", "fail"), ("d", "image contains math")):
+        path = os.path.join(directory, name + ".png")
+        with open(path, "wb") as file:
+            file.write(b"\x89PNG\r\n\x1a\n" + name.encode("ascii"))
+        items.append(VisionItem(name, path, "math", prompt))
+
+    output = os.path.join(directory, "results.jsonl")
+    fake = FakeOpenAIServer()
+    base_url = fake.start()
+    try:
+        # the rate limited image is retried, the failing image goes to the errors file.
+        counts = await run_batch(items, output, "fake-model", concurrency=2, base_url=base_url, api_key="test",
+                                 max_retries=3, timeout=10, preprocess=None, cache=None)
+        if counts != {"total": 4, "skipped": 0, "completed": 3, "cached": 0, "failed": 1}:
+            failed.append(f"first run counts: {counts}")
+        if fake.requests.get("rate limit") != 3:
+            failed.append(f"rate limited requests: {fake.requests.get('rate limit')}")
+        with open(output + ".errors.jsonl", "r", encoding="utf-8") as file:
+            errors = [json.loads(line) for line in file]
+        if [error["id"] for error in errors] != ["c"] or "BadRequestError" not in errors[0]["error"]:
+            failed.append(f"errors file: {errors}")
+
+        # a crash cut the last line short, it is ignored and the next record starts on its own line.
+        with open(output, "a", encoding="utf-8") as file:
+            file.write('{"id": "c", "ima')
+
+        # the next run resumes, only the failed image is sent.
+        fake.failing = False
+        counts = await run_batch(items, output, "fake-model", concurrency=2, base_url=base_url, api_key="test",
+                                 max_retries=3, timeout=10, preprocess=None, cache=None)
+        if counts != {"total": 4, "skipped": 3, "completed": 1, "cached": 0, "failed": 0}:
+            failed.append(f"resumed run counts: {counts}")
+        if fake.requests.get("image contains math") != 2 or fake.requests.get("fail") != 2:
+            failed.append(f"resumed requests: {fake.requests}")
+        if read_completed(output) != {"a", "b", "c", "d"}:
+            failed.append(f"resumed results: {sorted(read_completed(output))}")
+        if os.path.getsize(output + ".errors.jsonl") != 0:
+            failed.append("resumed errors file is not empty")
+    finally:
+        fake.stop()
+
+    return failed
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        failed = asyncio.run(check_batch(directory))
+
+    for failure in failed:
+        print(f"failed: {failure}")
+    print("extract batch: " + ("failed" if failed else "passed"))
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
+
+# python extract_batch_check.py
+# extract batch: passed
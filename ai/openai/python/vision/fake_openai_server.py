@@ -0,0 +1,76 @@
+import json
+import threading
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Any, Dict, Optional, Tuple
+
+class FakeOpenAIServer:
+    """
+    an OpenAI-compatible /v1/chat/completions endpoint for the batch scripts, answered by the prompt text.
+    a prompt containing "rate limit" is answered 429 rate_limited times first, one containing "fail"
+    is answered 400 while failing is set, any other prompt gets the answer "$$x^2$$".
+    """
+    def __init__(self, rate_limited: int = 2, failing: bool = True):
+        self.rate_limited = rate_limited
+        self.failing = failing
+        self.requests: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def answer(self, request: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """
+        the status and the JSON body of one request.
+        """
+        user = [message["content"] for message in request["messages"] if message["role"] == "user"]
+        prompt = " ".join(part["text"] for content in user
+                          for part in (content if isinstance(content, list) else [{"type": "text", "text": content}]) if part["type"] == "text")
+        with self.lock:
+            count = self.requests[prompt] = self.requests.get(prompt, 0) + 1
+
+        if "rate limit" in prompt and count <= self.rate_limited:
+            return 429, {"error": {"message": "rate limited", "type": "rate_limit_exceeded", "code": None, "param": None}}
+        if "fail" in prompt and self.failing:
+            return 400, {"error": {"message": "unreadable image", "type": "invalid_request_error", "code": None, "param": None}}
+
+        return 200, {
+            "id": f"chatcmpl-{count}", "object": "chat.completion", "created": 0, "model": request["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "$$x^2$$"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+        }
+
+    def start(self) -> str:
+        """
+        serve on a free local port, the base URL.
+        """
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+                if self.path.rstrip("/") != "/v1/chat/completions":
+                    self.send_error(404)
+                    return
+
+                status, answer = fake.answer(json.loads(body))
+                data = json.dumps(answer).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    # the client waits this long before retrying.
+                    self.send_header("retry-after-ms", "10")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,148 @@
+import io
+import base64
+import mimetypes
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Pillow is optional, without it the image file is sent as it is.
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+# base64 encodes 3 bytes to 4 characters, so chunks of a multiple of 3 bytes join without padding.
+encode_chunk_size = 3 * 256 * 1024
+
+@dataclass
+class PreprocessOptions:
+    """
+    the vision models scale an image to fit 2048 x 2048 and then its short side to 768,
+    any larger image is uploaded and paid for without adding detail.
+    """
+    max_side: int = 2048
+    max_short_side: int = 768
+    grayscale: bool = True
+    crop: bool = True
+    crop_threshold: int = 24
+    crop_margin: int = 16
+    format: str = "auto"
+    quality: int = 85
+
+def is_available() -> bool:
+    """
+    is Pillow installed.
+    """
+    return Image is not None
+
+def encode_base64(data) -> str:
+    """
+    base64 encode in chunks, so the bytes are not copied whole into an encoded bytes and then a string.
+    """
+    view = memoryview(data)
+    return "".join(base64.b64encode(view[i:i + encode_chunk_size]).decode("ascii")
+                   for i in range(0, len(view), encode_chunk_size))
+
+def encode_file(image_path: str) -> Tuple[str, str]:
+    """
+    the media type and base64 of the image file as it is, read in chunks.
+    """
+    media_type = mimetypes.guess_type(image_path)[0] or "image/jpeg"
+    parts: List[str] = []
+    with open(image_path, "rb") as image_file:
+        while True:
+            chunk = image_file.read(encode_chunk_size)
+            if not chunk:
+                break
+            parts.append(base64.b64encode(chunk).decode("ascii"))
+
+    return media_type, "".join(parts)
+
+def target_size(width: int, height: int, options: PreprocessOptions) -> Tuple[int, int]:
+    """
+    the size that fits max_side and max_short_side, never larger than the image.
+    """
+    scale = min(1.0, options.max_side / max(width, height), options.max_short_side / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def crop_whitespace(image, options: PreprocessOptions):
+    """
+    crop the near white border, keeping a margin around the content.
+    """
+    gray = image if image.mode == "L" else image.convert("L")
+    content = gray.point(lambda value: 255 if value < 255 - options.crop_threshold else 0)
+    box = content.getbbox()
+    if box is None:
+        return image
+
+    left, top, right, bottom = box
+    margin = options.crop_margin
+    return image.crop((max(0, left - margin), max(0, top - margin),
+                       min(image.width, right + margin), min(image.height, bottom + margin)))
+
+def flatten(image):
+    """
+    the image in L or RGB mode, transparency flattened onto white.
+    """
+    if image.mode in ("L", "RGB"):
+        return image
+    if "A" not in image.getbands() and "transparency" not in image.info:
+        return image.convert("L" if image.mode in ("1", "I", "I;16", "F") else "RGB")
+
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.convert("RGBA").getchannel("A"))
+    return background
+
+def encode_image(image, options: PreprocessOptions) -> Tuple[str, bytes]:
+    """
+    recompress the image, "auto" keeps the smaller of PNG (scanned text) and JPEG (photos).
+    """
+    formats = ["PNG", "JPEG"] if options.format == "auto" else [options.format.upper()]
+    encoded: List[Tuple[str, bytes]] = []
+    for format in formats:
+        buffer = io.BytesIO()
+        if format == "JPEG":
+            image.save(buffer, "JPEG", quality=options.quality, optimize=True)
+        elif format == "WEBP":
+            image.save(buffer, "WEBP", quality=options.quality)
+        else:
+            image.save(buffer, format)
+        encoded.append((Image.MIME[format], buffer.getvalue()))
+
+    return min(encoded, key=lambda item: len(item[1]))
+
+def preprocess_image(image_path: str, options: Optional[PreprocessOptions] = None) -> Tuple[str, str]:
+    """
+    the media type and base64 of the preprocessed image, grayscale, cropped and downscaled;
+    else the file as it is when Pillow is not installed or the file is already smaller at the same size.
+    """
+    if Image is None:
+        return encode_file(image_path)
+
+    options = options or PreprocessOptions()
+    with Image.open(image_path) as image:
+        original_size = image.size
+        original_type = Image.MIME.get(image.format or "")
+
+        # JPEG decodes at a reduced scale, the full resolution scan is never held in memory.
+        # the crop can remove most of the page, so twice the target is kept for it.
+        width, height = target_size(image.width, image.height, options)
+        scale = 2 if options.crop else 1
+        image.draft("L" if options.grayscale else "RGB", (width * scale, height * scale))
+        image = flatten(ImageOps.exif_transpose(image))
+
+        if options.grayscale and image.mode != "L":
+            image = image.convert("L")
+        if options.crop:
+            image = crop_whitespace(image, options)
+
+        image.thumbnail(target_size(image.width, image.height, options), Image.LANCZOS)
+        media_type, data = encode_image(image, options)
+
+    # e.g. a small compressed JPEG that needed no change.
+    if image.size == original_size and original_type in ("image/png", "image/jpeg", "image/webp", "image/gif"):
+        with open(image_path, "rb") as image_file:
+            if image_file.seek(0, 2) <= len(data):
+                return encode_file(image_path)
+
+    return media_type, encode_base64(data)
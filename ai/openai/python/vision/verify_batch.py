@@ -0,0 +1,27 @@
+import sys
+import asyncio
+import argparse
+
+from vision_verify import verify_results
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve the extracted LaTeX with SymPy and check the model's answers.")
+    parser.add_argument('--input', type=str, required=True, help='Results JSONL of extract_batch.py')
+    parser.add_argument('--output', type=str, required=True, help='Verified JSONL, also the checkpoint to resume from')
+    parser.add_argument('--workers', type=int, default=2, help='SymPy worker processes')
+    parser.add_argument('--timeout', type=float, default=30, help='Seconds per image before its worker is killed')
+    parser.add_argument('--precision', type=int, default=15, help='Significant digits')
+    parser.add_argument('--tolerance', type=float, default=1e-9, help='Relative tolerance of a matching answer')
+
+    args = parser.parse_args()
+    counts = asyncio.run(verify_results(args.input, args.output, args.workers, args.timeout, args.precision, args.tolerance))
+    print(counts)
+    if counts["disagrees"] > 0:
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
+
+# python extract_batch.py --images worksheets/ --output worksheets.jsonl --mode latex_solve
+# python verify_batch.py --input worksheets.jsonl --output verified.jsonl --workers 4
+# {'total': 2400, 'skipped': 0, 'agrees': 2291, 'disagrees': 37, 'solved': 0, 'unparsed': 70, 'timeout': 2}
@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from typing import Any, Dict, Optional
+
+# the shared cache of the vision scripts.
+default_cache_path = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "nequeo", "vision-cache.sqlite")
+
+# the file is hashed in chunks.
+hash_chunk_size = 1024 * 1024
+
+def cache_key(image_path: str, system_prompt: str, model: str, prompt: str, options: Any = None) -> str:
+    """
+    the sha256 of the image bytes, the prompts, the model and the preprocessing options.
+    """
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as image_file:
+        while True:
+            chunk = image_file.read(hash_chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+
+    # each field is length prefixed, so no two different requests hash the same text.
+    for field in (system_prompt, model, prompt, repr(options)):
+        data = field.encode("utf-8")
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+
+    return digest.hexdigest()
+
+class VisionCache:
+    """
+    vision results by content hash in SQLite, the least recently used are evicted above max_bytes.
+    safe to share between threads and between processes.
+    """
+    def __init__(self, path: str = default_cache_path, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+
+        # the total size is kept by triggers, so a put does not sum the table. it is summed once,
+        # when a cache without it is opened.
+        with self.lock, self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), size INTEGER NOT NULL)")
+            self.connection.execute("INSERT OR IGNORE INTO totals (id, size) SELECT 0, COALESCE(SUM(size), 0) FROM results")
+            self.connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS results_insert AFTER INSERT ON results "
+                "BEGIN UPDATE totals SET size = size + NEW.size WHERE id = 0; END")
+            self.connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS results_update AFTER UPDATE OF size ON results "
+                "BEGIN UPDATE totals SET size = size - OLD.size + NEW.size WHERE id = 0; END")
+            self.connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS results_delete AFTER DELETE ON results "
+                "BEGIN UPDATE totals SET size = size - OLD.size WHERE id = 0; END")
+
+    def __repr__(self):
+        return f"VisionCache(path={self.path}, max_bytes={self.max_bytes}, hits={self.hits}, misses={self.misses})"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        the cached result; else none.
+        """
+        with self.lock, self.connection:
+            row = self.connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.connection.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """
+        cache the result, then evict the least recently used results above max_bytes.
+        a result larger than max_bytes is not cached.
+        """
+        text = json.dumps(value, ensure_ascii=False)
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self.lock, self.connection:
+            # an update, not a replace, so the triggers see the old size.
+            self.connection.execute(
+                "INSERT INTO results (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, size = excluded.size, accessed = excluded.accessed",
+                (key, text, size, now, now))
+
+            total = self.connection.execute("SELECT size FROM totals WHERE id = 0").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            # the oldest first, until the total fits.
+            evict = []
+            for old_key, size in self.connection.execute("SELECT key, size FROM results ORDER BY accessed"):
+                if total <= self.max_bytes:
+                    break
+                evict.append((old_key,))
+                total -= size
+            self.connection.executemany("DELETE FROM results WHERE key = ?", evict)
+
+    def size(self) -> Dict[str, int]:
+        """
+        the number of results and their bytes.
+        """
+        with self.lock:
+            count = self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            total = self.connection.execute("SELECT size FROM totals WHERE id = 0").fetchone()[0]
+        return {"results": count, "bytes": total}
+
+    def clear(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM results")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+shared_cache: Optional[VisionCache] = None
+
+def get_shared_cache() -> VisionCache:
+    """
+    the cache shared by the vision scripts, opened on first use.
+    """
+    global shared_cache
+    if shared_cache is None:
+        shared_cache = VisionCache()
+    return shared_cache
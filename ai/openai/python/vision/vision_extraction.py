@@ -0,0 +1,383 @@
+import os
+import sys
+import json
+import time
+import asyncio
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set, Union
+
+import openai
+
+from openai.types.chat import ChatCompletion
+
+# add search path
+sys.path.append("../")
+
+from model_stream import LogEvent, print_event, stream_chat
+from image_preprocess import PreprocessOptions, preprocess_image, encode_file
+from vision_cache import VisionCache, cache_key, get_shared_cache
+
+# the default vision model.
+default_model = "gpt-4o-mini"
+
+# the image files read from a directory.
+image_extensions = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+
+# the system prompt and user prompt of each extraction mode.
+prompts: Dict[str, Dict[str, str]] = {
+    "math": {
+        "system": (
+            "The user will provide you an image of a document file. Perform the following actions: "
+            "1. extract the math equation."
+            "2. extract the handwritten math equation."
+            "3. do not solve the math problem."
+        ),
+        "prompt": "image contains math equation"
+    },
+    "math_doc": {
+        "system": (
+            "The user will provide you an image of a document file. Perform the following actions: "
+            "1. extract the text, math equations and handwritten math equations in the document."
+            "2. do not solve the math problem."
+            "3. respond with markdown."
+        ),
+        "prompt": "image contains text and math equations"
+    },
+    "math_text": {
+        "system": (
+            "The user will provide you an image of a document file. Perform the following actions: "
+            "1. extract the text in the document."
+            "2. extract each math equation."
+        ),
+        "prompt": "image contains text and math equations"
+    },
+    "handwritten": {
+        "system": (
+            "The user will provide you an image of a document file. Perform the following actions: "
+            "1. extract the handwritten math equation."
+            "2. extract the math equation."
+            "3. do not solve the math problem."
+        ),
+        "prompt": "image contains handwritten math equation"
+    },
+    "handwritten_solve": {
+        "system": (
+            "The user will provide you an image of a document file. Perform the following actions: "
+            "1. extract the handwritten math equation."
+            "2. extract the math equation."
+            "3. solve the math problem."
+        ),
+        "prompt": "image contains handwritten math equation"
+    },
+    "latex": {
+        "system": (
+            "The user will provide you an image of a document file. Perform the following actions: "
+            "1. extract the handwritten math equation."
+            "2. extract the math equation."
+            "3. write each equation as LaTeX between $$ and $$, with no other text."
+            "4. do not solve the math problem."
+        ),
+        "prompt": "image contains handwritten math equation"
+    },
+    "latex_solve": {
+        "system": (
+            "The user will provide you an image of a document file. Perform the following actions: "
+            "1. extract the handwritten math equation."
+            "2. extract the math equation."
+            "3. write each equation as LaTeX between $$ and $$."
+            "4. solve the math problem."
+            "5. write the final answer as LaTeX on the last line, after Answer:"
+        ),
+        "prompt": "image contains handwritten math equation"
+    }
+}
+
+@dataclass
+class VisionItem:
+    """
+    one image to extract, the id is the key used to resume a batch.
+    """
+    id: str
+    image: str
+    mode: str = "math"
+    prompt: Optional[str] = None
+
+def image_url(image_path: str, preprocess: Optional[PreprocessOptions] = PreprocessOptions()) -> str:
+    """
+    the data URL of the image, preprocessed unless preprocess is none.
+    """
+    media_type, data = preprocess_image(image_path, preprocess) if preprocess is not None else encode_file(image_path)
+    return f"data:{media_type};base64,{data}"
+
+def build_messages(system_prompt: str,
+                   prompt: str,
+                   image_path: str,
+                   preprocess: Optional[PreprocessOptions] = PreprocessOptions()) -> List[Dict[str, Any]]:
+    """
+    the chat messages of one image.
+    """
+    return [
+        {
+            "role": "system",
+            "content": system_prompt
+        },
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": prompt
+                },
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": image_url(image_path, preprocess)
+                    },
+                },
+            ],
+        }
+    ]
+
+def resolve_cache(cache: Union[VisionCache, bool, None]) -> Optional[VisionCache]:
+    """
+    true is the shared cache, false or none is no cache.
+    """
+    if cache is True:
+        return get_shared_cache()
+    return cache or None
+
+# Pass the image to the LLM for interpretation
+def get_vision_response(prompt, image_path, mode="math", model=default_model, client=None, preprocess=PreprocessOptions(), cache=True):
+    """
+    extract one image with a blocking call, the mode selects the system prompt.
+    a repeat of the same image, prompts and model is answered from the cache without a call.
+    """
+    client = client or openai
+    cache = resolve_cache(cache)
+    if cache is not None:
+        key = cache_key(image_path, prompts[mode]["system"], model, prompt, preprocess)
+        cached = cache.get(key)
+        if cached is not None:
+            return ChatCompletion.model_validate(cached)
+
+    response = client.chat.completions.create(
+        model=model,
+        messages=build_messages(prompts[mode]["system"], prompt, image_path, preprocess)
+    )
+
+    if cache is not None:
+        cache.put(key, response.model_dump())
+    return response
+
+def stream_vision_response(prompt, image_path, mode="math", model=default_model, client=None, preprocess=PreprocessOptions(), cache=True,
+                           log_event: Optional[LogEvent] = print_event) -> Iterator[str]:
+    """
+    extract one image, yield the tokens as they arrive. the time to first token, tokens per second
+    and latency are sent to log_event. a cached result is yielded whole.
+    """
+    cache = resolve_cache(cache)
+    if cache is not None:
+        key = cache_key(image_path, prompts[mode]["system"], model, prompt, preprocess)
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached["choices"][0]["message"]["content"]
+            return
+
+    stream = stream_chat(build_messages(prompts[mode]["system"], prompt, image_path, preprocess), model, client, log_event)
+    yield from stream
+
+    if cache is not None:
+        cache.put(key, stream.completion())
+
+def read_directory(directory: str, mode: str = "math") -> Iterator[VisionItem]:
+    """
+    the images of a directory and its subdirectories, the id is the path relative to the directory.
+    """
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(image_extensions):
+                path = os.path.join(root, name)
+                yield VisionItem(os.path.relpath(path, directory), path, mode)
+
+def read_manifest(path: str, mode: str = "math") -> Iterator[VisionItem]:
+    """
+    the images of a manifest, one image path per line or one JSON object per line
+    {"image": ..., "id": ..., "mode": ..., "prompt": ...}, relative paths are from the manifest.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            entry = json.loads(line) if line.startswith("{") else {"image": line}
+            image = os.path.join(base, entry["image"])
+            yield VisionItem(str(entry.get("id", entry["image"])), image, entry.get("mode", mode), entry.get("prompt"))
+
+def read_completed(path: str) -> Set[str]:
+    """
+    the ids already written to a results file, a line cut short by a crash is ignored.
+    """
+    completed: Set[str] = set()
+    if not os.path.exists(path):
+        return completed
+
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                completed.add(json.loads(line)["id"])
+            except (ValueError, KeyError):
+                continue
+
+    return completed
+
+class RateLimiter:
+    """
+    spaces request starts evenly, at most requests_per_minute.
+    """
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self.next_start = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        if self.interval <= 0:
+            return
+
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_start - now
+            self.next_start = max(now, self.next_start) + self.interval
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class JsonlWriter:
+    """
+    appends one JSON object per line, flushed and synced so a crash loses at most the line being written.
+    """
+    def __init__(self, path: str, mode: str = "a"):
+        self.file = open(path, mode, encoding="utf-8")
+
+        # a line cut short by a crash is ended, so the next record starts on its own line.
+        if self.file.tell() > 0:
+            with open(path, "rb") as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    self.file.write("\n")
+
+    def write(self, record: Dict[str, Any]):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+async def extract_item(client: "openai.AsyncOpenAI",
+                       item: VisionItem,
+                       model: str,
+                       preprocess: Optional[PreprocessOptions] = PreprocessOptions(),
+                       cache: Optional[VisionCache] = None,
+                       limiter: Optional[RateLimiter] = None) -> Dict[str, Any]:
+    """
+    extract one image, the result record. a cached result takes no request and no rate limit slot.
+    """
+    start = time.perf_counter()
+    system_prompt = prompts[item.mode]["system"]
+    prompt = item.prompt or prompts[item.mode]["prompt"]
+
+    # the image is hashed and read here, only the in-flight images are held in memory.
+    key = None
+    if cache is not None:
+        key = await asyncio.to_thread(cache_key, item.image, system_prompt, model, prompt, preprocess)
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return result_record(item, ChatCompletion.model_validate(cached), None, True, start)
+
+    if limiter is not None:
+        await limiter.wait()
+
+    messages = await asyncio.to_thread(build_messages, system_prompt, prompt, item.image, preprocess)
+    payload_bytes = len(messages[1]["content"][1]["image_url"]["url"])
+    response = await client.chat.completions.create(model=model, messages=messages)
+
+    if cache is not None:
+        await asyncio.to_thread(cache.put, key, response.model_dump())
+    return result_record(item, response, payload_bytes, False, start)
+
+def result_record(item: VisionItem, response: ChatCompletion, payload_bytes: Optional[int], cached: bool, start: float) -> Dict[str, Any]:
+    """
+    the JSONL record of one extracted image.
+    """
+    return {
+        "id": item.id,
+        "image": item.image,
+        "mode": item.mode,
+        "model": response.model,
+        "content": response.choices[0].message.content,
+        "usage": response.usage.model_dump() if response.usage is not None else None,
+        "payload_bytes": payload_bytes,
+        "cached": cached,
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+async def run_batch(items: List[VisionItem],
+                    output: str,
+                    model: str = default_model,
+                    concurrency: int = 8,
+                    requests_per_minute: float = 0.0,
+                    base_url: Optional[str] = None,
+                    api_key: Optional[str] = None,
+                    max_retries: int = 5,
+                    timeout: float = 120.0,
+                    preprocess: Optional[PreprocessOptions] = PreprocessOptions(),
+                    cache: Union[VisionCache, bool, None] = True) -> Dict[str, int]:
+    """
+    extract the images concurrently, each result is appended to the output JSONL as it completes.
+    the output is the checkpoint, images already in it are skipped so a crashed batch resumes where
+    it stopped. the failures of this run are written to <output>.errors.jsonl and retried by the next run.
+    rate limit and server errors are retried by the client with backoff. images are preprocessed
+    unless preprocess is none. results are cached, true is the cache shared with get_vision_response.
+    """
+    completed = read_completed(output)
+    pending = [item for item in items if item.id not in completed]
+    counts = {"total": len(items), "skipped": len(items) - len(pending), "completed": 0, "cached": 0, "failed": 0}
+    cache = resolve_cache(cache)
+
+    client = openai.AsyncOpenAI(base_url=base_url, api_key=api_key or os.environ.get("OPENAI_API_KEY", "OPENAI-API-KEY"),
+                                max_retries=max_retries, timeout=timeout)
+    limiter = RateLimiter(requests_per_minute)
+    results = JsonlWriter(output)
+    errors = JsonlWriter(output + ".errors.jsonl", "w")
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in pending:
+        queue.put_nowait(item)
+
+    async def worker():
+        while not queue.empty():
+            item = queue.get_nowait()
+            try:
+                record = await extract_item(client, item, model, preprocess, cache, limiter)
+                results.write(record)
+                counts["completed"] += 1
+                counts["cached"] += 1 if record["cached"] else 0
+            except Exception as e:
+                errors.write({"id": item.id, "image": item.image, "error": f"{type(e).__name__}: {e}"})
+                counts["failed"] += 1
+
+            done = counts["completed"] + counts["failed"]
+            if done % 50 == 0 or done == len(pending):
+                print(f"{done}/{len(pending)} extracted, {counts['failed']} failed", file=sys.stderr)
+
+    try:
+        await asyncio.gather(*[worker() for _ in range(max(1, min(concurrency, len(pending))))])
+    finally:
+        results.close()
+        errors.close()
+        await client.close()
+
+    return counts
@@ -0,0 +1,306 @@
+import re
+import sys
+import json
+import asyncio
+
+from typing import Any, Dict, Iterator, List, Optional
+
+# add search path
+sys.path.append("../publish/")
+
+from nequeo.ai.mcp.McpWorkerPool import McpWorkerPool
+
+from vision_extraction import JsonlWriter, read_completed
+
+# the LaTeX blocks of a response, display blocks first.
+display_patterns = [re.compile(r"\$\$(.+?)\$\$", re.DOTALL), re.compile(r"\\\[(.+?)\\\]", re.DOTALL)]
+inline_patterns = [re.compile(r"\\\((.+?)\\\)", re.DOTALL), re.compile(r"(?<!\$)\$([^$]+?)\$(?!\$)")]
+
+# a response without math delimiters is parsed only when it has no words once the LaTeX commands are removed.
+latex_command = re.compile(r"\\[A-Za-z]+")
+plain_word = re.compile(r"[A-Za-z]{3,}")
+
+# the final answer line of the latex_solve prompt.
+answer_pattern = re.compile(r"^\s*\**answer\**\s*:\s*(.+?)\s*$", re.IGNORECASE | re.MULTILINE)
+
+# the decimal numbers of an answer, the last stated digit sets the answer's tolerance.
+decimal_number = re.compile(r"(?<![\w.])(\d*)\.(\d+)(?:[eE]([-+]?\d+))?")
+
+# the points a symbolic difference is sampled at.
+sample_points = [0.5, 1.37, 2.71]
+
+def strip_math(text: str) -> str:
+    """
+    the text without the math delimiters and trailing punctuation.
+    """
+    text = text.strip().rstrip(".").strip()
+    for start, end in (("$$", "$$"), ("\\[", "\\]"), ("\\(", "\\)"), ("$", "$")):
+        if text.startswith(start) and text.endswith(end) and len(text) > len(start) + len(end):
+            return text[len(start):-len(end)].strip()
+    return text
+
+def latex_blocks(content: str) -> List[str]:
+    """
+    the LaTeX equations of a response, the whole response when it has no math delimiters
+    and is not prose.
+    """
+    body = answer_pattern.sub("", content)
+    for patterns in (display_patterns, inline_patterns):
+        blocks = [match.strip() for pattern in patterns for match in pattern.findall(body)]
+        if blocks:
+            return blocks
+
+    body = body.strip()
+    return [body] if body and not plain_word.search(latex_command.sub(" ", body)) else []
+
+def model_answer(content: str) -> Optional[str]:
+    """
+    the model's final answer, the last "Answer:" line; else none.
+    """
+    answers = answer_pattern.findall(content)
+    return strip_math(answers[-1]) if answers else None
+
+def split_top_level(latex: str, separators: str) -> List[str]:
+    """
+    split at the separators outside braces, brackets and parentheses.
+    """
+    parts: List[str] = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(latex):
+        if char in "{([":
+            depth += 1
+        elif char in "})]":
+            depth -= 1
+        elif char in separators and depth == 0:
+            parts.append(latex[start:index])
+            start = index + 1
+
+    parts.append(latex[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+def to_sympy(latex: str, imaginary: bool = False) -> Any:
+    """
+    parse the LaTeX with latex2sympy and do the integrals, sums, limits and derivatives,
+    with imaginary, "i" is the imaginary unit.
+    """
+    from sympy import sympify, Symbol, I
+    from latex2sympy2 import latex2sympy
+
+    expr = sympify(latex2sympy(latex))
+    if imaginary:
+        expr = expr.subs(Symbol("i"), I)
+    try:
+        return expr.doit()
+    except Exception:
+        return expr
+
+def stated_tolerance(answer: str, tolerance: float) -> float:
+    """
+    the relative tolerance of an answer, rounded to the last digit of its least precise
+    decimal; at least the tolerance.
+    """
+    for whole, fraction, exponent in decimal_number.findall(answer):
+        unit = 0.5 * 10.0 ** (int(exponent or 0) - len(fraction))
+        value = abs(float(f"{whole or 0}.{fraction}e{exponent or 0}"))
+        tolerance = max(tolerance, unit / max(1.0, value))
+    return tolerance
+
+def evaluate(expr: Any, precision: int) -> str:
+    """
+    evaluate with the SymPy server's evaluator, the numeric fast path first.
+    """
+    from nequeo.ai.mcp.servers.SymPyMath import evaluateExpression
+    from nequeo.ai.mcp.servers.SymPyNumeric import evaluateNumeric
+
+    text = str(expr)
+    return evaluateNumeric(text, precision) or evaluateExpression(text, precision)
+
+def same_value(a: Any, b: Any, tolerance: float) -> Optional[bool]:
+    """
+    are the values equal within the relative tolerance, a symbolic difference is sampled
+    at a few points; none when the difference can not be evaluated.
+    """
+    from sympy import Symbol
+
+    # the integration constant of an indefinite integral.
+    constant = Symbol("C")
+    if constant in b.free_symbols and constant not in a.free_symbols:
+        b = b.subs(constant, 0)
+
+    symbols = sorted(a.free_symbols | b.free_symbols, key=str)
+    try:
+        for point in sample_points if symbols else sample_points[:1]:
+            values = {symbol: point + index * 0.11 for index, symbol in enumerate(symbols)}
+            expected = complex(b.subs(values).evalf())
+            if abs(complex(a.subs(values).evalf()) - expected) > tolerance * max(1.0, abs(expected)):
+                return False
+    except (TypeError, ValueError):
+        return None
+
+    return True
+
+def solve_equation(latex: str, precision: int = 15, tolerance: float = 1e-9) -> Dict[str, Any]:
+    """
+    parse and evaluate one equation. "a = b" is checked as a result the model wrote down,
+    unless it has a variable and the sides differ, then it is solved for the variable. an equation
+    of two or more variables that is not an identity can not be checked.
+    """
+    from sympy import solve
+
+    sides = [to_sympy(side) for side in split_top_level(latex, "=")]
+    if not sides:
+        raise ValueError("empty equation")
+
+    result: Dict[str, Any] = {"latex": latex, "sympy": " = ".join(str(side) for side in sides)}
+    value = evaluate(sides[0], precision)
+    if value.startswith("error:"):
+        raise ValueError(value[len("error:"):].strip())
+
+    result["value"] = value
+    if len(sides) < 2:
+        return result
+
+    agrees = [same_value(sides[0], side, tolerance) for side in sides[1:]]
+    symbols = set().union(*[side.free_symbols for side in sides])
+    if len(sides) == 2 and False in agrees and len(symbols) == 1:
+        symbol = symbols.pop()
+        solutions = solve(sides[0] - sides[1], symbol)
+        result["variable"] = str(symbol)
+        result["value"] = [evaluate(solution, precision) for solution in solutions]
+        return result
+
+    # e.g. "y = 2x + 1" defines y, it is not a result.
+    result["agrees"] = None if None in agrees or (False in agrees and symbols) else all(agrees)
+    return result
+
+def answer_agrees(equation: Dict[str, Any], answer: str, tolerance: float) -> Optional[bool]:
+    """
+    does the model's answer match the local result, a solved equation matches every solution.
+    the answer is compared to the digits it states.
+    """
+    from nequeo.ai.mcp.servers.SymPyParser import parseExpression, evaluateParsed
+
+    tolerance = stated_tolerance(answer, tolerance)
+    if "variable" in equation:
+        # "x = 2, x = 3" or "2, 3".
+        expected = [evaluateParsed(parseExpression(solution)) for solution in equation["value"]]
+        imaginary = equation["variable"] != "i"
+        values = [to_sympy(split_top_level(part, "=")[-1], imaginary)
+                  for part in split_top_level(answer.replace("\\text{or}", ","), ",")]
+        if len(values) != len(expected):
+            return False
+        matches = [any(same_value(value, solution, tolerance) for solution in expected) for value in values]
+        return None if None in matches else all(matches)
+
+    local = evaluateParsed(parseExpression(equation["value"]))
+    return same_value(local, to_sympy(split_top_level(answer, "=")[-1], True), tolerance)
+
+def verify_content(content: str, precision: int = 15, tolerance: float = 1e-9) -> Dict[str, Any]:
+    """
+    solve the LaTeX of one response locally and check the model's answers, runs in a worker.
+    the status is "agrees", "disagrees", "solved" when there is nothing to check, or "unparsed".
+    """
+    equations: List[Dict[str, Any]] = []
+    for latex in latex_blocks(content):
+        try:
+            equations.append(solve_equation(latex, precision, tolerance))
+        except Exception as e:
+            equations.append({"latex": latex, "error": f"{type(e).__name__}: {e}"})
+
+    answer = model_answer(content)
+    result: Dict[str, Any] = {"equations": equations, "answer": answer, "answer_agrees": None}
+    solved = [equation for equation in equations if "error" not in equation]
+    if not solved:
+        result["status"] = "unparsed"
+        return result
+
+    # the answer is to the last equation, the problem.
+    if answer is not None:
+        try:
+            result["answer_agrees"] = answer_agrees(solved[-1], answer, tolerance)
+        except Exception as e:
+            result["answer_error"] = f"{type(e).__name__}: {e}"
+
+    checks = [equation.get("agrees") for equation in solved] + [result["answer_agrees"]]
+    if False in checks:
+        result["status"] = "disagrees"
+    elif True in checks:
+        result["status"] = "agrees"
+    else:
+        result["status"] = "solved"
+    return result
+
+def read_results(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    the extraction results of a JSONL file, a line cut short by a crash is ignored.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get("content"):
+                yield record
+
+async def verify_results(input: str,
+                         output: str,
+                         workers: int = 2,
+                         timeout: float = 30.0,
+                         precision: int = 15,
+                         tolerance: float = 1e-9) -> Dict[str, int]:
+    """
+    verify the extraction results of a batch in worker processes, each verified record is appended
+    to the output JSONL as it completes and records already in it are skipped. an equation that takes
+    longer than the timeout has its worker killed and is recorded with the status "timeout", a record
+    whose worker fails is recorded with the status "error".
+    """
+    completed = read_completed(output)
+    counts = {"total": 0, "skipped": 0, "agrees": 0, "disagrees": 0, "solved": 0, "unparsed": 0, "timeout": 0, "error": 0}
+    pool = McpWorkerPool(workers)
+    results = JsonlWriter(output)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 4)
+
+    async def worker():
+        while True:
+            record = await queue.get()
+            if record is None:
+                return
+
+            try:
+                verified = await asyncio.wait_for(pool.run(verify_content, record["content"], precision, tolerance), timeout)
+            except asyncio.TimeoutError:
+                verified = {"equations": [], "answer": model_answer(record["content"]), "answer_agrees": None, "status": "timeout"}
+            except Exception as e:
+                # e.g. the worker process died, the pool starts a new one.
+                verified = {"equations": [], "answer": model_answer(record["content"]), "answer_agrees": None, "status": "error",
+                            "error": f"{type(e).__name__}: {e}"}
+
+            results.write({"id": record["id"], "image": record.get("image"), "model": record.get("model"), **verified})
+            counts[verified["status"]] += 1
+
+            done = sum(counts[status] for status in ("agrees", "disagrees", "solved", "unparsed", "timeout", "error"))
+            if done % 50 == 0:
+                print(f"{done} verified, {counts['disagrees']} disagree", file=sys.stderr)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(max(1, workers))]
+    try:
+        # the results are streamed, only the queued records are held in memory.
+        for record in read_results(input):
+            counts["total"] += 1
+            if record["id"] in completed:
+                counts["skipped"] += 1
+                continue
+            await queue.put(record)
+
+        for _ in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        results.close()
+        pool.close()
+
+    return counts
@@ -0,0 +1,189 @@
+import sys
+import asyncio
+import argparse
+import hashlib
+import mimetypes
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from pydantic_ai import Agent, BinaryContent
+
+def media_type(response: httpx.Response, url: str) -> str:
+    """
+    the content type of the response, else guessed from the url.
+    """
+    content_type = response.headers.get("content-type", "").split(";")[0].strip()
+    if content_type and content_type != "application/octet-stream":
+        return content_type
+    return mimetypes.guess_type(url)[0] or "application/octet-stream"
+
+class AgentRunner:
+    """
+    runs many prompts about many images through one agent. each image is downloaded once by a
+    pooled async client and its BinaryContent is shared by every prompt, at most concurrency agent
+    runs are in flight, and the output of each (image, prompt) pair is cached, so asking again
+    does not call the model. the last max_images images and max_results outputs are kept.
+    """
+    def __init__(self,
+                 agent: Agent,
+                 concurrency: int = 8,
+                 fetch_concurrency: int = 16,
+                 timeout: float = 30.0,
+                 client: Optional[httpx.AsyncClient] = None,
+                 log_event: Optional[Callable[[str, str, str, Any], None]] = None,
+                 max_images: int = 64,
+                 max_results: int = 4096):
+        self.agent = agent
+        self.log_event = log_event
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.max_images = max_images
+        self.max_results = max_results
+        self.images: "OrderedDict[str, asyncio.Task[BinaryContent]]" = OrderedDict()
+        self.results: "OrderedDict[Tuple[str, str], asyncio.Task[Any]]" = OrderedDict()
+        self.metrics = {"fetches": 0, "fetched_bytes": 0, "runs": 0, "cache_hits": 0, "failed": 0}
+
+        # the client is closed with the runner only when the runner created it.
+        self.owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            limits=httpx.Limits(max_connections=fetch_concurrency, max_keepalive_connections=fetch_concurrency),
+            follow_redirects=True)
+
+    def __repr__(self):
+        return f"AgentRunner(images={len(self.images)}, results={len(self.results)}, metrics={self.metrics})"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        if self.owns_client:
+            await self.client.aclose()
+
+    def clear(self):
+        """
+        forget the cached images and outputs, callers already waiting still get theirs.
+        """
+        self.images.clear()
+        self.results.clear()
+
+    def remember(self, cache: OrderedDict, key: Any, task: "asyncio.Task[Any]", limit: int):
+        """
+        cache the task as the most recently used, the least recently used above the limit are forgotten.
+        """
+        cache[key] = task
+        while len(cache) > limit:
+            cache.popitem(last=False)
+
+    async def download(self, url: str) -> BinaryContent:
+        response = await self.client.get(url)
+        response.raise_for_status()
+        self.metrics["fetches"] += 1
+        self.metrics["fetched_bytes"] += len(response.content)
+
+        # the identifier is the content hash, the same image from two urls shares its results.
+        return BinaryContent(data=response.content, media_type=media_type(response, url),
+                             identifier=hashlib.sha256(response.content).hexdigest()[:16])
+
+    async def image(self, url: str) -> BinaryContent:
+        """
+        the image at url, downloaded once; concurrent callers wait for the same download.
+        a failed download is forgotten, so the next call tries again.
+        """
+        task = self.images.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self.download(url))
+            self.remember(self.images, url, task, self.max_images)
+        else:
+            self.images.move_to_end(url)
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            if self.images.get(url) is task:
+                del self.images[url]
+            raise
+
+    async def fetch_all(self, urls: Sequence[str]) -> List[BinaryContent]:
+        """
+        download the images concurrently, in the order of the urls.
+        """
+        return await asyncio.gather(*[self.image(url) for url in urls])
+
+    async def run(self, prompt: str, content: BinaryContent, **kwargs) -> Any:
+        async with self.semaphore:
+            self.metrics["runs"] += 1
+            try:
+                result = await self.agent.run([prompt, content], **kwargs)
+            except Exception as e:
+                self.metrics["failed"] += 1
+                if self.log_event:
+                    self.log_event("error", "run", f"{content.identifier}: {prompt[:60]}", e)
+                raise
+        return result.output
+
+    async def ask(self, url: str, prompt: str, **kwargs) -> Any:
+        """
+        the agent's output for the prompt about the image at url, run once per (image, prompt).
+        kwargs are passed to agent.run, e.g. model_settings, and are not part of the cache key.
+        """
+        content = await self.image(url)
+        key = (content.identifier, prompt)
+
+        task = self.results.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.run(prompt, content, **kwargs))
+            self.remember(self.results, key, task, self.max_results)
+        else:
+            self.results.move_to_end(key)
+            self.metrics["cache_hits"] += 1
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            if self.results.get(key) is task:
+                del self.results[key]
+            raise
+
+    async def ask_many(self, urls: Sequence[str], prompts: Sequence[str], return_exceptions: bool = True, **kwargs) -> Dict[Tuple[str, str], Any]:
+        """
+        ask every prompt about every image concurrently, the outputs by (url, prompt).
+        a failed pair is returned as its exception unless return_exceptions is false.
+        """
+        pairs = [(url, prompt) for url in urls for prompt in prompts]
+        outputs = await asyncio.gather(*[self.ask(url, prompt, **kwargs) for url, prompt in pairs],
+                                       return_exceptions=return_exceptions)
+        return dict(zip(pairs, outputs))
+
+async def ask_questions(model: str, urls: List[str], prompts: List[str], concurrency: int):
+    agent = Agent(model=model)
+    async with AgentRunner(agent, concurrency=concurrency) as runner:
+        # every image is downloaded once, concurrently, while the first prompts wait for it.
+        outputs = await runner.ask_many(urls, prompts)
+
+        for (url, prompt), output in outputs.items():
+            print(f"{url}\n  {prompt}\n  {output}")
+        print(runner.metrics, file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Ask many questions about many images with one agent.")
+    parser.add_argument('--model', type=str, default="openai:gpt-4o-mini", help='The agent model')
+    parser.add_argument('--image', type=str, action='append', help='Image url, repeat for more images')
+    parser.add_argument('--prompt', type=str, action='append', help='Question, repeat for more questions')
+    parser.add_argument('--concurrency', type=int, default=8, help='Agent runs in flight')
+    args = parser.parse_args()
+
+    asyncio.run(ask_questions(args.model,
+                              args.image or ['https://iili.io/3Hs4FMg.png'],
+                              args.prompt or ['What company is this logo from?', 'What colours are in this logo?'],
+                              args.concurrency))
+
+if __name__ == "__main__":
+    main()
+
+# https://iili.io/3Hs4FMg.png
+#   What company is this logo from?
+#   This is the logo for Pydantic, a data validation and settings management library in Python.
@@ -1,16 +1,24 @@
-import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
+import sys
 
-torch.set_default_device("cpu")
+# add search path, the engine is shared with the MCP local model server.
+sys.path.append("../publish/")
 
-model = AutoModelForCausalLM.from_pretrained("microsoft/phi-2", torch_dtype="auto", trust_remote_code=True)
-tokenizer = AutoTokenizer.from_pretrained("microsoft/phi-2", trust_remote_code=True)
+from nequeo.ai.mcp.servers.LocalModelEngine import LocalModelEngine, loadLocalModel
 
-inputs = tokenizer('''def print_prime(n):
+# the model is loaded once, the engine batches, caches and streams the requests.
+model, tokenizer = loadLocalModel("microsoft/phi-2")
+engine = LocalModelEngine(model, tokenizer)
+
+prompt = '''def print_prime(n):
    """
    Print all primes between 1 and n
-   """''', return_tensors="pt", return_attention_mask=False)
+   """'''
+
+print(prompt, end="")
+stream = engine.submit(prompt, maxTokens=180)
+for text in stream:
+    print(text, end="", flush=True)
+print()
 
-outputs = model.generate(**inputs, max_length=200)
-text = tokenizer.batch_decode(outputs)[0]
-print(text)
+print(f"{len(stream.generated)} tokens, ttft {stream.ttft:.3f}s, {engine.getMetrics()['tokensPerSecond']:.1f} tokens/s")
+engine.close()
@@ -0,0 +1,196 @@
+import gc
+import os
+import sys
+import glob
+import json
+import mmap
+import time
+import struct
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import torch
+
+from transformers import AutoConfig, AutoModelForCausalLM, AutoTokenizer
+
+# transformers 5 moved no_init_weights.
+try:
+    from transformers.initialization import no_init_weights
+except ImportError:
+    from transformers.modeling_utils import no_init_weights
+
+# the tensor types of the safetensors header.
+safetensors_dtypes: Dict[str, torch.dtype] = {
+    "F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16,
+    "I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8, "U8": torch.uint8, "BOOL": torch.bool
+}
+
+# the model files a hub download needs.
+model_file_patterns = ["*.json", "*.safetensors", "*.txt", "*.model", "*.py"]
+
+@dataclass
+class LoadOptions:
+    """
+    how the model is loaded on CPU.
+    dtype "auto" keeps the dtype of the weight files, so mapped weights are used without a copy.
+    quantize converts the linear layers to dynamic int8, their weights are then float32 copies quantized once.
+    threads and interop_threads set the torch thread pools, none keeps the torch default.
+    compile runs torch.compile and warms it up with warmup_tokens of generation.
+    """
+    dtype: str = "auto"
+    mmap: bool = True
+    quantize: bool = False
+    threads: Optional[int] = None
+    interop_threads: Optional[int] = None
+    compile: bool = False
+    warmup_tokens: int = 8
+
+def configure_threads(threads: Optional[int] = None, interop_threads: Optional[int] = None):
+    """
+    set the intra-op and inter-op thread pools. the inter-op pool can only be set before
+    torch runs parallel work, a later change is reported and ignored.
+    """
+    if threads is not None and threads > 0:
+        torch.set_num_threads(threads)
+    if interop_threads is not None and interop_threads > 0 and interop_threads != torch.get_num_interop_threads():
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError as e:
+            print(f"inter-op threads not changed: {e}", file=sys.stderr)
+
+def resolve_model_path(name: str) -> str:
+    """
+    the local directory of the model, a hub model is downloaded once to the hub cache.
+    """
+    if os.path.isdir(name):
+        return name
+
+    from huggingface_hub import snapshot_download
+    return snapshot_download(name, allow_patterns=model_file_patterns)
+
+def mmap_safetensors(path: str) -> Dict[str, torch.Tensor]:
+    """
+    the tensors of a safetensors file backed by a private memory map of the file. pages are read
+    on first use and shared with the page cache, so the weights are not copied into the process.
+    """
+    with open(path, "rb") as file:
+        header_size = struct.unpack("<Q", file.read(8))[0]
+        header = json.loads(file.read(header_size))
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    base = 8 + header_size
+    tensors: Dict[str, torch.Tensor] = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+
+        dtype = safetensors_dtypes[info["dtype"]]
+        start, end = info["data_offsets"]
+        count = (end - start) // dtype.itemsize
+        if count == 0:
+            tensors[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+
+        tensor = torch.frombuffer(buffer, dtype=dtype, count=count, offset=base + start).view(info["shape"])
+
+        # an unaligned tensor is copied, the kernels expect aligned data.
+        if (base + start) % dtype.itemsize != 0:
+            tensor = tensor.clone()
+        tensors[name] = tensor
+
+    return tensors
+
+def load_mapped(path: str, dtype: str) -> Any:
+    """
+    build the model without initializing its weights, then assign the mapped weights to it.
+    """
+    state: Dict[str, torch.Tensor] = {}
+    for file in sorted(glob.glob(os.path.join(path, "*.safetensors"))):
+        state.update(mmap_safetensors(file))
+    if not state:
+        raise FileNotFoundError(f"no safetensors weights in {path}")
+
+    floating = [tensor.dtype for tensor in state.values() if tensor.is_floating_point()]
+    target = floating[0] if dtype == "auto" and floating else getattr(torch, dtype, torch.float32)
+
+    # a different dtype converts, and so copies, the weights.
+    state = {name: tensor.to(target) if tensor.is_floating_point() and tensor.dtype != target else tensor
+             for name, tensor in state.items()}
+
+    config = AutoConfig.from_pretrained(path, trust_remote_code=True)
+    with no_init_weights():
+        model = AutoModelForCausalLM.from_config(config, dtype=target, trust_remote_code=True)
+
+    missing, _ = model.load_state_dict(state, strict=False, assign=True)
+    model.tie_weights()
+
+    # a missing weight is fine only when it is tied to a loaded one.
+    loaded = {tensor.data_ptr() for tensor in state.values()}
+    parameters = dict(model.named_parameters(remove_duplicate=False))
+    uninitialized = [name for name in missing if name in parameters and parameters[name].data_ptr() not in loaded]
+    if uninitialized:
+        raise ValueError(f"weights not found in {path}: {uninitialized[:5]}")
+
+    return model
+
+def copy_linear_biases(model: Any):
+    """
+    the quantized layers keep the float bias, a mapped bias would hold the whole mapping open.
+    """
+    with torch.no_grad():
+        for module in model.modules():
+            if isinstance(module, torch.nn.Linear) and module.bias is not None:
+                module.bias.data = module.bias.data.clone()
+
+def copy_parameters(model: Any):
+    """
+    copy the weights left after quantizing (embeddings, norms), so no tensor refers to the mapping
+    and its pages leave the process.
+    """
+    with torch.no_grad():
+        for parameter in model.parameters():
+            parameter.data = parameter.data.clone()
+
+def warmup(model: Any, tokenizer: Any, tokens: int):
+    """
+    generate a few tokens, so the compiled graphs are built before the first request.
+    """
+    inputs = tokenizer("def warmup():", return_tensors="pt")
+    with torch.inference_mode():
+        model.generate(**inputs, max_new_tokens=tokens, do_sample=False, pad_token_id=tokenizer.eos_token_id)
+
+def load_cpu_model(name: str, options: Optional[LoadOptions] = None) -> Tuple[Any, Any]:
+    """
+    load the model and tokenizer for CPU inference with the options.
+    """
+    options = options or LoadOptions()
+    configure_threads(options.threads, options.interop_threads)
+    torch.set_default_device("cpu")
+
+    path = resolve_model_path(name)
+    if options.mmap:
+        model = load_mapped(path, "float32" if options.quantize else options.dtype)
+    else:
+        dtype = torch.float32 if options.quantize else (options.dtype if options.dtype == "auto" else getattr(torch, options.dtype))
+        model = AutoModelForCausalLM.from_pretrained(path, dtype=dtype, trust_remote_code=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(path, trust_remote_code=True)
+    model.eval()
+
+    if options.quantize:
+        from torch.ao.quantization import quantize_dynamic
+        copy_linear_biases(model)
+        model = quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        copy_parameters(model)
+
+        # the replaced float layers are in reference cycles, collect them so the mapping is closed.
+        gc.collect()
+
+    if options.compile:
+        model.forward = torch.compile(model.forward, dynamic=True)
+        start = time.perf_counter()
+        warmup(model, tokenizer, options.warmup_tokens)
+        print(f"compiled in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    return model, tokenizer
@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+def read_rss() -> int:
+    """
+    the resident memory of this process in bytes.
+    """
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+def run_configuration(model_name: str, options: dict, tokens: int) -> dict:
+    """
+    load the model with the options and generate, in this process.
+    """
+    import torch
+    from cpu_loader import LoadOptions, load_cpu_model
+    from test_model import test_corpus
+
+    # the libraries are resident before the model is loaded.
+    base_rss = read_rss()
+    start = time.perf_counter()
+    model, tokenizer = load_cpu_model(model_name, LoadOptions(**options))
+    load_seconds = time.perf_counter() - start
+    rss = read_rss()
+
+    inputs = tokenizer(test_corpus, return_tensors="pt")
+    with torch.inference_mode():
+        # one short generation first, so the timing excludes the first call overheads.
+        model.generate(**inputs, max_new_tokens=2, do_sample=False, pad_token_id=tokenizer.eos_token_id)
+
+        start = time.perf_counter()
+        model.generate(**inputs, max_new_tokens=tokens, min_new_tokens=tokens, do_sample=False, pad_token_id=tokenizer.eos_token_id)
+        seconds = time.perf_counter() - start
+
+    return {
+        "load_seconds": load_seconds,
+        "base_rss_mb": base_rss / 1024 / 1024,
+        "model_rss_mb": (rss - base_rss) / 1024 / 1024,
+        "generate_rss_mb": (read_rss() - base_rss) / 1024 / 1024,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "tokens_per_second": tokens / seconds,
+        "threads": torch.get_num_threads()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the CPU loading options: load time, memory and tokens/sec.")
+    parser.add_argument('--model', type=str, default=None, help='Model name or path, else a random test model')
+    parser.add_argument('--tokens', type=int, default=64, help='Tokens generated per configuration')
+    parser.add_argument('--threads', type=int, default=os.cpu_count(), help='Intra-op threads of the tuned configurations')
+    parser.add_argument('--compile', action='store_true', help='Also measure torch.compile, slow to warm up')
+    parser.add_argument('--hidden-size', type=int, default=1024, help='Hidden size of the test model')
+    parser.add_argument('--layers', type=int, default=8, help='Layers of the test model')
+    parser.add_argument('--run', type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # a child process measures one configuration.
+    if args.run is not None:
+        print(json.dumps(run_configuration(args.model, json.loads(args.run), args.tokens)))
+        return
+
+    model_name = args.model
+    if model_name is None:
+        from test_model import build_test_model
+        model_name = os.path.join(os.path.expanduser("~"), ".cache", "nequeo", f"test-phi-{args.hidden_size}x{args.layers}")
+        if not os.path.exists(os.path.join(model_name, "config.json")):
+            build_test_model(model_name, args.hidden_size, args.layers)
+
+    configurations = [
+        ("from_pretrained", {"mmap": False}),
+        ("mmap", {"mmap": True}),
+        ("mmap, bfloat16", {"mmap": True, "dtype": "bfloat16"}),
+        ("mmap, int8", {"mmap": True, "quantize": True}),
+        (f"mmap, int8, {args.threads} threads", {"mmap": True, "quantize": True, "threads": args.threads, "interop_threads": 1})
+    ]
+    if args.compile:
+        configurations.append(("mmap, compile", {"mmap": True, "compile": True}))
+
+    # the memory columns are above the RSS of the loaded libraries.
+    print(f"{'configuration':<28} {'load s':>8} {'load MB':>8} {'run MB':>8} {'peak MB':>8} {'tokens/s':>9}")
+    for name, options in configurations:
+        # each configuration in a new process, so memory and thread settings do not carry over.
+        result = subprocess.run([sys.executable, __file__, "--model", model_name, "--tokens", str(args.tokens), "--run", json.dumps(options)],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"{name:<28} failed: {result.stderr.strip().splitlines()[-1] if result.stderr.strip() else result.returncode}")
+            continue
+
+        metrics = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f"{name:<28} {metrics['load_seconds']:>8.2f} {metrics['model_rss_mb']:>8.0f} {metrics['generate_rss_mb']:>8.0f} "
+              f"{metrics['peak_rss_mb']:>8.0f} {metrics['tokens_per_second']:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+import argparse
+import threading
+import statistics
+
+# add search path, the engine is shared with the MCP local model server.
+sys.path.append("../publish/")
+
+from nequeo.ai.mcp.servers.LocalModelEngine import LocalModelEngine, loadLocalModel
+
+from test_model import test_corpus, build_test_model
+
+def run_clients(engine: LocalModelEngine, prompts, clients: int, max_new_tokens: int):
+    """
+    send the prompts from concurrent clients, the latency and time to first token of each request.
+    """
+    results = []
+    lock = threading.Lock()
+    work = list(prompts)
+
+    def client():
+        while True:
+            with lock:
+                if not work:
+                    return
+                prompt = work.pop()
+            start = time.perf_counter()
+            stream = engine.submit(prompt, max_new_tokens)
+            for _ in stream:
+                pass
+            with lock:
+                results.append((time.perf_counter() - start, stream.ttft, len(stream.generated)))
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the inference engine with concurrent clients.")
+    parser.add_argument('--model', type=str, default=None, help='Model name or path, else a small random test model')
+    parser.add_argument('--requests', type=int, default=32, help='Requests per configuration')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--max-new-tokens', type=int, default=32, help='Tokens per request')
+    parser.add_argument('--max-wait', type=float, default=0.02, help='Seconds a request waits for a batch')
+    args = parser.parse_args()
+
+    path = args.model
+    if path is None:
+        path = os.path.join(os.path.expanduser("~"), ".cache", "nequeo", "test-phi")
+        if not os.path.exists(os.path.join(path, "config.json")):
+            build_test_model(path)
+
+    model, tokenizer = loadLocalModel(path)
+
+    # completions of the same file, the prompts share its header.
+    prompts = [f"{test_corpus}\n\ndef function_{index}(x):\n   return x" for index in range(args.requests)]
+
+    configurations = [
+        ("batch 1, no prefix cache", 1, 0),
+        (f"batch {args.clients}, no prefix cache", args.clients, 0),
+        (f"batch {args.clients}, prefix cache", args.clients, 16)
+    ]
+    for name, batch_size, prefix_cache_size in configurations:
+        engine = LocalModelEngine(model, tokenizer, batch_size, args.max_wait, prefix_cache_size)
+        start = time.perf_counter()
+        results = run_clients(engine, prompts, args.clients, args.max_new_tokens)
+        elapsed = time.perf_counter() - start
+        engine.close()
+
+        latencies = sorted(result[0] for result in results)
+        tokens = sum(result[2] for result in results)
+        metrics = engine.getMetrics()
+        print(f"{name}: {tokens / elapsed:.1f} tokens/s, "
+              f"ttft {statistics.mean(result[1] for result in results) * 1000:.0f} ms, "
+              f"p95 latency {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms, "
+              f"{metrics['batches']:.0f} batches, "
+              f"{metrics['cachedPromptTokens']:.0f} of {metrics['promptTokens']:.0f} prompt tokens cached")
+
+if __name__ == "__main__":
+    main()
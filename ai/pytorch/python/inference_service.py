@@ -0,0 +1,107 @@
+import sys
+import json
+import argparse
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cpu_loader import LoadOptions, load_cpu_model
+
+# add search path, the engine is shared with the MCP local model server.
+sys.path.append("../publish/")
+
+from nequeo.ai.mcp.servers.LocalModelEngine import LocalModelEngine
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    """
+    POST /generate {"prompt": ..., "max_new_tokens": ..., "temperature": ..., "stream": ...}
+    streams the text as chunks when stream is true; else answers one JSON object.
+    GET /metrics answers the engine metrics.
+    """
+    protocol_version = "HTTP/1.1"
+    engine: LocalModelEngine
+
+    def send_json(self, status: int, value):
+        body = json.dumps(value).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self.send_json(200, self.engine.getMetrics())
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/generate":
+            self.send_json(404, {"error": "not found"})
+            return
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            prompt = str(request["prompt"])
+            max_new_tokens = int(request.get("max_new_tokens", 128))
+            temperature = float(request.get("temperature", 0.0))
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {"error": f"bad request: {e}"})
+            return
+
+        stream = self.engine.submit(prompt, max_new_tokens, temperature)
+        if not request.get("stream", False):
+            text = "".join(stream)
+            self.send_json(200, {"text": text, "tokens": len(stream.generated), "ttft": stream.ttft,
+                                 "seconds": stream.seconds, "finish_reason": stream.finishReason})
+            return
+
+        # each piece of text is one chunk, sent as it is generated.
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for text in stream:
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local model to many clients.")
+    parser.add_argument('--model', type=str, default="microsoft/phi-2", help='Model name or path')
+    parser.add_argument('--host', type=str, default="127.0.0.1", help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--max-batch-size', type=int, default=8, help='Requests decoded together')
+    parser.add_argument('--max-wait', type=float, default=0.02, help='Seconds a request waits for a batch')
+    parser.add_argument('--prefix-cache', type=int, default=16, help='Prompt KV caches kept for shared prefixes, 0 for none')
+    parser.add_argument('--dtype', type=str, default="auto", help='Weight dtype, auto keeps the dtype of the files')
+    parser.add_argument('--quantize', action='store_true', help='Dynamic int8 linear layers')
+    parser.add_argument('--threads', type=int, default=None, help='Intra-op threads')
+    parser.add_argument('--interop-threads', type=int, default=None, help='Inter-op threads')
+    parser.add_argument('--compile', action='store_true', help='torch.compile the model before serving')
+    parser.add_argument('--no-mmap', action='store_true', help='Load with from_pretrained instead of mapping the weights')
+    args = parser.parse_args()
+
+    options = LoadOptions(dtype=args.dtype, mmap=not args.no_mmap, quantize=args.quantize, threads=args.threads,
+                          interop_threads=args.interop_threads, compile=args.compile)
+    model, tokenizer = load_cpu_model(args.model, options)
+    InferenceHandler.engine = LocalModelEngine(model, tokenizer, args.max_batch_size, args.max_wait, args.prefix_cache)
+
+    server = ThreadingHTTPServer((args.host, args.port), InferenceHandler)
+    print(f"serving {args.model} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        InferenceHandler.engine.close()
+
+if __name__ == "__main__":
+    main()
+
+# python inference_service.py --model microsoft/phi-2 --max-batch-size 8 --quantize --threads 4
+# curl -N localhost:8000/generate -d '{"prompt": "def print_prime(n):", "max_new_tokens": 64, "stream": true}'
@@ -0,0 +1,34 @@
+import torch
+
+# the code the test tokenizer is trained on, and the shared prefix of the benchmark prompts.
+test_corpus = '''def print_prime(n):
+   """
+   Print all primes between 1 and n
+   """
+   for num in range(2, n + 1):
+       if all(num % i != 0 for i in range(2, int(num ** 0.5) + 1)):
+           print(num)
+'''
+
+def build_test_model(path: str, hidden_size: int = 256, layers: int = 4):
+    """
+    save a small random phi model and a byte-level tokenizer to path, so the benchmark
+    runs on any CPU without downloading a model.
+    """
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+    from transformers import PhiConfig, PhiForCausalLM, PreTrainedTokenizerFast
+
+    tokenizer = Tokenizer(models.BPE())
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(vocab_size=1024, initial_alphabet=pre_tokenizers.ByteLevel.alphabet(),
+                                  special_tokens=["<|endoftext|>"])
+    tokenizer.train_from_iterator([test_corpus] * 100, trainer)
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=tokenizer, eos_token="<|endoftext|>", pad_token="<|endoftext|>")
+
+    torch.manual_seed(0)
+    config = PhiConfig(vocab_size=len(tokenizer), hidden_size=hidden_size, intermediate_size=hidden_size * 4,
+                       num_hidden_layers=layers, num_attention_heads=8, max_position_embeddings=2048,
+                       eos_token_id=tokenizer.eos_token_id, bos_token_id=tokenizer.eos_token_id)
+    PhiForCausalLM(config).save_pretrained(path)
+    tokenizer.save_pretrained(path)
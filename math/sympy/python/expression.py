@@ -1,7 +1,15 @@
-from sympy import *
-from sympy import sympify
-
+import os
+import sys
+import json
+import queue
+import socket
 import argparse
+import threading
+import socketserver
+import multiprocessing
+
+# add search path, the parser is shared with the MCP SymPy server.
+sys.path.append("../publish/")
 
 # def main():
 #     parser = argparse.ArgumentParser(description="A simple example script.")
@@ -16,15 +24,243 @@ import argparse
 #     else:
 #         print(f"{args.name}, you are {args.age} years old.")
 
+# the default daemon socket, one per user.
+default_socket = os.environ.get("SYMPY_EXPRESSION_SOCKET") or os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or "/tmp", f"sympy-expression-{os.getuid()}.sock")
+
+def evaluate(expression, precision=20):
+    """
+    evaluate the expression, SymPy is imported on first use so the client stays fast.
+    """
+    from nequeo.ai.mcp.servers.SymPyParser import parseExpression, evaluateParsed
+
+    expr = evaluateParsed(parseExpression(expression))
+
+    # evaluating the expression 
+    return str(expr.evalf(precision))
+
+def evaluate_request(request, precision, evaluator=evaluate):
+    """
+    evaluate a JSON request {"expression": ..., "precision": ..., "id": ...}, errors are returned.
+    """
+    if not isinstance(request, dict):
+        return { "error": "the request is not a JSON object" }
+
+    response = { "id": request["id"] } if "id" in request else {}
+    try:
+        response["result"] = evaluator(request["expression"], int(request.get("precision", precision)))
+    except Exception as e:
+        response["error"] = f"{type(e).__name__}: {e}"
+    return response
+
+def stream(lines, output, precision, jsonl):
+    """
+    evaluate each line in this process, plain text or JSONL.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if jsonl:
+            try:
+                response = evaluate_request(json.loads(line), precision)
+            except ValueError as e:
+                response = { "error": f"invalid JSON: {e}" }
+            output.write(json.dumps(response) + "\n")
+        else:
+            try:
+                output.write(evaluate(line, precision) + "\n")
+            except Exception as e:
+                output.write(f"error: {e}\n")
+        output.flush()
+
+def worker(connection):
+    """
+    daemon worker process, evaluates (expression, precision) messages until the pipe is closed.
+    """
+    while True:
+        try:
+            expression, precision = connection.recv()
+        except EOFError:
+            return
+
+        try:
+            connection.send((True, evaluate(expression, precision)))
+        except Exception as e:
+            try:
+                connection.send((False, e))
+            except Exception:
+                # the exception can not be pickled.
+                connection.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+class EvaluationWorkers:
+    """
+    the daemon worker processes, an evaluation that runs longer than timeout seconds is killed
+    with its worker, and a new worker takes its place.
+    """
+    def __init__(self, size, timeout):
+        self.timeout = timeout
+
+        # workers are forked from a server process that has SymPy and the parser imported, so they start warm.
+        self.context = multiprocessing.get_context("forkserver")
+        self.context.set_forkserver_preload(["__main__", "sympy", "nequeo.ai.mcp.servers.SymPyParser"])
+        self.idle = queue.Queue()
+        for _ in range(size):
+            self.idle.put(self.start())
+
+    def start(self):
+        connection, child = self.context.Pipe()
+        process = self.context.Process(target=worker, args=(child,), daemon=True)
+        process.start()
+        child.close()
+        return process, connection
+
+    def restart(self, process, connection):
+        process.kill()
+        process.join()
+        connection.close()
+        return self.start()
+
+    def evaluate(self, expression, precision):
+        """
+        evaluate in an idle worker, waits for one when all are busy.
+        """
+        process, connection = self.idle.get()
+        try:
+            connection.send((expression, precision))
+            if not connection.poll(self.timeout):
+                process, connection = self.restart(process, connection)
+                raise TimeoutError(f"the evaluation took longer than {self.timeout} seconds")
+
+            try:
+                ok, value = connection.recv()
+            except EOFError:
+                process, connection = self.restart(process, connection)
+                raise RuntimeError("the worker process exited")
+        finally:
+            self.idle.put((process, connection))
+
+        if not ok:
+            raise value
+        return value
+
+    def close(self):
+        while not self.idle.empty():
+            process, connection = self.idle.get()
+            connection.close()
+            process.join(1)
+            process.kill()
+
+class ExpressionHandler(socketserver.StreamRequestHandler):
+    """
+    daemon connection, one JSON request per line, one JSON response per line.
+    """
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                self.wfile.write((json.dumps({ "error": f"invalid JSON: {e}" }) + "\n").encode())
+                continue
+
+            if isinstance(request, dict) and request.get("command") == "stop":
+                self.wfile.write(b'{"result": "stopped"}\n')
+
+                # shutdown waits for serve_forever to return, so it is called from another thread.
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+            response = evaluate_request(request, self.server.precision, self.server.workers.evaluate)
+            self.wfile.write((json.dumps(response) + "\n").encode())
+
+def serve(path, precision, workers, timeout):
+    """
+    run the daemon, SymPy is imported once and stays warm in the worker processes.
+    """
+    if os.path.exists(path):
+        # a live daemon answers, a stale socket is removed.
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(path)
+            sys.exit(f"daemon already running on {path}")
+        except OSError:
+            os.unlink(path)
+
+    evaluate("1")
+    server_workers = EvaluationWorkers(workers, timeout)
+
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(path, ExpressionHandler)
+    finally:
+        os.umask(old_umask)
+
+    server.daemon_threads = True
+    server.precision = precision
+    server.workers = server_workers
+    print(f"listening on {path}", file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server_workers.close()
+        os.unlink(path)
+
+def request(path, message):
+    """
+    send one request to the daemon, none if no daemon is running.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            client.sendall((json.dumps(message) + "\n").encode())
+            with client.makefile("r") as reader:
+                return json.loads(reader.readline())
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+
 def main():
-    parser = argparse.ArgumentParser(description="A simple example script.")
-    parser.add_argument('expression', type=str, help='Math expression')
+    parser = argparse.ArgumentParser(description="Evaluate math expressions.")
+    parser.add_argument('expression', type=str, nargs='?', help='Math expression')
+    parser.add_argument('--precision', type=int, default=20, help='Number of significant digits')
+    parser.add_argument('--socket', type=str, default=default_socket, help='Daemon Unix socket')
+    parser.add_argument('--serve', action='store_true', help='Run the daemon')
+    parser.add_argument('--stop', action='store_true', help='Stop the daemon')
+    parser.add_argument('--workers', type=int, default=4, help='Daemon worker processes')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Seconds a daemon evaluation can take')
+    parser.add_argument('--local', action='store_true', help='Evaluate in this process, not the daemon')
+    parser.add_argument('--stdin', action='store_true', help='Evaluate one expression per stdin line')
+    parser.add_argument('--jsonl', action='store_true', help='Evaluate JSONL {"expression": ...} stdin lines')
 
     args = parser.parse_args()
-    expr = sympify(args.expression)
 
-    # evaluating the expression 
-    print(expr.evalf(20)) 
+    if args.serve:
+        serve(args.socket, args.precision, args.workers, args.timeout)
+    elif args.stop:
+        print("stopped" if request(args.socket, { "command": "stop" }) else "not running")
+    elif args.stdin or args.jsonl:
+        stream(sys.stdin, sys.stdout, args.precision, args.jsonl)
+    elif args.expression is None:
+        parser.error("an expression, --stdin, --jsonl, --serve or --stop is required")
+    else:
+        # forward to the daemon, evaluate here when none is running.
+        response = None if args.local else request(args.socket, { "expression": args.expression, "precision": args.precision })
+        if response is None:
+            print(evaluate(args.expression, args.precision))
+        elif "error" in response:
+            sys.exit(response["error"])
+        else:
+            print(response["result"])
 
 if __name__ == "__main__":
     main()
+
+# python expression.py --serve &
+# python expression.py "integrate(x^2, (x, 0, 3))" --precision 5
+# 9.0000
+# printf '{"id": 1, "expression": "pi", "precision": 30}\n' | python expression.py --jsonl
+# {"id": 1, "result": "3.14159265358979323846264338328"}
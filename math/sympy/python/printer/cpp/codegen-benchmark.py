@@ -0,0 +1,131 @@
+import os
+import argparse
+import tempfile
+import subprocess
+
+from typing import Dict, List, Tuple
+
+from sympy import sympify
+
+from codegen import naive_code, cse_code
+
+# numeric kernels, each a function of x and y.
+kernels: Dict[str, str] = {
+    "series": "x - 0.33333333333333333333*x**3 + 0.2*x**5 - 0.14285714285714285714*x**7 + 0.11111111111111111111*x**9",
+    "gaussian": "exp(-(x - y)**2/2)/sqrt(2*pi) + (x - y)**2*exp(-(x - y)**2/2)/sqrt(2*pi)",
+    "trig": "sin(x*y)**2*cos(x*y) + sin(x*y)**3 + pi*cos(x*y)**2/2 + (y**3)**0.33333333333333333333",
+    "rational": "(x**2 + y**2)**2/(1 + x**2 + y**2) + sqrt(2)*(x**2 + y**2)*x**3*y**4",
+    "divisor": "x/y**2 + sin(x)/(x + y)**3 - 1/sin(x*y)**2"
+}
+
+# the largest relative difference between the naive and cse results that is accepted.
+tolerance: float = 1e-9
+
+# the C++ timing harness, each kernel is run over the same inputs.
+harness = """
+#include <cmath>
+#include <chrono>
+#include <cstdio>
+#include <vector>
+
+%(functions)s
+
+template <typename F, typename G>
+double max_error(F f, G g, const std::vector<double>& xs, const std::vector<double>& ys) {
+    double worst = 0.0;
+    for (size_t i = 0; i < xs.size(); ++i) {
+        double a = f(xs[i], ys[i]), b = g(xs[i], ys[i]);
+        double error = std::fabs(a - b) / std::fmax(1.0, std::fabs(b));
+        if (std::isnan(error)) return INFINITY;
+        worst = std::fmax(worst, error);
+    }
+    return worst;
+}
+
+template <typename F>
+double run(F f, const std::vector<double>& xs, const std::vector<double>& ys, int repeat, double& sink) {
+    auto start = std::chrono::steady_clock::now();
+    for (int r = 0; r < repeat; ++r)
+        for (size_t i = 0; i < xs.size(); ++i)
+            sink += f(xs[i], ys[i]);
+    auto stop = std::chrono::steady_clock::now();
+    return std::chrono::duration<double, std::nano>(stop - start).count() / (repeat * xs.size());
+}
+
+int main() {
+    std::vector<double> xs(%(size)d), ys(%(size)d);
+    for (int i = 0; i < %(size)d; ++i) { xs[i] = 0.1 + 0.8 * i / %(size)d; ys[i] = 0.9 - 0.7 * i / %(size)d; }
+    double sink = 0.0;
+%(runs)s
+    std::fprintf(stderr, "%%g\\n", sink);
+    return 0;
+}
+"""
+
+def build(kernel_names: List[str], size: int, repeat: int) -> str:
+    """
+    generate the naive and cse functions of each kernel and the harness that times them.
+    """
+    functions: List[str] = []
+    runs: List[str] = []
+
+    for name in kernel_names:
+        expr = sympify(kernels[name])
+        args = sympify("x, y")
+        functions.append(naive_code(expr, f"{name}_naive", args))
+        functions.append(cse_code(expr, f"{name}_cse", args))
+        runs.append(f'    std::printf("{name} error %g\\n", max_error({name}_naive, {name}_cse, xs, ys));')
+        for mode in ["naive", "cse"]:
+            runs.append(f'    std::printf("{name} {mode} %g\\n", run({name}_{mode}, xs, ys, {repeat}, sink));')
+
+    return harness % { "functions": "\n".join(functions), "size": size, "runs": "\n".join(runs) }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile and time the naive and cse generated C++.")
+    parser.add_argument('--compiler', type=str, default=os.environ.get("CXX", "g++"), help='C++ compiler')
+    parser.add_argument('--flags', type=str, default='-O2', help='Compiler flags')
+    parser.add_argument('--size', type=int, default=100000, help='Inputs per kernel')
+    parser.add_argument('--repeat', type=int, default=20, help='Passes over the inputs')
+    parser.add_argument('--kernel', type=str, nargs='+', choices=list(kernels), default=list(kernels), help='Kernels to time')
+    parser.add_argument('--show', action='store_true', help='Print the generated C++')
+
+    args = parser.parse_args()
+    source: str = build(args.kernel, args.size, args.repeat)
+    if args.show:
+        print(source)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path: str = os.path.join(directory, "kernels.cpp")
+        binary: str = os.path.join(directory, "kernels")
+        with open(path, "w") as file:
+            file.write(source)
+
+        subprocess.run([args.compiler, *args.flags.split(), "-std=c++11", path, "-o", binary], check=True)
+        output: str = subprocess.run([binary], check=True, capture_output=True, text=True).stdout
+
+    timings: Dict[Tuple[str, str], float] = {}
+    for line in output.splitlines():
+        name, mode, value = line.split()
+        timings[(name, mode)] = float(value)
+
+    # a speedup is only meaningful when both functions compute the same values.
+    wrong: List[str] = [f"{name} ({timings[(name, 'error')]:g})" for name in args.kernel if not timings[(name, "error")] <= tolerance]
+    if wrong:
+        raise SystemExit(f"naive and cse results differ: {', '.join(wrong)}")
+
+    print(f"{'kernel':<10} {'naive ns':>10} {'cse ns':>10} {'speedup':>8}")
+    for name in args.kernel:
+        naive: float = timings[(name, "naive")]
+        folded: float = timings[(name, "cse")]
+        print(f"{name:<10} {naive:>10.2f} {folded:>10.2f} {naive / folded:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
+
+# python codegen-benchmark.py --flags "-O2"
+# kernel       naive ns     cse ns  speedup
+# series          68.35      43.22    1.58x
+# gaussian        13.07       8.02    1.63x
+# trig            72.20      30.34    2.38x
+# rational        30.47       3.04   10.01x
+# divisor         28.12      14.57    1.93x
@@ -0,0 +1,129 @@
+import argparse
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sympy import Symbol, Mul, Integer, E, pi, sqrt, log, cse, sympify, numbered_symbols
+from sympy.printing.cxx import CXX11CodePrinter
+from sympy.printing.precedence import precedence
+
+# <cmath> constants, see the table in gamma.py.
+math_constants: Dict[Any, Symbol] = {
+    pi: Symbol("M_PI"),
+    pi / 2: Symbol("M_PI_2"),
+    pi / 4: Symbol("M_PI_4"),
+    1 / pi: Symbol("M_1_PI"),
+    2 / pi: Symbol("M_2_PI"),
+    2 / sqrt(pi): Symbol("M_2_SQRTPI"),
+    sqrt(2): Symbol("M_SQRT2"),
+    1 / sqrt(2): Symbol("M_SQRT1_2"),
+    E: Symbol("M_E"),
+    1 / log(2): Symbol("M_LOG2E"),
+    1 / log(10): Symbol("M_LOG10E"),
+    log(2): Symbol("M_LN2"),
+    log(10): Symbol("M_LN10")
+}
+
+class FoldedPowPrinter(CXX11CodePrinter):
+    """
+    C++11 printer that writes pow with a small integer exponent as multiplications,
+    e.g. std::pow(x, 3) is (x*x*x) and std::pow(x, -2) is 1.0/(x*x).
+    """
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, pow_limit: int = 4):
+        super().__init__(settings or {})
+        self.pow_limit = pow_limit
+
+    def _print_Pow(self, expr):
+        exponent = expr.exp
+        if isinstance(exponent, Integer) and 2 <= abs(int(exponent)) <= self.pow_limit:
+            base: str = self.parenthesize(expr.base, precedence(Mul(Integer(2), Symbol("x"), evaluate=False)))
+            # the product is parenthesized, it can be a divisor, e.g. x/(y*y).
+            product: str = "(" + "*".join([base] * abs(int(exponent))) + ")"
+            return product if exponent > 0 else f"1.0/{product}"
+
+        return super()._print_Pow(expr)
+
+def map_constants(expr: Any) -> Any:
+    """
+    replace constant factors, including those inside products such as pi*x/2, with the <cmath> constants.
+    """
+    def replace(node: Any) -> Any:
+        if node in math_constants:
+            return math_constants[node]
+
+        if node.is_Mul:
+            constant, variable = node.as_independent(*node.free_symbols, as_Add=False)
+            if variable != 1 and constant in math_constants:
+                return math_constants[constant] * replace(variable)
+            if variable != 1 and -constant in math_constants:
+                return -math_constants[-constant] * replace(variable)
+
+        if node.args:
+            return node.func(*[replace(arg) for arg in node.args])
+
+        return node
+
+    return replace(expr)
+
+def signature(expr: Any, name: str, args: Optional[Sequence[Symbol]], type: str) -> Tuple[List[Symbol], str]:
+    """
+    the function arguments, sorted by name when not given, and the C++ signature.
+    """
+    symbols: List[Symbol] = list(args) if args is not None else sorted(expr.free_symbols, key=lambda s: s.name)
+    return symbols, f"{type} {name}({', '.join(f'{type} {s.name}' for s in symbols)})"
+
+def naive_code(expr: Any, name: str = "f", args: Optional[Sequence[Symbol]] = None, type: str = "double") -> str:
+    """
+    generate a C++ function that returns the plain cxxcode of the expression.
+    """
+    expr = sympify(expr)
+    _, header = signature(expr, name, args, type)
+    printer = CXX11CodePrinter()
+    return f"{header} {{\n    return {printer.doprint(expr)};\n}}\n"
+
+def cse_code(expr: Any,
+             name: str = "f",
+             args: Optional[Sequence[Symbol]] = None,
+             type: str = "double",
+             pow_limit: int = 4,
+             constants: bool = True) -> str:
+    """
+    generate a C++ function that computes each common subexpression once in a const temporary,
+    with small integer pow folded into multiplications and constants mapped to M_PI, M_SQRT2, ...
+    """
+    expr = sympify(expr)
+    symbols, header = signature(expr, name, args, type)
+    printer = FoldedPowPrinter(pow_limit=pow_limit)
+    temporaries, reduced = cse(expr, symbols=numbered_symbols("t"))
+
+    lines: List[str] = [f"{header} {{"]
+    for temporary, value in temporaries:
+        value = map_constants(value) if constants else value
+        lines.append(f"    const {type} {temporary} = {printer.doprint(value)};")
+
+    result = map_constants(reduced[0]) if constants else reduced[0]
+    lines.append(f"    return {printer.doprint(result)};")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a C++ function from a SymPy expression.")
+    parser.add_argument('expression', type=str, help='SymPy expression')
+    parser.add_argument('--name', type=str, default='f', help='Function name')
+    parser.add_argument('--type', type=str, default='double', help='Argument and return type')
+    parser.add_argument('--pow-limit', type=int, default=4, help='Largest integer exponent written as multiplications')
+    parser.add_argument('--naive', action='store_true', help='Plain cxxcode, no cse')
+
+    args = parser.parse_args()
+    if args.naive:
+        print(naive_code(args.expression, args.name, type=args.type))
+    else:
+        print(cse_code(args.expression, args.name, type=args.type, pow_limit=args.pow_limit))
+
+if __name__ == "__main__":
+    main()
+
+# python codegen.py "sin(x)**2*exp(-x**2)/sqrt(2*pi) + sin(x)**3 + pi*x/2"
+# double f(double x) {
+#     const double t0 = std::sin(x);
+#     return M_PI_2*x + (t0*t0*t0) + (1.0/2.0)*M_SQRT2*(t0*t0)*std::exp(-(x*x))/std::sqrt(M_PI);
+# }
@@ -0,0 +1,249 @@
+import os
+import re
+import sys
+import json
+import argparse
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from sympy import sympify
+from sympy.printing import cxxcode, jscode
+from latex2sympy2 import latex2sympy
+
+# the supported output targets.
+targets = [ "cpp", "javascript" ]
+
+# the supported input formats.
+formats = [ "jsonl", "markdown", "lines" ]
+
+# markdown display equations: $$ ... $$, \[ ... \] and ```math fences.
+display_open = re.compile(r"^\s*(\$\$|\\\[|```math)\s*(.*)$")
+display_close = { "$$": "$$", "\\[": "\\]", "```math": "```" }
+
+# markdown inline equations: $ ... $, not $$.
+inline_equation = re.compile(r"(?<![\$\\])\$(?!\$)(.+?)(?<![\$\\])\$(?!\$)")
+
+class InvalidEquation(str):
+    """
+    an input line that is not an equation, translated to its error entry.
+    """
+    def __new__(cls, text: str, error: str):
+        equation = super().__new__(cls, text)
+        equation.error = error
+        return equation
+
+    def __reduce__(self):
+        return InvalidEquation, (str(self), self.error)
+
+def read_jsonl(stream: TextIO, source: str) -> Iterator[Tuple[str, str]]:
+    """
+    read equations from JSONL, one object with a "latex" (and optional "id") or one string per line.
+    a line that is not valid is yielded as an InvalidEquation, the rest of the input is still read.
+    """
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        id: str = f"{source}:{number}"
+        try:
+            item: Any = json.loads(line)
+        except ValueError as e:
+            yield id, InvalidEquation(line, f"invalid JSON: {e}")
+            continue
+
+        if isinstance(item, str):
+            yield id, item
+        elif not isinstance(item, dict):
+            yield id, InvalidEquation(line, "the line is not a JSON object or string")
+        elif not isinstance(item.get("latex"), str):
+            yield str(item.get("id", id)), InvalidEquation(line, 'the object has no "latex" string')
+        else:
+            yield str(item.get("id", id)), item["latex"]
+
+def read_lines(stream: TextIO, source: str) -> Iterator[Tuple[str, str]]:
+    """
+    read equations one per line.
+    """
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            yield f"{source}:{number}", line
+
+def read_markdown(stream: TextIO, source: str, inline: bool = False) -> Iterator[Tuple[str, str]]:
+    """
+    read the display equations, and optionally the inline equations, from markdown.
+    only the lines of the current display equation are held in memory.
+    """
+    close: Optional[str] = None
+    start: int = 0
+    block: List[str] = []
+
+    for number, line in enumerate(stream, 1):
+        text: str = line.rstrip("\r\n")
+
+        # inside a display equation.
+        if close is not None:
+            if close in text:
+                block.append(text[:text.index(close)])
+                yield f"{source}:{start}", "\n".join(block).strip()
+                close = None
+                block = []
+            else:
+                block.append(text)
+            continue
+
+        match = display_open.match(text)
+        if match:
+            close = display_close[match.group(1)]
+            start = number
+            rest: str = match.group(2)
+
+            # one line display equation.
+            if close in rest:
+                yield f"{source}:{start}", rest[:rest.index(close)].strip()
+                close = None
+            else:
+                block = [rest]
+        elif inline:
+            for equation in inline_equation.findall(text):
+                yield f"{source}:{number}", equation.strip()
+
+    # unclosed display equation.
+    if close is not None:
+        yield f"{source}:{start}", "\n".join(block).strip()
+
+def read_equations(stream: TextIO, format: str, source: str = "-", inline: bool = False) -> Iterator[Tuple[str, str]]:
+    """
+    read (id, latex) equations from a stream.
+    """
+    if format == "jsonl":
+        return read_jsonl(stream, source)
+    elif format == "markdown":
+        return read_markdown(stream, source, inline)
+    elif format == "lines":
+        return read_lines(stream, source)
+    else:
+        raise ValueError(f"format must be one of {formats}")
+
+def translate_equation(latex_expr: str, to: List[str], bare: bool = False) -> Dict[str, str]:
+    """
+    translate one LaTeX equation to each target, a failure is returned as "error".
+    """
+    if isinstance(latex_expr, InvalidEquation):
+        return { "error": latex_expr.error }
+
+    try:
+        expr = sympify(latex2sympy(latex_expr))
+        result: Dict[str, str] = {}
+
+        for target in to:
+            if target == "cpp":
+                code: str = cxxcode(expr, standard='C++11')
+                result[target] = code.replace("std::", "") if bare else code
+            elif target == "javascript":
+                code = jscode(expr)
+                result[target] = code.replace("Math.", "") if bare else code
+            else:
+                raise ValueError(f"target must be one of {targets}")
+
+        return result
+    except Exception as e:
+        return { "error": f"{type(e).__name__}: {e}" }
+
+def translate_chunk(chunk: List[str], to: List[str], bare: bool = False) -> List[Dict[str, str]]:
+    """
+    translate a chunk of LaTeX equations in a worker process.
+    """
+    return [translate_equation(latex_expr, to, bare) for latex_expr in chunk]
+
+def chunked(equations: Iterable[Tuple[str, str]], chunk_size: int) -> Iterator[List[Tuple[str, str]]]:
+    """
+    group the equations into chunks.
+    """
+    chunk: List[Tuple[str, str]] = []
+    for equation in equations:
+        chunk.append(equation)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+def run_pipeline(equations: Iterable[Tuple[str, str]],
+                 to: List[str] = targets,
+                 workers: Optional[int] = None,
+                 chunk_size: int = 64,
+                 max_pending: int = 0,
+                 bare: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    translate (id, latex) equations across a process pool, results are yielded in input order.
+    at most max_pending chunks (default twice the workers) are read ahead, so memory is
+    bounded by max_pending * chunk_size equations whatever the input size.
+    """
+    workers = workers or os.cpu_count() or 1
+    limit: int = max_pending if max_pending > 0 else 2 * workers
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Tuple[List[Tuple[str, str]], Future]] = deque()
+
+        def drain() -> Iterator[Dict[str, Any]]:
+            chunk, future = pending.popleft()
+            for (id, latex_expr), result in zip(chunk, future.result()):
+                yield { "id": id, "latex": latex_expr, **result }
+
+        for chunk in chunked(equations, chunk_size):
+            pending.append((chunk, executor.submit(translate_chunk, [latex_expr for _, latex_expr in chunk], to, bare)))
+
+            # wait for the oldest chunk before reading further.
+            if len(pending) >= limit:
+                yield from drain()
+
+        while pending:
+            yield from drain()
+
+def main():
+    parser = argparse.ArgumentParser(description="Translate LaTeX equations to C++ and JavaScript.")
+    parser.add_argument('inputs', type=str, nargs='*', default=['-'], help='Input files, - for stdin')
+    parser.add_argument('--format', type=str, choices=formats, default='jsonl', help='Input format')
+    parser.add_argument('--to', type=str, nargs='+', choices=targets, default=targets, help='Output targets')
+    parser.add_argument('--output', type=str, default='-', help='Output JSONL file, - for stdout')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes, default one per CPU')
+    parser.add_argument('--chunk-size', type=int, default=64, help='Equations sent to a worker at once')
+    parser.add_argument('--max-pending', type=int, default=0, help='Chunks read ahead, default twice the workers')
+    parser.add_argument('--inline', action='store_true', help='Include markdown inline $...$ equations')
+    parser.add_argument('--bare', action='store_true', help='Remove the std:: and Math. prefixes')
+
+    args = parser.parse_args()
+
+    def equations() -> Iterator[Tuple[str, str]]:
+        for input in args.inputs:
+            if input == '-':
+                yield from read_equations(sys.stdin, args.format, "-", args.inline)
+            else:
+                with open(input, encoding="utf-8") as stream:
+                    yield from read_equations(stream, args.format, input, args.inline)
+
+    output: TextIO = sys.stdout if args.output == '-' else open(args.output, "w", encoding="utf-8")
+    failed: int = 0
+    total: int = 0
+
+    try:
+        for result in run_pipeline(equations(), args.to, args.workers, args.chunk_size, args.max_pending, args.bare):
+            total += 1
+            failed += 1 if "error" in result else 0
+            output.write(json.dumps(result) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"{total} equations, {failed} failed", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
+
+# echo '{"id": "eq1", "latex": "\\sqrt{3x-1}+(1+x)^2"}' | python pipeline.py --to cpp javascript
+# {"id": "eq1", "latex": "\\sqrt{3x-1}+(1+x)^2", "cpp": "std::pow(x + 1, 2) + std::sqrt(3*x - 1)", "javascript": "Math.pow(x + 1, 2) + Math.sqrt(3*x - 1)"}